@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+dinox_client 导入耗时基准
+用途: 验证 `import dinox_client` 不会提前加载 aiohttp 等重依赖
+运行: python bench_import.py [--runs 7]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# 场景名称 -> 在全新解释器中执行的导入语句
+SCENARIOS = {
+    "import dinox_client": "import dinox_client",
+    "from dinox_client import DinoxConfig": "from dinox_client import DinoxConfig",
+    "from dinox_client import DinoxClient": "from dinox_client import DinoxClient",
+}
+
+
+def measure(statement: str) -> tuple:
+    """
+    在子进程中用 -X importtime 执行语句，统计所有顶层导入的累计耗时
+
+    Returns:
+        (累计导入耗时 us, 是否加载了 aiohttp)
+    """
+    code = f"{statement}; import sys; print('aiohttp' in sys.modules)"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        fields = line.split("|")
+        # Top-level entries only; their cumulative time already covers nested imports
+        if not fields[2].startswith("  "):
+            total_us += int(fields[1])
+    return total_us, proc.stdout.strip() == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="dinox_client 导入耗时基准")
+    parser.add_argument("--runs", type=int, default=7, help="每个场景的运行次数（取中位数）")
+    args = parser.parse_args()
+
+    # Interpreter startup imports (site, encodings, ...) are subtracted from every scenario
+    baseline = statistics.median(measure("pass")[0] for _ in range(args.runs))
+
+    print(f"{'场景':<42}{'中位耗时(ms)':>14}{'aiohttp':>10}")
+    print("-" * 66)
+    for name, statement in SCENARIOS.items():
+        samples = []
+        loaded = False
+        for _ in range(args.runs):
+            total_us, loaded = measure(statement)
+            samples.append(total_us - baseline)
+        print(f"{name:<42}{statistics.median(samples) / 1000:>14.2f}{str(loaded):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+事件循环延迟基准
+用途: 对比大批量同步时 JSON 解析与摘要计算在事件循环内执行、卸载到线程池、卸载到进程池的循环延迟
+运行: python bench_loop_lag.py [--notes 20000] [--runs 3]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from aiohttp import web
+
+import dinox_client
+from dinox_client import DinoxClient, DinoxConfig, FileCheckpointStore
+
+PROBE_INTERVAL = 0.005
+
+
+def make_payload(count: int) -> bytes:
+    """生成 count 条带 front matter 的笔记组成的 get_notes_list 响应"""
+    body = "\n".join(f"第 {i} 行内容，包含一些 Markdown **格式**。" for i in range(20))
+    days = []
+    for day in range(max(1, count // 100)):
+        date = f"2025-{1 + day // 28 % 12:02d}-{1 + day % 28:02d}"
+        notes = []
+        for i in range(100):
+            note_id = f"{day:05d}-{i:03d}"
+            notes.append({
+                "noteId": note_id,
+                "title": f"笔记 {note_id}",
+                "content": f"---\ntitle: 笔记 {note_id}\nupdateTime: {date} 10:00:00\n---\n{body}",
+                "tags": ["bench", f"t{i % 7}"],
+                "zettelBoxes": [f"box{i % 5}"],
+                "createTime": f"{date} 09:00:00",
+                "updateTime": f"{date} 10:00:00",
+                "isDel": False,
+            })
+        days.append({"date": date, "notes": notes})
+    return json.dumps({"code": "000000", "data": days}, ensure_ascii=False).encode("utf-8")
+
+
+async def probe(lags: list, stop: asyncio.Event):
+    """每 PROBE_INTERVAL 秒醒来一次，记录实际醒来时间比预期晚了多少"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def run_once(base_url: str, **config_kwargs) -> tuple:
+    """执行一次完整同步，返回 (耗时 s, 最大循环延迟 ms, p99 循环延迟 ms)"""
+    lags, stop = [], asyncio.Event()
+    # Default configuration apart from the offload settings
+    config = DinoxConfig(api_token="bench", **config_kwargs)
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = FileCheckpointStore(f"{tmp}/checkpoint.json")
+        async with DinoxClient(config=config) as client:
+            probe_task = asyncio.ensure_future(probe(lags, stop))
+            started = time.perf_counter()
+            await client.sync_notes(checkpoint, on_notes=lambda days: None)
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await probe_task
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+    return elapsed, (lags[-1] if lags else 0.0) * 1000, p99 * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="事件循环延迟基准")
+    parser.add_argument("--notes", type=int, default=20000, help="响应中的笔记数")
+    parser.add_argument("--runs", type=int, default=3, help="每个场景的运行次数（取中位数）")
+    args = parser.parse_args()
+
+    payload = make_payload(args.notes)
+
+    async def handler(request):
+        return web.Response(body=payload, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_route("POST", "/openapi/v5/notes", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    for name in list(dinox_client.METHOD_SERVER_MAP):
+        dinox_client.METHOD_SERVER_MAP[name] = base_url
+
+    threads = ThreadPoolExecutor(max_workers=4)
+    processes = ProcessPoolExecutor(max_workers=4)
+    scenarios = {
+        "事件循环内": {},
+        "线程池": {"offload_threshold": 0, "offload_executor": threads},
+        "进程池": {"offload_threshold": 0, "offload_executor": processes},
+    }
+
+    print(f"笔记数: {args.notes}，响应体: {len(payload) / 1e6:.1f} MB")
+    print(f"{'场景':<12}{'同步耗时(s)':>14}{'最大延迟(ms)':>16}{'p99延迟(ms)':>16}")
+    print("-" * 58)
+    try:
+        for name, kwargs in scenarios.items():
+            results = [await run_once(base_url, **kwargs) for _ in range(args.runs)]
+            elapsed, max_lag, p99 = (statistics.median(column) for column in zip(*results))
+            print(f"{name:<12}{elapsed:>14.2f}{max_lag:>16.1f}{p99:>16.1f}")
+    finally:
+        threads.shutdown()
+        processes.shutdown()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
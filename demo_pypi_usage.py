@@ -6,10 +6,20 @@ DinoX API PyPI 包使用演示
 """
 
 import asyncio
+import io
 import json
+import sys
 from datetime import datetime
 from dinox_client import DinoxClient, DinoxConfig
 
+# 修复 Windows 编码问题
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+        sys.stderr.reconfigure(encoding='utf-8')
+    except (AttributeError, io.UnsupportedOperation):
+        pass
+
 # ============================================================
 # 配置你的 API Token
 # ============================================================
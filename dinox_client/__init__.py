@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Dinox API 客户端
+
+一个用于与 Dinox AI 笔记服务交互的 Python 客户端库。
+
+公开名称按需加载：`import dinox_client` 不会导入 aiohttp，
+首次访问 DinoxClient 等名称时才导入对应子模块。
+
+Author: Dinox Team
+License: MIT
+Version: 0.3.0
+"""
+
+__version__ = "0.3.0"
+
+import importlib
+
+# typing is deliberately not imported here: it alone costs several ms at startup
+TYPE_CHECKING = False
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "DinoxClient": "client",
+    "create_client": "client",
+    "DinoxSyncClient": "sync_client",
+    "DinoxConfig": "config",
+    "DinoxTimeout": "config",
+    "NOTE_SERVER_URL": "config",
+    "AI_SERVER_URL": "config",
+    "METHOD_SERVER_MAP": "config",
+    "IDEMPOTENT_METHODS": "config",
+    "HEDGEABLE_METHODS": "config",
+    "DinoxAPIError": "errors",
+    "ClientMetrics": "metrics",
+    "RequestMetrics": "metrics",
+    "LatencyTracker": "metrics",
+    "HedgeBudget": "metrics",
+    "DEFAULT_SYNC_TIME": "config",
+    "INTERACTIVE": "config",
+    "NORMAL": "config",
+    "BULK": "config",
+    "CheckpointStore": "checkpoint",
+    "FileCheckpointStore": "checkpoint",
+    "SQLiteCheckpointStore": "checkpoint",
+    "SyncResult": "checkpoint",
+    "max_update_time": "checkpoint",
+    "AudioDownloader": "attachments",
+    "DownloadResult": "attachments",
+    "iter_audio_urls": "attachments",
+    "NoteChange": "changes",
+    "ChangeTracker": "changes",
+    "note_digest": "changes",
+    "NoteStore": "store",
+    "ConcurrencyLimiter": "limiter",
+    "AdaptiveLimiter": "limiter",
+    "SyncAccount": "accounts",
+    "AccountSyncReport": "accounts",
+    "NoteArchive": "archive",
+    "LoopMonitor": "monitor",
+    "SQLiteOutbox": "outbox",
+    "OutboxItem": "outbox",
+    "SQLiteResponseCache": "response_cache",
+    "SyncWindow": "partition",
+    "partition_days": "partition",
+}
+
+__all__ = ["__version__"] + list(_EXPORTS)
+
+if TYPE_CHECKING:  # pragma: no cover - for IDEs and type checkers only
+    from .attachments import AudioDownloader, DownloadResult, iter_audio_urls
+    from .accounts import AccountSyncReport, SyncAccount
+    from .archive import NoteArchive
+    from .changes import ChangeTracker, NoteChange, note_digest
+    from .checkpoint import (
+        CheckpointStore,
+        FileCheckpointStore,
+        SQLiteCheckpointStore,
+        SyncResult,
+        max_update_time,
+    )
+    from .client import DinoxClient, create_client
+    from .config import (
+        AI_SERVER_URL,
+        BULK,
+        DEFAULT_SYNC_TIME,
+        HEDGEABLE_METHODS,
+        IDEMPOTENT_METHODS,
+        INTERACTIVE,
+        METHOD_SERVER_MAP,
+        NORMAL,
+        NOTE_SERVER_URL,
+        DinoxConfig,
+        DinoxTimeout,
+    )
+    from .errors import DinoxAPIError
+    from .limiter import AdaptiveLimiter, ConcurrencyLimiter
+    from .metrics import ClientMetrics, HedgeBudget, LatencyTracker, RequestMetrics
+    from .partition import SyncWindow, partition_days
+    from .monitor import LoopMonitor
+    from .outbox import OutboxItem, SQLiteOutbox
+    from .response_cache import SQLiteResponseCache
+    from .store import NoteStore
+    from .sync_client import DinoxSyncClient
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
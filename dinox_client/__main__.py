@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""python -m dinox_client: 运行示例代码"""
+
+import asyncio
+
+from ._compat import fix_windows_console
+from .client import example_usage
+
+if __name__ == "__main__":
+    fix_windows_console()
+    asyncio.run(example_usage())
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""可选依赖与平台兼容处理（均为按需加载）"""
+
+import io
+import sys
+
+_UNSET = object()
+_brotli = _UNSET
+
+
+def load_brotli():
+    """
+    按需加载 Brotli 解码模块（brotli 或 brotlicffi）
+
+    Returns:
+        brotli 模块，未安装时返回 None
+    """
+    global _brotli
+    if _brotli is _UNSET:
+        try:
+            import brotli as module
+        except ImportError:
+            try:
+                import brotlicffi as module
+            except ImportError:
+                module = None
+        _brotli = module
+    return _brotli
+
+
+def accept_encoding() -> str:
+    """返回向服务器声明的 Accept-Encoding，仅在可解码时包含 br"""
+    return "gzip, deflate, br" if load_brotli() is not None else "gzip, deflate"
+
+
+def fix_windows_console():
+    """修复 Windows 控制台中文输出编码（仅供命令行入口调用，导入库时不再执行）"""
+    if sys.platform != 'win32':
+        return
+    try:
+        if hasattr(sys.stdout, 'reconfigure'):
+            sys.stdout.reconfigure(encoding='utf-8')
+            sys.stderr.reconfigure(encoding='utf-8')
+    except (AttributeError, io.UnsupportedOperation):
+        pass
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 解析后端
+
+安装 orjson 时使用 orjson，否则回退到标准库 json；后端在首次解析时才加载。
+"""
+
+_loads = None
+
+
+def _resolve():
+    global _loads
+    try:
+        import orjson
+        _loads = orjson.loads
+    except ImportError:
+        import json
+        _loads = json.loads
+    return _loads
+
+
+def loads(data):
+    """
+    解析 JSON 文本
+
+    Raises:
+        ValueError: JSON 格式错误（orjson 与 json 的解析异常均为其子类）
+    """
+    return (_loads or _resolve())(data)
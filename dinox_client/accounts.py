@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+多账号并发同步
+
+把多个账号（API Token + 检查点存储）的增量同步放到同一个事件循环中并发执行：
+全局并发数限制同时同步的账号数，每个服务器的请求并发由 DinoxConfig.server_concurrency 限制；
+最久未同步的账号优先，结果中报告每个账号的耗时与传输字节数。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Optional
+
+from .checkpoint import account_key
+from .config import DEFAULT_SYNC_TIME
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .checkpoint import CheckpointStore, SyncResult
+    from .client import DinoxClient
+
+
+@dataclass
+class SyncAccount:
+    """
+    一个待同步的账号
+
+    Attributes:
+        api_token: 账号的 API Token
+        checkpoint: 该账号的检查点存储
+        account: 检查点中的账号标识，默认由 Token 派生
+        on_notes: 持久化回调（必填），参见 DinoxClient.sync_notes()；回调成功后才提交检查点
+        template: 自定义笔记模板
+
+    Raises:
+        ValueError: 未提供 on_notes（否则检查点永远不会推进，每次都从头同步）
+    """
+    api_token: str
+    checkpoint: "CheckpointStore"
+    account: Optional[str] = None
+    on_notes: Optional[Callable[[List[Any]], Any]] = None
+    template: Optional[str] = None
+
+    def __post_init__(self):
+        if self.on_notes is None:
+            raise ValueError("SyncAccount requires on_notes; the checkpoint is only committed after it succeeds")
+        if self.account is None:
+            self.account = account_key(self.api_token)
+
+
+@dataclass
+class AccountSyncReport:
+    """
+    单个账号的同步报告
+
+    Attributes:
+        account: 账号标识
+        since: 同步前的检查点（None 表示从未同步）
+        result: 同步结果，失败时为 None
+        error: 同步失败时的异常
+        duration: 同步耗时（秒，不含排队等待）
+        requests: 请求数
+        wire_bytes: 传输字节数
+        decoded_bytes: 解压后字节数
+    """
+    account: str
+    since: Optional[str]
+    result: Optional["SyncResult"] = None
+    error: Optional[BaseException] = None
+    duration: float = 0.0
+    requests: int = 0
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def sync_accounts(
+    client: "DinoxClient",
+    accounts: Iterable[SyncAccount],
+    concurrency: int = 16,
+    skip_unchanged: bool = False,
+) -> List[AccountSyncReport]:
+    """
+    并发同步多个账号，报告按开始同步的顺序（最久未同步的在前）返回
+
+    单个账号失败不会影响其它账号，异常记录在报告的 error 中。
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    loop = asyncio.get_running_loop()
+    accounts = list(accounts)
+
+    def load_all():
+        return [account.checkpoint.load(account.account) for account in accounts]
+
+    # Checkpoint reads may touch disk; keep them off the event loop
+    checkpoints = await loop.run_in_executor(None, load_all)
+    queue = sorted(zip(checkpoints, range(len(accounts))), key=lambda item: (item[0] or DEFAULT_SYNC_TIME, item[1]))
+    reports: List[AccountSyncReport] = []
+
+    async def sync_one(account: SyncAccount, since: Optional[str]):
+        report = AccountSyncReport(account=account.account, since=since)
+        reports.append(report)
+        child = client.for_account(account.api_token)
+        started = time.monotonic()
+        try:
+            report.result = await child.sync_notes(
+                account.checkpoint,
+                on_notes=account.on_notes,
+                account=account.account,
+                template=account.template,
+                skip_unchanged=skip_unchanged,
+            )
+        except Exception as e:
+            report.error = e
+        finally:
+            report.duration = time.monotonic() - started
+            report.requests = child.metrics.requests
+            report.wire_bytes = child.metrics.wire_bytes
+            report.decoded_bytes = child.metrics.decoded_bytes
+            await child.close()
+
+    pending = iter(queue)
+
+    async def worker():
+        for since, position in pending:
+            await sync_one(accounts[position], since)
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(accounts)))))
+    return reports
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+内存映射的本地笔记归档
+
+数据文件按行追加保存笔记 JSON（同时也是合法的 NDJSON），索引文件是按 noteId 排序的
+定长记录 (noteId, offset, length)。读取端通过 mmap 映射两个文件并二分查找，
+查询不需要把笔记加载进进程内存，多个工作进程共享操作系统页缓存。
+
+写入端（通常是同步进程）只有一个：先追加数据并 fsync，再原子替换索引，
+读取端不会看到指向未落盘数据的索引。更新只追加新记录，旧记录保留在数据文件中。
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from . import _json
+from .partition import merge_days
+
+INDEX_MAGIC = b"DNXI"
+INDEX_VERSION = 1
+# magic, version, key width, entry count
+_HEADER = struct.Struct("<4sBHQ")
+# offset, length (follows the NUL-padded key)
+_LOCATION = struct.Struct("<QI")
+
+
+def _map(path: str) -> Optional[mmap.mmap]:
+    """只读映射文件；文件不存在或为空时返回 None"""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+
+
+class NoteArchive:
+    """
+    基于 mmap 的只追加笔记归档
+
+    Args:
+        path: 数据文件路径，索引保存在 path + ".idx"
+        refresh_interval: 读取端检查索引是否被写入端替换的最小间隔（秒）
+
+    示例用法:
+        archive = NoteArchive("notes.dnx")
+        await client.sync_notes(checkpoint, on_notes=archive.apply)
+
+        # 其它进程
+        note = NoteArchive("notes.dnx").get(note_id)
+    """
+
+    def __init__(self, path: str, refresh_interval: float = 1.0):
+        self.path = os.fspath(path)
+        self.index_path = self.path + ".idx"
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        # (index map, data map, key width, entry count), swapped as a whole so readers see a consistent view
+        self._view: Tuple[Optional[mmap.mmap], Optional[mmap.mmap], int, int] = (None, None, 0, 0)
+        self._index_id: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        self._entries: Optional[Dict[str, Tuple[int, int]]] = None  # writer-side copy of the index
+        self.refresh()
+
+    # ---------- 读取 ----------
+
+    def refresh(self):
+        """索引被替换后重新映射数据文件和索引"""
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                stat = os.stat(self.index_path)
+                index_id = (stat.st_ino, stat.st_mtime_ns)
+            except FileNotFoundError:
+                index_id = None
+            if index_id == self._index_id:
+                return
+            index = _map(self.index_path)
+            width = count = 0
+            if index is not None:
+                magic, version, width, count = _HEADER.unpack_from(index, 0)
+                if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                    index.close()
+                    raise ValueError(f"Not a note archive index: {self.index_path}")
+            # Map the data after the index so every indexed offset is covered.
+            # Old maps are not closed here: other threads or get_raw() views may still use them.
+            self._view = (index, _map(self.path), width, count)
+            self._index_id = index_id
+
+    def _maybe_refresh(self):
+        if time.monotonic() - self._checked >= self.refresh_interval:
+            self.refresh()
+
+    def _locate(self, note_id: str) -> Optional[Tuple[mmap.mmap, int, int]]:
+        self._maybe_refresh()
+        view = self._view
+        index, _, width, count = view
+        key = note_id.encode("utf-8")
+        if index is None or len(key) > width:
+            return None
+        key = key.ljust(width, b"\0")
+        entry_size = width + _LOCATION.size
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = _HEADER.size + mid * entry_size
+            if index[start:start + width] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = _HEADER.size + lo * entry_size
+        if lo >= count or index[start:start + width] != key:
+            return None
+        offset, length = _LOCATION.unpack_from(index, start + width)
+        return view[1], offset, length
+
+    def get_raw(self, note_id: str) -> Optional[memoryview]:
+        """返回笔记 JSON 的零拷贝视图（映射内存的切片），不存在时返回 None"""
+        location = self._locate(note_id)
+        if location is None:
+            return None
+        data, offset, length = location
+        return memoryview(data)[offset:offset + length]
+
+    def get(self, note_id: str) -> Optional[Dict[str, Any]]:
+        """返回解析后的笔记，不存在时返回 None"""
+        location = self._locate(note_id)
+        if location is None:
+            return None
+        data, offset, length = location
+        return _json.loads(data[offset:offset + length])
+
+    def __contains__(self, note_id: str) -> bool:
+        return self._locate(note_id) is not None
+
+    def __len__(self) -> int:
+        self._maybe_refresh()
+        return self._view[3]
+
+    def note_ids(self) -> Iterator[str]:
+        """按 noteId 排序遍历归档中的笔记 ID"""
+        self._maybe_refresh()
+        index, _, width, count = self._view
+        entry_size = width + _LOCATION.size
+        for i in range(count):
+            start = _HEADER.size + i * entry_size
+            yield index[start:start + width].rstrip(b"\0").decode("utf-8")
+
+    # ---------- 写入 ----------
+
+    def apply(self, days: Iterable[Dict[str, Any]]) -> int:
+        """
+        写入一批按日期分组的同步结果（可直接作为 sync_notes 的 on_notes 回调）
+
+        每条笔记只追加最新版本；isDel 的笔记从索引中移除。
+
+        Returns:
+            追加的记录数
+        """
+        entries = self._writer_entries()
+        appended = 0
+        removed = False
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path, "ab") as f:
+            for _, note in merge_days(days):
+                note_id = note.get("noteId")
+                if not note_id:
+                    continue
+                if note.get("isDel"):
+                    removed = entries.pop(note_id, None) is not None or removed
+                    continue
+                record = json.dumps(note, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                offset = f.tell()
+                f.write(record + b"\n")
+                entries[note_id] = (offset, len(record))
+                appended += 1
+            f.flush()
+            os.fsync(f.fileno())
+        if appended or removed:
+            self._write_index(entries)
+            self.refresh()
+        return appended
+
+    def _writer_entries(self) -> Dict[str, Tuple[int, int]]:
+        if self._entries is None:
+            self.refresh()
+            entries = {}
+            index, _, width, count = self._view
+            entry_size = width + _LOCATION.size
+            for i in range(count):
+                start = _HEADER.size + i * entry_size
+                key = index[start:start + width].rstrip(b"\0").decode("utf-8")
+                entries[key] = _LOCATION.unpack_from(index, start + width)
+            self._entries = entries
+        return self._entries
+
+    def _write_index(self, entries: Dict[str, Tuple[int, int]]):
+        keys = sorted((note_id.encode("utf-8"), location) for note_id, location in entries.items())
+        width = max((len(key) for key, _ in keys), default=0)
+        directory = os.path.dirname(os.path.abspath(self.index_path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".archive-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, width, len(keys)))
+                for key, (offset, length) in keys:
+                    f.write(key.ljust(width, b"\0"))
+                    f.write(_LOCATION.pack(offset, length))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.index_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        if hasattr(os, "O_DIRECTORY"):
+            # Persist the rename itself (POSIX only)
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def close(self):
+        """解除映射（之后的查询会重新映射）"""
+        with self._lock:
+            view, self._view = self._view, (None, None, 0, 0)
+            self._index_id = None
+        for mapped in view[:2]:
+            if mapped is not None:
+                try:
+                    mapped.close()
+                except BufferError:
+                    # A get_raw() view is still alive; the map is released with it
+                    pass
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+音频附件下载
+
+从同步到的笔记中提取 audioUrl / audioDetail.remote，并发下载到本地目录：
+- 最多 concurrency 个文件同时下载
+- 中断后用 HTTP Range 从 .part 文件末尾续传（If-Range 校验 ETag，文件变化时重新下载）
+- 分块流式写入磁盘，不在内存中缓存整个文件
+- 本地文件大小与 ETag 都和服务器一致时跳过
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from .checkpoint import iter_notes
+
+DOWNLOADED = "downloaded"
+RESUMED = "resumed"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+def iter_audio_urls(days: Iterable[Dict[str, Any]], include_deleted: bool = False) -> Iterator[Tuple[str, str]]:
+    """
+    从按日期分组的笔记中提取音频地址
+
+    Yields:
+        (noteId, url)，同一 URL 只产出一次
+    """
+    seen = set()
+    for note in iter_notes(days):
+        if note.get("isDel") and not include_deleted:
+            continue
+        detail = note.get("audioDetail")
+        url = note.get("audioUrl") or (detail.get("remote") if isinstance(detail, dict) else None)
+        if url and url not in seen:
+            seen.add(url)
+            yield note.get("noteId"), url
+
+
+@dataclass
+class DownloadResult:
+    """单个附件的下载结果"""
+    url: str
+    path: str
+    status: str
+    bytes: int = 0
+    error: Optional[str] = None
+
+
+class AudioDownloader:
+    """
+    音频附件并发下载器
+
+    示例用法:
+        async with AudioDownloader("backup/audio", concurrency=8) as downloader:
+            results = await downloader.download_all(url for _, url in iter_audio_urls(days))
+
+    Args:
+        dest_dir: 下载目录
+        concurrency: 最大并发下载数
+        chunk_size: 流式写入的块大小（字节）
+        timeout: 单个文件的超时设置，默认只限制连接和读取间隔，不限制总时长
+    """
+
+    def __init__(
+        self,
+        dest_dir: str,
+        concurrency: int = 4,
+        chunk_size: int = 64 * 1024,
+        timeout: aiohttp.ClientTimeout = None
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.dest_dir = os.fspath(dest_dir)
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.timeout = timeout or aiohttp.ClientTimeout(total=None, connect=30, sock_read=60)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def connect(self):
+        """创建 HTTP 会话（附件存放在 OSS，不发送 API Token）"""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=self.timeout, auto_decompress=False)
+
+    async def close(self):
+        """关闭 HTTP 会话"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def target_path(self, url: str) -> str:
+        """附件在本地的保存路径（使用 URL 中的文件名，缺失时使用 URL 摘要）"""
+        name = os.path.basename(urlparse(url).path)
+        if not name:
+            name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.dest_dir, name)
+
+    @staticmethod
+    def _read_meta(path: str) -> Dict[str, Any]:
+        try:
+            with open(path + ".meta", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_meta(path: str, meta: Dict[str, Any]):
+        with open(path + ".meta", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    async def _is_current(self, url: str, path: str) -> bool:
+        """本地文件存在且与服务器的大小、ETag 一致"""
+        if not os.path.exists(path):
+            return False
+        meta = self._read_meta(path)
+        async with self._session.head(url, allow_redirects=True) as response:
+            if response.status >= 400:
+                return False
+            length = response.headers.get("Content-Length")
+            etag = response.headers.get("ETag")
+        if length is not None and int(length) != os.path.getsize(path):
+            return False
+        if etag and meta.get("etag") and etag != meta["etag"]:
+            return False
+        return length is not None or bool(etag and etag == meta.get("etag"))
+
+    async def download(self, url: str) -> DownloadResult:
+        """下载单个附件（已存在且未变化时跳过，存在 .part 文件时续传）"""
+        await self.connect()
+        path = self.target_path(url)
+        part_path = path + ".part"
+        try:
+            if await self._is_current(url, path):
+                return DownloadResult(url=url, path=path, status=SKIPPED, bytes=os.path.getsize(path))
+
+            os.makedirs(self.dest_dir, exist_ok=True)
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            part_meta = self._read_meta(part_path)
+            headers = {"Accept-Encoding": "identity"}
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                if part_meta.get("etag"):
+                    headers["If-Range"] = part_meta["etag"]
+
+            async with self._session.get(url, headers=headers) as response:
+                if response.status == 416 and offset:
+                    # The partial file already holds the whole object
+                    written, resumed = 0, True
+                else:
+                    response.raise_for_status()
+                    resumed = response.status == 206
+                    if not resumed:
+                        offset = 0
+                    etag = response.headers.get("ETag")
+                    self._write_meta(part_path, {"etag": etag, "url": url})
+                    written = 0
+                    with open(part_path, "ab" if resumed else "wb") as f:
+                        async for chunk in response.content.iter_chunked(self.chunk_size):
+                            f.write(chunk)
+                            written += len(chunk)
+                        f.flush()
+                        os.fsync(f.fileno())
+
+            os.replace(part_path, path)
+            if os.path.exists(part_path + ".meta"):
+                os.replace(part_path + ".meta", path + ".meta")
+            else:
+                self._write_meta(path, {"url": url})
+            return DownloadResult(
+                url=url,
+                path=path,
+                status=RESUMED if resumed else DOWNLOADED,
+                bytes=written
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            return DownloadResult(url=url, path=path, status=FAILED, error=str(e) or type(e).__name__)
+
+    async def download_all(self, urls: Iterable[str]) -> List[DownloadResult]:
+        """以有界并发下载多个附件，结果顺序与输入一致"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(url: str) -> DownloadResult:
+            async with semaphore:
+                return await self.download(url)
+
+        return await asyncio.gather(*(bounded(url) for url in urls))
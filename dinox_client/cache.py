@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+内存结果缓存
+
+带 TTL 与容量上限（LRU 淘汰）的缓存，可选 stale-while-revalidate：
+过期但仍在 stale_ttl 宽限期内的条目可以先返回，再由调用方在后台刷新。
+
+ValidatorCache 保存响应的 ETag / Last-Modified，用于条件请求（304 Not Modified）。
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, NamedTuple, Optional, Tuple
+
+
+def normalize_keywords(keywords: Iterable[str]) -> Tuple[str, ...]:
+    """将关键词列表规范化为与顺序、大小写、首尾空白无关的缓存键"""
+    return tuple(sorted({k.strip().casefold() for k in keywords if k and k.strip()}))
+
+
+class CacheLookup(NamedTuple):
+    """缓存查询结果：hit 表示可用，stale 表示已过期、应在后台刷新"""
+    hit: bool
+    value: Any = None
+    stale: bool = False
+
+
+class TTLCache:
+    """
+    TTL + LRU 缓存
+
+    generation 在每次 clear() 时递增；写入时传入读取前的 generation，
+    可避免失效之前发起的请求把旧结果写回缓存。
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int = 128,
+        stale_ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if ttl <= 0:
+            raise ValueError("ttl must be > 0")
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = max(0.0, stale_ttl)
+        self.generation = 0
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> CacheLookup:
+        """查询缓存；超过 ttl + stale_ttl 的条目被删除并视为未命中"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = self._clock() - entry[0]
+            if age < self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return CacheLookup(True, entry[1], age >= self.ttl)
+            del self._entries[key]
+        self.misses += 1
+        return CacheLookup(False)
+
+    def put(self, key: Hashable, value: Any, generation: int = None):
+        """写入缓存；generation 与当前不一致（期间已失效）时丢弃"""
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (self._clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """清空缓存并使进行中的写入失效"""
+        self._entries.clear()
+        self.generation += 1
+
+
+class Validated(NamedTuple):
+    """带校验器的缓存结果"""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    value: Any
+
+    def headers(self) -> Dict[str, str]:
+        """再次请求时使用的条件请求头"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ValidatorCache:
+    """
+    条件请求缓存（LRU 淘汰）
+
+    条目不按时间过期，每次使用前都由服务器确认：请求带上 If-None-Match / If-Modified-Since，
+    服务器返回 304 时使用缓存结果。响应不含 ETag 和 Last-Modified 时不缓存。
+    hits 为 304 次数，misses 为收到完整响应的次数。
+    """
+
+    def __init__(self, maxsize: int = 128):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Validated]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Validated]:
+        """查询条目（不计入命中统计）"""
+        return self._entries.get(key)
+
+    def not_modified(self, key: Hashable, entry: Validated) -> Any:
+        """服务器确认 entry 未变化（304），返回缓存结果"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def put(self, key: Hashable, etag: Optional[str], last_modified: Optional[str], value: Any):
+        """记录完整响应；服务器未提供校验器时删除旧条目"""
+        self.misses += 1
+        if not etag and not last_modified:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = Validated(etag, last_modified, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """清空缓存"""
+        self._entries.clear()
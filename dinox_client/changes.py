@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+笔记变更事件
+
+ChangeTracker 维护每条笔记的内容摘要，把增量同步结果转换为去重后的
+created / updated / deleted 事件，供 DinoxClient.watch_changes() 和 sync_notes() 使用。
+只有 updateTime 变化而内容与元数据未变的笔记标记为 unchanged（无实际变更）。
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .checkpoint import normalize_sync_time
+from .partition import merge_days
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+UNCHANGED = "unchanged"
+
+# Metadata that participates in the content hash; timestamps are deliberately excluded
+DIGEST_FIELDS = ("title", "type")
+
+_FRONT_MATTER = re.compile(r"\A---\n.*?\n---\n", re.S)
+
+
+@dataclass
+class NoteChange:
+    """
+    一条笔记变更事件
+
+    Attributes:
+        kind: 变更类型，created / updated / deleted / unchanged
+        note_id: 笔记 ID
+        note: 服务器返回的笔记（deleted 事件中为删除标记记录）
+        update_time: 规范化后的 updateTime
+    """
+    kind: str
+    note_id: str
+    note: Dict[str, Any]
+    update_time: Optional[str] = None
+
+
+def _normalize_text(text: str) -> str:
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def note_digest(note: Dict[str, Any]) -> str:
+    """
+    笔记内容摘要（blake2b-128）
+
+    覆盖规范化后的正文（优先 contentMd；否则为去掉 front matter 的 content，
+    因为模板渲染的 front matter 含 updateTime）、标题、类型、标签、卡片盒和音频地址。
+    """
+    content = note.get("contentMd")
+    if content is None:
+        content = _FRONT_MATTER.sub("", note.get("content") or "", count=1)
+    audio = note.get("audioDetail") or {}
+    material = {field: note.get(field) for field in DIGEST_FIELDS}
+    material.update({
+        "content": _normalize_text(content or ""),
+        "tags": sorted(note.get("tags") or []),
+        "zettelBoxes": sorted(note.get("zettelBoxes") or []),
+        "audio": note.get("audioUrl") or (audio.get("remote") if isinstance(audio, dict) else None),
+    })
+    encoded = json.dumps(material, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def state_digest(note: Dict[str, Any]) -> str:
+    """笔记状态摘要：内容摘要 + 删除标记"""
+    return f"{note_digest(note)}|{bool(note.get('isDel'))}"
+
+
+def state_digests(notes: List[Dict[str, Any]]) -> List[str]:
+    """批量计算状态摘要（可在线程池或进程池中执行）"""
+    return [state_digest(note) for note in notes]
+
+
+class ChangeTracker:
+    """
+    把同步结果转换为去重的变更事件
+
+    Args:
+        digests: 初始状态摘要 {noteId: digest}，可用于从持久化状态恢复
+        since: 跟踪起点；没有摘要但 createTime 早于 since 的笔记在起点之前已存在，
+            其变化产出 updated 而不是 created
+    """
+
+    def __init__(self, digests: Dict[str, str] = None, since: str = None):
+        self.digests: Dict[str, str] = dict(digests or {})
+        self.since = normalize_sync_time(since) if since else None
+        self._deleted = {note_id for note_id, digest in self.digests.items() if digest.endswith("|True")}
+
+    def _existed_before(self, note: Dict[str, Any]) -> bool:
+        create_time = note.get("createTime")
+        return bool(self.since and create_time) and normalize_sync_time(create_time) < self.since
+
+    def apply(
+        self,
+        days: Iterable[Dict[str, Any]],
+        include_unchanged: bool = False,
+        digest: Callable[[Dict[str, Any]], str] = state_digest,
+    ) -> List[NoteChange]:
+        """
+        应用一批按日期分组的笔记，返回事件（按 updateTime 升序）
+
+        Args:
+            days: 按日期分组的笔记
+            include_unchanged: 是否为内容摘要未变化的笔记产出 unchanged 事件
+            digest: 状态摘要函数，可传入查找预先计算结果的函数
+        """
+        changes = []
+        for _, note in merge_days(days):
+            note_id = note.get("noteId")
+            if not note_id:
+                continue
+            current = digest(note)
+            previous = self.digests.get(note_id)
+            if previous == current:
+                kind = UNCHANGED
+                if not include_unchanged:
+                    continue
+            elif note.get("isDel"):
+                kind = DELETED
+                self._deleted.add(note_id)
+            elif previous is None and self._existed_before(note):
+                kind = UPDATED
+            elif previous is None or note_id in self._deleted:
+                kind = CREATED
+                self._deleted.discard(note_id)
+            else:
+                kind = UPDATED
+            self.digests[note_id] = current
+            update_time = note.get("updateTime") or note.get("createTime")
+            changes.append(NoteChange(
+                kind=kind,
+                note_id=note_id,
+                note=note,
+                update_time=normalize_sync_time(update_time) if update_time else None,
+            ))
+        return changes
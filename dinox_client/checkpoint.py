@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+增量同步检查点
+
+检查点记录每个账号已持久化笔记中最大的服务器 updateTime，
+只有在笔记成功持久化后才原子地提交，同步中断后可从上次位置继续。
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def account_key(api_token: str) -> str:
+    """由 API Token 派生账号标识（Token 本身不会写入磁盘）"""
+    return hashlib.sha256(api_token.encode("utf-8")).hexdigest()[:16]
+
+
+def normalize_sync_time(value: str) -> str:
+    """
+    将笔记时间规范为 lastSyncTime 格式 "YYYY-MM-DD HH:mm:ss"
+
+    同时兼容 "2025-10-18 17:09:25" 与 front matter 中的 "2025-10-18T17:09:25.029"
+    """
+    return value.replace("T", " ")[:19]
+
+
+def iter_notes(days: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+    """展开 get_notes_list 按日期分组的结果"""
+    for day in days:
+        for note in day.get("notes") or []:
+            yield note
+
+
+def max_update_time(days: Iterable[Dict[str, Any]]) -> Optional[str]:
+    """返回一批笔记中最大的 updateTime（规范化后），没有笔记时返回 None"""
+    latest = None
+    for note in iter_notes(days):
+        update_time = note.get("updateTime") or note.get("createTime")
+        if not update_time:
+            continue
+        update_time = normalize_sync_time(update_time)
+        if latest is None or update_time > latest:
+            latest = update_time
+    return latest
+
+
+@dataclass
+class SyncResult:
+    """
+    一次增量同步的结果
+
+    Attributes:
+        account: 账号标识
+        since: 本次同步起点
+        checkpoint: 同步后的检查点
+        days: 服务器返回的按日期分组的笔记
+        changes: 每条笔记的变更事件（NoteChange），内容未变的笔记为 unchanged
+        pending: 尚未提交的新检查点（未提供 on_notes 时由调用方持久化后通过 commit_sync() 提交）
+        digests: 与 pending 一起提交的内容摘要
+    """
+    account: str
+    since: str
+    checkpoint: str
+    days: List[Dict[str, Any]] = field(default_factory=list)
+    changes: List[Any] = field(default_factory=list)
+    pending: Optional[str] = None
+    digests: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def note_count(self) -> int:
+        """本次同步获取的笔记数"""
+        return sum(len(day.get("notes") or []) for day in self.days)
+
+    @property
+    def changed(self) -> List[Any]:
+        """内容确有变化的事件（不含 unchanged）"""
+        return [change for change in self.changes if change.kind != "unchanged"]
+
+    @property
+    def unchanged_ids(self) -> List[str]:
+        """只有 updateTime 变化、内容摘要相同的笔记 ID"""
+        return [change.note_id for change in self.changes if change.kind == "unchanged"]
+
+
+class CheckpointStore:
+    """
+    检查点存储基类
+
+    commit 保证检查点只会前进不会后退（时间字符串格式固定，可直接按字典序比较），
+    并与笔记内容摘要在同一次原子写入中提交。
+    """
+
+    def load(self, account: str) -> Optional[str]:
+        """读取账号的检查点，不存在时返回 None"""
+        raise NotImplementedError
+
+    def load_digests(self, account: str) -> Dict[str, str]:
+        """读取账号的笔记内容摘要 {noteId: digest}"""
+        raise NotImplementedError
+
+    def commit(self, account: str, sync_time: str, digests: Dict[str, str] = None):
+        """
+        原子地提交检查点与内容摘要
+
+        Args:
+            account: 账号标识
+            sync_time: 新检查点（比已有检查点旧时保持原值）
+            digests: 需要更新的内容摘要（增量合并）
+        """
+        raise NotImplementedError
+
+
+class FileCheckpointStore(CheckpointStore):
+    """
+    基于 JSON 文件的检查点存储
+
+    写入时先写临时文件并 fsync，再用 os.replace 原子替换，进程崩溃不会留下半写文件。
+
+    Args:
+        path: 检查点文件路径
+    """
+
+    def __init__(self, path: str):
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+
+    def _read_all(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"accounts": {}}
+
+    def load(self, account: str) -> Optional[str]:
+        entry = self._read_all().get("accounts", {}).get(account)
+        return entry["last_sync_time"] if entry else None
+
+    def load_digests(self, account: str) -> Dict[str, str]:
+        entry = self._read_all().get("accounts", {}).get(account)
+        return dict(entry.get("digests", {})) if entry else {}
+
+    def commit(self, account: str, sync_time: str, digests: Dict[str, str] = None):
+        with self._lock:
+            state = self._read_all()
+            accounts = state.setdefault("accounts", {})
+            current = accounts.get(account) or {}
+            advanced = sync_time > current.get("last_sync_time", "")
+            if not advanced and not digests:
+                return
+            entry = {
+                "last_sync_time": sync_time if advanced else current["last_sync_time"],
+                "committed_at": datetime.now().isoformat(timespec="seconds"),
+                "digests": dict(current.get("digests", {})),
+            }
+            entry["digests"].update(digests or {})
+            accounts[account] = entry
+            self._atomic_write(state)
+
+    def _atomic_write(self, state: Dict[str, Any]):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".checkpoint-", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        if hasattr(os, "O_DIRECTORY"):
+            # Persist the rename itself (POSIX only)
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """
+    基于 SQLite 表的检查点存储，适合与本地 SQLite 笔记库放在同一个数据库文件中
+
+    Args:
+        path: 数据库文件路径
+        table: 检查点表名
+    """
+
+    def __init__(self, path: str, table: str = "dinox_sync_checkpoints"):
+        import sqlite3
+
+        self.path = os.fspath(path)
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            " account TEXT PRIMARY KEY,"
+            " last_sync_time TEXT NOT NULL,"
+            " committed_at TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table}_digests ("
+            " account TEXT NOT NULL,"
+            " note_id TEXT NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " PRIMARY KEY (account, note_id))"
+        )
+
+    def load(self, account: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT last_sync_time FROM {self.table} WHERE account = ?", (account,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def load_digests(self, account: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT note_id, digest FROM {self.table}_digests WHERE account = ?", (account,)
+            ).fetchall()
+        return dict(rows)
+
+    def commit(self, account: str, sync_time: str, digests: Dict[str, str] = None):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    f"INSERT INTO {self.table} (account, last_sync_time, committed_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(account) DO UPDATE SET "
+                    " last_sync_time = excluded.last_sync_time,"
+                    " committed_at = excluded.committed_at "
+                    "WHERE excluded.last_sync_time > last_sync_time",
+                    (account, sync_time, datetime.now().isoformat(timespec="seconds")),
+                )
+                if digests:
+                    self._conn.executemany(
+                        f"INSERT OR REPLACE INTO {self.table}_digests (account, note_id, digest) VALUES (?, ?, ?)",
+                        [(account, note_id, digest) for note_id, digest in digests.items()],
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
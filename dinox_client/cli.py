@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+dinox 命令行工具
+
+结果以 NDJSON（每行一个 JSON 对象）流式写到标准输出，适合在 shell 管道中处理大账号：
+
+    dinox sync --since "2025-10-01 00:00:00" | jq -r .title
+    dinox sync --checkpoint state.json --concurrency 8 >> notes.ndjson
+    dinox get 0199eb0d-... 0199f690-...
+    jq -r .noteId notes.ndjson | dinox get --concurrency 16
+    dinox search Python 异步
+    dinox export ./vault --checkpoint vault.json
+    dinox health
+
+API Token 通过 --token 或环境变量 DINOX_API_TOKEN（支持 .env 文件）提供。
+"""
+
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+
+from ._compat import fix_windows_console
+from .client import DinoxClient
+from .config import DEFAULT_SYNC_TIME, METHOD_SERVER_MAP, DinoxConfig
+from .errors import DinoxAPIError
+
+# Note IDs read from stdin per iter_notes_by_ids() call
+_GET_CHUNK_SIZE = 1000
+# Windows persisted concurrently by sync/export --checkpoint
+_WINDOW_CONCURRENCY = 4
+
+
+def _emit(record: Any):
+    """写出一行 NDJSON 并立即刷新，下游可以边读边处理"""
+    sys.stdout.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    sys.stdout.flush()
+
+
+def _read_lines(values: List[str]) -> Iterable[str]:
+    """命令行参数为空或为 "-" 时逐行读取标准输入"""
+    if values and values != ["-"]:
+        return values
+    return (line.strip() for line in sys.stdin if line.strip())
+
+
+async def _stream_notes(
+    client: DinoxClient,
+    args: argparse.Namespace,
+    handle: Callable[[List[Dict[str, Any]]], None]
+):
+    """
+    按批把笔记交给 handle：指定 --checkpoint 时按时间窗口并发处理并推进检查点，
+    否则从 --since 拉取一次后按日期逐批处理
+    """
+    if args.checkpoint:
+        from .checkpoint import FileCheckpointStore
+
+        await client.sync_notes_windowed(
+            FileCheckpointStore(args.checkpoint),
+            on_window=lambda sync_window: handle(_flatten(sync_window.days)),
+            window=timedelta(days=args.window_days),
+            concurrency=args.concurrency or _WINDOW_CONCURRENCY
+        )
+        return
+    days = await client.get_notes_list(last_sync_time=args.since)
+    # Release each day once it has been written
+    days.reverse()
+    while days:
+        handle(_flatten([days.pop()]))
+
+
+def _flatten(days: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """按日期分组的笔记展开为笔记列表，每条笔记带上所属日期"""
+    return [dict(note, date=day.get("date")) for day in days for note in day.get("notes", [])]
+
+
+async def _cmd_sync(client: DinoxClient, args: argparse.Namespace) -> int:
+    """每条笔记输出一行"""
+    def handle(notes: List[Dict[str, Any]]):
+        for note in notes:
+            _emit(note)
+
+    await _stream_notes(client, args, handle)
+    return 0
+
+
+async def _cmd_export(client: DinoxClient, args: argparse.Namespace) -> int:
+    """把笔记写为 <noteId>.md（已删除的笔记删除对应文件），每个文件输出一行"""
+    os.makedirs(args.directory, exist_ok=True)
+
+    def handle(notes: List[Dict[str, Any]]):
+        for note in notes:
+            note_id = str(note.get("noteId", ""))
+            if not note_id or os.path.basename(note_id) != note_id or note_id.startswith("."):
+                _emit({"noteId": note_id, "action": "skipped", "reason": "invalid noteId"})
+                continue
+            path = os.path.join(args.directory, f"{note_id}.md")
+            if note.get("isDel"):
+                if os.path.exists(path):
+                    os.remove(path)
+                _emit({"noteId": note_id, "action": "deleted", "path": path})
+                continue
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(note.get("content") or "")
+            os.replace(tmp_path, path)
+            _emit({"noteId": note_id, "action": "written", "path": path, "updateTime": note.get("updateTime")})
+
+    await _stream_notes(client, args, handle)
+    return 0
+
+
+async def _cmd_get(client: DinoxClient, args: argparse.Namespace) -> int:
+    """
+    按完成顺序每个输入行输出一行（重复的 ID 只请求一次，但每次出现都输出），
+    不存在的笔记 found 为 false；有笔记不存在时返回 1
+    """
+    missing = 0
+    note_ids = iter(_read_lines(args.note_ids))
+    # iter_notes_by_ids deduplicates its whole input up front, so feed stdin in chunks
+    while True:
+        chunk = list(itertools.islice(note_ids, _GET_CHUNK_SIZE))
+        if not chunk:
+            break
+        occurrences = collections.Counter(chunk)
+        async for note_id, result in client.iter_notes_by_ids(chunk, args.concurrency):
+            if result is None:
+                record = {"noteId": note_id, "found": False}
+                missing += occurrences[note_id]
+            else:
+                record = {"noteId": note_id, "found": True, "note": result.get("data", result)}
+            for _ in range(occurrences[note_id]):
+                _emit(record)
+    return 1 if missing else 0
+
+
+async def _cmd_search(client: DinoxClient, args: argparse.Namespace) -> int:
+    """
+    命令行关键词作为一次查询；未提供时从标准输入逐行读取查询（每行空白分隔的关键词），
+    最多 --concurrency 个查询同时进行，按完成顺序输出
+    """
+    if args.keywords:
+        queries: Iterable[List[str]] = [args.keywords]
+    else:
+        queries = (line.split() for line in _read_lines([]))
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def search(keywords: List[str]) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                result = await client.search_notes(keywords)
+            except DinoxAPIError as e:
+                return {"keywords": keywords, "error": e.code, "message": e.message}
+        return {"keywords": keywords, "result": result.get("data", result)}
+
+    failed = 0
+    pending = set()
+    for keywords in queries:
+        pending.add(asyncio.ensure_future(search(keywords)))
+        # Keep at most a few batches of queries in memory while reading stdin
+        while len(pending) >= args.concurrency * 2:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            failed += _emit_done(done)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        failed += _emit_done(done)
+    return 1 if failed else 0
+
+
+def _emit_done(tasks: Iterable["asyncio.Future"]) -> int:
+    failed = 0
+    for task in tasks:
+        record = task.result()
+        failed += "error" in record
+        _emit(record)
+    return failed
+
+
+_HEALTH_CHECKS: Dict[str, Callable[[DinoxClient], Awaitable[Any]]] = {
+    "get_notes_list": lambda c: c.get_notes_list(last_sync_time=c.format_sync_time()),
+    "get_zettelboxes": lambda c: c.get_zettelboxes(),
+    "search_notes": lambda c: c.search_notes(["test"]),
+}
+
+
+async def _cmd_health(client: DinoxClient, args: argparse.Namespace) -> int:
+    """并发检查各端点，每个端点输出一行；有失败时返回 1"""
+    async def check(name: str, call: Callable[[DinoxClient], Awaitable[Any]]) -> Dict[str, Any]:
+        record: Dict[str, Any] = {"check": name, "server": METHOD_SERVER_MAP.get(name)}
+        started = time.monotonic()
+        try:
+            await call(client)
+            record["ok"] = True
+        except DinoxAPIError as e:
+            record.update(ok=False, error=e.code, message=e.message, status=e.status_code)
+        record["latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+        return record
+
+    failed = 0
+    for future in asyncio.as_completed([check(name, call) for name, call in _HEALTH_CHECKS.items()]):
+        record = await future
+        failed += not record["ok"]
+        _emit(record)
+    return 1 if failed else 0
+
+
+_COMMANDS = {
+    "sync": _cmd_sync,
+    "export": _cmd_export,
+    "get": _cmd_get,
+    "search": _cmd_search,
+    "health": _cmd_health,
+}
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be >= 1")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="dinox", description="Dinox 笔记命令行工具（NDJSON 输出）")
+    parser.add_argument("--token", default=None, help="API Token（默认读取环境变量 DINOX_API_TOKEN）")
+    parser.add_argument("--timeout", type=int, default=30, help="单次请求超时（秒）")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+
+    concurrency = argparse.ArgumentParser(add_help=False)
+    concurrency.add_argument("--concurrency", type=_positive_int, default=4, help="最大并发数（默认 4）")
+
+    notes = argparse.ArgumentParser(add_help=False)
+    notes.add_argument(
+        "--concurrency", type=_positive_int, default=None,
+        help=f"--checkpoint 模式同时处理的窗口数（默认 {_WINDOW_CONCURRENCY}，仅与 --checkpoint 一起使用）"
+    )
+    source = notes.add_mutually_exclusive_group()
+    source.add_argument("--since", default=DEFAULT_SYNC_TIME, help="起始同步时间 YYYY-MM-DD HH:mm:ss")
+    source.add_argument("--checkpoint", help="检查点文件；从上次位置继续并在每批处理后推进")
+    notes.add_argument("--window-days", type=_positive_int, default=30, help="--checkpoint 模式的时间窗口（天）")
+
+    commands.add_parser("sync", parents=[notes], help="输出笔记，每行一条")
+    export = commands.add_parser("export", parents=[notes], help="导出笔记为 Markdown 文件")
+    export.add_argument("directory", help="输出目录")
+    get = commands.add_parser("get", parents=[concurrency], help="按 ID 查询笔记")
+    get.add_argument("note_ids", nargs="*", metavar="NOTE_ID", help="笔记 ID（省略或为 - 时从标准输入逐行读取）")
+    search = commands.add_parser("search", parents=[concurrency], help="按关键词搜索笔记")
+    search.add_argument("keywords", nargs="*", metavar="KEYWORD", help="关键词（省略时从标准输入逐行读取查询）")
+    commands.add_parser("health", help="检查各端点状态")
+    return parser
+
+
+async def _run(args: argparse.Namespace, token: str) -> int:
+    async with DinoxClient(config=DinoxConfig(api_token=token, timeout=args.timeout)) as client:
+        return await _COMMANDS[args.command](client, args)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口
+
+    Returns:
+        退出码：0 成功，1 API 错误或部分失败，2 参数错误
+    """
+    fix_windows_console()
+    load_dotenv()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command in ("sync", "export") and args.concurrency is not None and not args.checkpoint:
+        # Without a checkpoint the notes arrive in a single request; there is nothing to parallelise
+        parser.error("--concurrency requires --checkpoint")
+    token = args.token or os.environ.get("DINOX_API_TOKEN")
+    if not token:
+        parser.error("API token is required (--token or DINOX_API_TOKEN)")
+    try:
+        return asyncio.run(_run(args, token))
+    except DinoxAPIError as e:
+        sys.stderr.write(json.dumps({"error": e.code, "message": e.message}, ensure_ascii=False) + "\n")
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # The reader went away (e.g. `dinox sync | head`); silence the flush at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1777 @@
+# -*- coding: utf-8 -*-
+"""
+Dinox API 异步客户端
+
+一个用于与 Dinox AI 笔记服务交互的异步 Python 客户端库。
+
+Author: Dinox Team
+License: MIT
+Version: 0.3.0
+"""
+
+import aiohttp
+import asyncio
+import dataclasses
+from typing import List, Dict, Any, Optional, Callable, Awaitable, AsyncIterator, Hashable, Iterable, Tuple
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+import inspect
+from contextvars import ContextVar
+import gzip
+import hashlib
+import json
+import time
+import zlib
+from typing import TYPE_CHECKING
+
+from . import _compat, _json
+from .config import (
+    BULK,
+    DEFAULT_SYNC_TIME,
+    IDEMPOTENT_METHODS,
+    METHOD_PRIORITIES,
+    METHOD_SERVER_MAP,
+    NORMAL,
+    PRIORITIES,
+    NOTE_SERVER_URL,
+    RETRYABLE_STATUS_CODES,
+    DinoxConfig,
+    DinoxTimeout,
+)
+from .cache import TTLCache, Validated, ValidatorCache, normalize_keywords
+from .errors import DinoxAPIError
+from .limiter import AdaptiveLimiter, ConcurrencyLimiter
+from .metrics import ClientMetrics, HedgeBudget, LatencyTracker, RequestMetrics
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .checkpoint import CheckpointStore, SyncResult
+    from .attachments import DownloadResult
+    from .changes import NoteChange
+    from .partition import SyncWindow
+    from .store import NoteStore
+    from .outbox import OutboxItem, SQLiteOutbox
+    from .monitor import LoopMonitor
+    from .accounts import AccountSyncReport, SyncAccount
+
+
+# Per-context deadline (time.monotonic() value) and per-call timeout override
+_deadline_var = ContextVar("dinox_deadline", default=None)
+_call_timeout_var = ContextVar("dinox_call_timeout", default=None)
+# Extra headers for requests made in the current context (e.g. outbox idempotency keys)
+_extra_headers_var = ContextVar("dinox_extra_headers", default=None)
+# Priority class for requests made in the current context (None: per-method default)
+_priority_var = ContextVar("dinox_priority", default=None)
+
+# aiohttp's default connection pool size; limits servers without an explicit cap when
+# capacity is reserved for interactive requests
+_POOL_LIMIT = 100
+
+
+def _decode_body(body: bytes, encoding: str) -> bytes:
+    """按 Content-Encoding 解压响应体"""
+    encoding = encoding.strip().lower()
+    if encoding in ("", "identity"):
+        return body
+    if encoding in ("gzip", "x-gzip"):
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Some servers send raw deflate streams without the zlib header
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    if encoding == "br":
+        brotli = _compat.load_brotli()
+        if brotli is not None:
+            return brotli.decompress(body)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def _decode_and_parse(body: bytes, encoding: str, charset: str) -> Tuple[str, Any, int]:
+    """
+    解压并解析 JSON 响应体，可在线程池或进程池中执行
+
+    Returns:
+        (结果类型, 值, 解压后字节数)：("ok", 解析结果) / ("decode", 错误信息) / ("json", 响应文本)
+    """
+    try:
+        decoded = _decode_body(body, encoding)
+    except (ValueError, OSError, zlib.error) as e:
+        return "decode", str(e), 0
+    text = decoded.decode(charset, errors="replace")
+    try:
+        return "ok", _json.loads(text), len(decoded)
+    except ValueError:
+        return "json", text[:100], len(decoded)
+
+
+class DinoxClient:
+    """
+    Dinox API 异步客户端
+    
+    示例用法:
+        async with DinoxClient(api_token="your_token") as client:
+            notes = await client.get_notes_list()
+            print(f"获取到 {len(notes)} 天的笔记")
+    """
+    
+    def __init__(self, api_token: str = None, config: DinoxConfig = None):
+        """
+        初始化 Dinox 客户端 (v0.2.0+ 自动服务器路由)
+        
+        Args:
+            api_token: API Token (JWT格式)
+            config: DinoxConfig 配置对象，如果提供则忽略 api_token
+        
+        Note:
+            v0.2.0+ 客户端自动根据调用的方法选择正确的服务器，无需手动配置
+        """
+        if config:
+            self.config = config
+        elif api_token:
+            self.config = DinoxConfig(api_token=api_token)
+        else:
+            raise ValueError("Either api_token or config must be provided")
+        
+        self.note_session: Optional[aiohttp.ClientSession] = None  # Note server session
+        self.ai_session: Optional[aiohttp.ClientSession] = None    # AI server session
+        self._current_method: Optional[str] = None  # Track current method for auto-routing
+        self._latency = LatencyTracker()
+        self._hedge_budget = HedgeBudget(self.config.hedge_budget)
+        self.hedge_stats: Dict[str, int] = {"hedged": 0, "hedge_wins": 0}
+        self.metrics = ClientMetrics()
+        self._store: Optional["NoteStore"] = None
+        self._search_cache: Optional[TTLCache] = None
+        if self.config.search_cache_ttl > 0:
+            self._search_cache = TTLCache(
+                self.config.search_cache_ttl,
+                maxsize=self.config.search_cache_size,
+                stale_ttl=self.config.search_cache_stale_ttl,
+            )
+        self._token_scope: Optional[str] = None
+        self.conditional_cache: Optional[ValidatorCache] = None
+        if self.config.conditional_cache_size > 0:
+            self.conditional_cache = ValidatorCache(self.config.conditional_cache_size)
+        self._search_refreshes: Dict[tuple, asyncio.Task] = {}
+        self._outbox_tasks: List[asyncio.Task] = []
+        self._note_flights: Dict[str, asyncio.Future] = {}
+        self.loop_monitor: Optional["LoopMonitor"] = None
+        self._server_slots: Dict[str, ConcurrencyLimiter] = {
+            server_url: self._new_limiter(server_url) for server_url in self.config.server_concurrency
+        }
+        self.metrics.limiters = self._server_slots
+        self._parent: Optional["DinoxClient"] = None  # set on clients derived with for_account()
+    
+    def for_account(self, api_token: str) -> "DinoxClient":
+        """
+        派生使用另一个 API Token 的客户端
+        
+        派生客户端复用本客户端的 HTTP 会话（连接池）与 server_concurrency 限制，
+        其余配置相同；关闭派生客户端不会关闭共享会话。
+        
+        Example:
+            >>> async with DinoxClient(config=config) as client:
+            ...     notes = await client.for_account(other_token).get_notes_list()
+        """
+        child = DinoxClient(config=dataclasses.replace(self.config, api_token=api_token))
+        child._parent = self
+        child._server_slots = child.metrics.limiters = self._server_slots
+        return child
+    
+    def _new_limiter(self, server_url: str) -> ConcurrencyLimiter:
+        config = self.config
+        limit = config.server_concurrency.get(server_url)
+        if not config.adaptive_concurrency:
+            return ConcurrencyLimiter(limit or _POOL_LIMIT, reserved=config.reserved_interactive)
+        max_limit = limit or config.adaptive_max_concurrency
+        return AdaptiveLimiter(
+            initial=min(config.adaptive_initial_concurrency, max_limit),
+            max_limit=max_limit,
+            latency_tolerance=config.adaptive_latency_tolerance,
+            reserved=config.reserved_interactive
+        )
+    
+    def _limiter(self, server_url: str) -> Optional[ConcurrencyLimiter]:
+        """返回服务器的并发限制器；启用自适应并发或保留 interactive 名额时按需创建"""
+        limiter = self._server_slots.get(server_url)
+        if limiter is None and (self.config.adaptive_concurrency or self.config.reserved_interactive):
+            limiter = self._server_slots[server_url] = self._new_limiter(server_url)
+        return limiter
+    
+    @contextmanager
+    def priority(self, priority: str):
+        """
+        设置代码块内请求的优先级（interactive / normal / bulk）
+        
+        未设置时 get_note_by_id、search_notes、get_zettelboxes 为 interactive，其余为 normal；
+        create_notes、drain_outbox、sync_accounts 等批量方法默认为 bulk。
+        优先级随 asyncio 任务上下文传递，仅在请求需要排队等待并发名额时生效。
+        
+        Example:
+            >>> with client.priority("bulk"):
+            ...     await client.update_note(note_id, content)
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        token = _priority_var.set(priority)
+        try:
+            yield
+        finally:
+            _priority_var.reset(token)
+    
+    @contextmanager
+    def _default_priority(self, priority: str):
+        """调用方未指定优先级时，为代码块内的请求设置默认优先级"""
+        if _priority_var.get() is not None:
+            yield
+            return
+        with self.priority(priority):
+            yield
+    
+    @property
+    def store(self) -> "NoteStore":
+        """
+        本地卡片盒/标签索引（config.index_notes 为 True 时由 get_notes_list 的结果增量维护）
+        
+        索引只保存在内存中，只覆盖本客户端本次进程内拉取过的笔记。基于检查点的同步在新进程中
+        只返回增量，此时索引是不完整的；需要完整索引时先从头拉取一次（不带检查点）。
+        
+        Example:
+            >>> await client.get_notes_list()  # 从头拉取全部笔记
+            >>> note_ids = client.store.notes_in_box("读书笔记")
+        """
+        if self._store is None:
+            from .store import NoteStore
+            self._store = NoteStore()
+        return self._store
+    
+    async def __aenter__(self):
+        """异步上下文管理器入口"""
+        await self.connect()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """异步上下文管理器退出"""
+        await self.close()
+    
+    async def connect(self, warmup: bool = False):
+        """
+        创建 HTTP 会话 (自动为两个服务器创建独立会话)
+        
+        Args:
+            warmup: 为 True 时返回前调用 warmup() 预先建立连接，首个请求无需再等待 DNS/TCP/TLS
+        """
+        if self._parent is not None:
+            await self._parent.connect(warmup=warmup)
+            self.note_session = self._parent.note_session
+            self.ai_session = self._parent.ai_session
+            return
+        timeout = aiohttp.ClientTimeout(
+            total=self.config.timeout,
+            connect=self.config.connect_timeout,
+            sock_read=self.config.read_timeout
+        )
+        
+        # Create separate sessions for each server; bodies are decoded in _send
+        # so that wire bytes can be measured
+        if self.note_session is None:
+            self.note_session = aiohttp.ClientSession(
+                timeout=timeout, auto_decompress=False, connector=self._new_connector()
+            )
+        if self.ai_session is None:
+            self.ai_session = aiohttp.ClientSession(
+                timeout=timeout, auto_decompress=False, connector=self._new_connector()
+            )
+        if warmup:
+            await self.warmup()
+    
+    def _new_connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(limit=_POOL_LIMIT, ttl_dns_cache=self.config.dns_cache_ttl)
+    
+    async def warmup(self, connections: Optional[int] = None) -> Dict[str, int]:
+        """
+        预热连接池：并行解析 DNS，并向每个服务器建立 keep-alive 连接
+        
+        每个连接发送一个不带 Token 的 HEAD 请求，响应状态码不影响结果；连接失败不会抛出异常，
+        只反映在返回的连接数中。空闲连接在服务器关闭 keep-alive 前可被后续请求复用；
+        服务器不保持连接时只预热 DNS 缓存。
+        
+        Args:
+            connections: 每个服务器的连接数，默认为 config.warmup_connections
+            
+        Returns:
+            {服务器地址: 成功建立的连接数}
+        
+        Example:
+            >>> client = DinoxClient(api_token="your_token")
+            >>> await client.connect(warmup=True)
+        """
+        if not self.note_session or not self.ai_session:
+            await self.connect()
+        if connections is None:
+            connections = self.config.warmup_connections
+        servers = sorted(set(METHOD_SERVER_MAP.values()))
+        
+        async def open_connection(server_url: str) -> bool:
+            session = self.note_session if server_url == NOTE_SERVER_URL else self.ai_session
+            try:
+                async with session.head(server_url, allow_redirects=False) as response:
+                    await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return False
+            return True
+        
+        # All requests start in the same loop iteration, so none of them can find an idle
+        # connection and each one opens its own
+        targets = [server_url for server_url in servers for _ in range(connections)]
+        opened = await asyncio.gather(*(open_connection(server_url) for server_url in targets))
+        warmed = dict.fromkeys(servers, 0)
+        for server_url, ok in zip(targets, opened):
+            warmed[server_url] += ok
+        return warmed
+    
+    async def close(self):
+        """关闭 HTTP 会话"""
+        for task in list(self._search_refreshes.values()):
+            task.cancel()
+        self._search_refreshes.clear()
+        for task in self._outbox_tasks:
+            task.cancel()
+        self._outbox_tasks.clear()
+        if self.loop_monitor is not None:
+            await self.loop_monitor.stop()
+        if self._parent is not None:
+            # Sessions belong to the parent client
+            self.note_session = self.ai_session = None
+            return
+        if self.note_session:
+            await self.note_session.close()
+            self.note_session = None
+        if self.ai_session:
+            await self.ai_session.close()
+            self.ai_session = None
+    
+    def _get_headers(self, extra_headers: Dict[str, str] = None) -> Dict[str, str]:
+        """
+        获取请求头
+        
+        Args:
+            extra_headers: 额外的请求头
+            
+        Returns:
+            完整的请求头字典
+        """
+        headers = {
+            "Authorization": self.config.api_token,
+            "Content-Type": "application/json",
+            "Accept-Encoding": _compat.accept_encoding()
+        }
+        context_headers = _extra_headers_var.get()
+        if context_headers:
+            headers.update(context_headers)
+        if extra_headers:
+            headers.update(extra_headers)
+        return headers
+    
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Dict[str, Any] = None,
+        params: Dict[str, Any] = None,
+        extra_headers: Dict[str, str] = None,
+        cache_key: Hashable = None
+    ) -> Dict[str, Any]:
+        """
+        发送 HTTP 请求 (v0.2.0+ 自动服务器路由)
+        
+        幂等方法在网络错误、超时、429/5xx 时按 config.max_retries 指数退避重试，
+        重试过程受 deadline() 约束，总耗时不会超过调用方的预算。
+        
+        Args:
+            method: HTTP 方法 (GET, POST, PUT, DELETE)
+            endpoint: API 端点路径
+            data: 请求体数据
+            params: URL 参数
+            extra_headers: 额外的请求头
+            cache_key: 条件请求缓存键；启用 conditional_cache 时带上已保存的校验器
+            
+        Returns:
+            响应 JSON 数据
+            
+        Raises:
+            DinoxAPIError: API 错误
+        """
+        # Capture the method name before any await so concurrent calls can't clobber it
+        method_name = self._current_method
+        priority = _priority_var.get() or METHOD_PRIORITIES.get(method_name, NORMAL)
+        
+        # Ensure sessions are created
+        if not self.note_session or not self.ai_session:
+            await self.connect()
+        
+        prepare_started = time.monotonic()
+        # Automatic routing based on the current method
+        if method_name and method_name in METHOD_SERVER_MAP:
+            server_url = METHOD_SERVER_MAP[method_name]
+            session = self.note_session if server_url == NOTE_SERVER_URL else self.ai_session
+        else:
+            # Default to note server for unknown methods
+            server_url = NOTE_SERVER_URL
+            session = self.note_session
+        
+        url = f"{server_url}{endpoint}"
+        headers = self._get_headers(extra_headers)
+        revalidate = None
+        if cache_key is not None and self.conditional_cache is not None:
+            entry = self.conditional_cache.get(cache_key)
+            if entry is not None:
+                headers.update(entry.headers())
+            revalidate = (cache_key, entry)
+        prepare_time = time.monotonic() - prepare_started
+        
+        deadline = _deadline_var.get()
+        retries = self.config.max_retries if method_name in IDEMPOTENT_METHODS else 0
+        hedged = method_name in self.config.hedge_methods
+        attempt = 0
+        while True:
+            timeout = self._resolve_timeout(method_name, deadline)
+            
+            async def send_once():
+                limiter = self._limiter(server_url)
+                if limiter is not None:
+                    await limiter.acquire(priority)
+                overloaded = False
+                started = time.monotonic()
+                try:
+                    result = await self._send(
+                        method_name, session, method, url, data, params, headers, timeout, prepare_time,
+                        revalidate
+                    )
+                    self._latency.record(method_name, time.monotonic() - started)
+                    return result
+                except DinoxAPIError as e:
+                    overloaded = self._is_retryable(e)
+                    raise
+                finally:
+                    if limiter is not None:
+                        limiter.release(time.monotonic() - started, overloaded, method_name)
+            
+            try:
+                if hedged:
+                    return await self._send_hedged(method_name, send_once)
+                return await send_once()
+            except DinoxAPIError as e:
+                if e.code == "TIMEOUT" and deadline is not None and time.monotonic() >= deadline:
+                    raise DinoxAPIError(
+                        code="DEADLINE_EXCEEDED",
+                        message=f"Deadline exceeded after {attempt + 1} attempt(s): {e.message}",
+                        status_code=e.status_code
+                    ) from e
+                if attempt >= retries or not self._is_retryable(e):
+                    raise
+                delay = self.config.retry_backoff * (2 ** attempt)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+    
+    async def _send(
+        self,
+        method_name: Optional[str],
+        session: aiohttp.ClientSession,
+        method: str,
+        url: str,
+        data: Optional[Dict[str, Any]],
+        params: Optional[Dict[str, Any]],
+        headers: Dict[str, str],
+        timeout: aiohttp.ClientTimeout,
+        prepare_time: float = 0.0,
+        revalidate: Optional[Tuple[Hashable, Optional[Validated]]] = None
+    ) -> Dict[str, Any]:
+        """
+        发送单次 HTTP 请求并解析响应（不含重试），记录字节数与网络/客户端耗时
+        
+        revalidate 为 (缓存键, 已保存的条目) 时，304 返回缓存结果，成功响应连同校验器写入 conditional_cache
+        """
+        monitor = self.loop_monitor
+        lag_before = monitor.total_lag if monitor is not None else 0.0
+        started = time.monotonic()
+        try:
+            async with session.request(
+                method=method,
+                url=url,
+                json=data,
+                params=params,
+                headers=headers,
+                timeout=timeout
+            ) as response:
+                body = await response.read()
+                parse_started = time.monotonic()
+                content_encoding = response.headers.get("Content-Encoding", "")
+                metrics = RequestMetrics(
+                    method=method_name,
+                    status=response.status,
+                    elapsed=0.0,
+                    wire_bytes=len(body),
+                    decoded_bytes=0,
+                    content_encoding=content_encoding,
+                    prepare_time=prepare_time,
+                    network_time=parse_started - started
+                )
+                try:
+                    if revalidate is not None and revalidate[1] is not None and response.status == 304:
+                        return self.conditional_cache.not_modified(*revalidate)
+                    threshold = self.config.offload_threshold
+                    if response.status < 400 and threshold is not None and len(body) >= threshold:
+                        result = await self._parse_offloaded(metrics, body, response.charset or "utf-8")
+                    else:
+                        result = self._parse_response(metrics, body, response.charset or "utf-8")
+                    if revalidate is not None:
+                        self.conditional_cache.put(
+                            revalidate[0],
+                            response.headers.get("ETag"),
+                            response.headers.get("Last-Modified"),
+                            result
+                        )
+                    return result
+                finally:
+                    finished = time.monotonic()
+                    metrics.parse_time = finished - parse_started
+                    metrics.elapsed = finished - started
+                    if monitor is not None:
+                        metrics.loop_lag = monitor.total_lag - lag_before
+                    self.metrics.record(metrics)
+        
+        except asyncio.TimeoutError:
+            raise DinoxAPIError(
+                code="TIMEOUT",
+                message=f"Request timed out: {method} {url}"
+            )
+        except aiohttp.ClientError as e:
+            raise DinoxAPIError(
+                code="NETWORK_ERROR",
+                message=f"Network error: {str(e)}"
+            )
+    
+    def _parse_response(self, metrics: RequestMetrics, body: bytes, charset: str) -> Dict[str, Any]:
+        """在事件循环内解压并解析响应"""
+        status = metrics.status
+        try:
+            decoded = _decode_body(body, metrics.content_encoding)
+        except (ValueError, OSError, zlib.error) as e:
+            raise DinoxAPIError(
+                code="DECODE_ERROR",
+                message=f"Failed to decode response body: {e}",
+                status_code=status
+            )
+        metrics.decoded_bytes = len(decoded)
+        response_text = decoded.decode(charset, errors="replace")
+        
+        # 检查 HTTP 状态码
+        if status >= 400:
+            try:
+                error_data = json.loads(response_text)
+                error_msg = error_data.get('msg', response_text)
+                error_code = error_data.get('code', str(status))
+            except json.JSONDecodeError:
+                error_msg = response_text
+                error_code = str(status)
+            
+            raise DinoxAPIError(
+                code=error_code,
+                message=error_msg,
+                status_code=status
+            )
+        
+        # 解析响应
+        try:
+            result = _json.loads(response_text)
+        except ValueError:
+            raise DinoxAPIError(
+                code="INVALID_JSON",
+                message=f"Invalid JSON response: {response_text[:100]}",
+                status_code=status
+            )
+        
+        self._check_business_code(result, status)
+        return result
+    
+    async def _parse_offloaded(self, metrics: RequestMetrics, body: bytes, charset: str) -> Dict[str, Any]:
+        """在 offload_executor 中解压并解析大响应，事件循环只等待结果"""
+        loop = asyncio.get_running_loop()
+        kind, value, decoded_bytes = await loop.run_in_executor(
+            self.config.offload_executor, _decode_and_parse, body, metrics.content_encoding, charset
+        )
+        if kind == "decode":
+            raise DinoxAPIError(
+                code="DECODE_ERROR",
+                message=f"Failed to decode response body: {value}",
+                status_code=metrics.status
+            )
+        metrics.decoded_bytes = decoded_bytes
+        if kind == "json":
+            raise DinoxAPIError(
+                code="INVALID_JSON",
+                message=f"Invalid JSON response: {value}",
+                status_code=metrics.status
+            )
+        self._check_business_code(value, metrics.status)
+        return value
+    
+    @staticmethod
+    def _check_business_code(result: Any, status: int):
+        """检查业务错误码"""
+        if isinstance(result, dict):
+            code = result.get('code')
+            if code and code != "000000":
+                raise DinoxAPIError(
+                    code=code,
+                    message=result.get('msg', 'Unknown error'),
+                    status_code=status
+                )
+    
+    async def _send_hedged(
+        self,
+        method_name: str,
+        send_once: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        发送对冲请求：主请求超过延迟阈值仍未返回时，在预算允许的情况下再发一份，
+        采用先成功的结果并取消另一个
+        """
+        self._hedge_budget.deposit()
+        delay = self._latency.percentile(method_name, self.config.hedge_percentile)
+        if delay is None:
+            delay = self.config.hedge_delay
+        
+        tasks = [asyncio.ensure_future(send_once())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._hedge_budget.withdraw():
+                return await tasks[0]
+            
+            self.hedge_stats["hedged"] += 1
+            tasks.append(asyncio.ensure_future(send_once()))
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is tasks[1]:
+                            self.hedge_stats["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _resolve_timeout(self, method_name: Optional[str], deadline: Optional[float]) -> aiohttp.ClientTimeout:
+        """
+        计算单次请求的超时：调用级 > 方法级 > 全局配置，并用剩余 deadline 截断 total
+        
+        Raises:
+            DinoxAPIError: deadline 已过期 (DEADLINE_EXCEEDED)
+        """
+        total = self.config.timeout
+        connect = self.config.connect_timeout
+        sock_read = self.config.read_timeout
+        
+        for override in (self.config.method_timeouts.get(method_name), _call_timeout_var.get()):
+            if override is None:
+                continue
+            if not isinstance(override, DinoxTimeout):
+                override = DinoxTimeout(total=override)
+            if override.total is not None:
+                total = override.total
+            if override.connect is not None:
+                connect = override.connect
+            if override.sock_read is not None:
+                sock_read = override.sock_read
+        
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DinoxAPIError(
+                    code="DEADLINE_EXCEEDED",
+                    message="Deadline exceeded before request was sent"
+                )
+            total = remaining if total is None else min(total, remaining)
+        
+        return aiohttp.ClientTimeout(total=total, connect=connect, sock_read=sock_read)
+    
+    @staticmethod
+    def _is_retryable(error: DinoxAPIError) -> bool:
+        """判断错误是否值得重试（仅用于幂等方法）"""
+        if error.code in ("NETWORK_ERROR", "TIMEOUT"):
+            return True
+        return error.status_code in RETRYABLE_STATUS_CODES
+    
+    @contextmanager
+    def deadline(self, seconds: float):
+        """
+        为代码块内的所有请求（含重试）设置截止时间
+        
+        嵌套使用时取更早的截止时间；截止时间随 asyncio 任务上下文传递。
+        
+        Args:
+            seconds: 从现在起的可用时间（秒）
+            
+        Example:
+            >>> with client.deadline(2.0):
+            ...     note = await client.get_note_by_id(note_id)
+        """
+        deadline = time.monotonic() + seconds
+        current = _deadline_var.get()
+        if current is not None:
+            deadline = min(deadline, current)
+        token = _deadline_var.set(deadline)
+        try:
+            yield
+        finally:
+            _deadline_var.reset(token)
+    
+    @contextmanager
+    def call_timeout(
+        self,
+        total: Optional[float] = None,
+        connect: Optional[float] = None,
+        sock_read: Optional[float] = None
+    ):
+        """
+        为代码块内的请求临时覆盖超时设置（优先级高于 method_timeouts）
+        
+        Example:
+            >>> with client.call_timeout(total=0.8, connect=0.2):
+            ...     note = await client.get_note_by_id(note_id)
+        """
+        token = _call_timeout_var.set(DinoxTimeout(total=total, connect=connect, sock_read=sock_read))
+        try:
+            yield
+        finally:
+            _call_timeout_var.reset(token)
+    
+    # ==================== 笔记查询接口 ====================
+    
+    async def get_notes_list(
+        self,
+        last_sync_time: str = DEFAULT_SYNC_TIME,
+        template: str = None
+    ) -> List[Dict[str, Any]]:
+        """
+        获取笔记列表（支持增量同步）
+        
+        Args:
+            last_sync_time: 上次同步时间，格式 YYYY-MM-DD HH:mm:ss
+            template: Mustache 模板字符串，如果不提供则使用默认模板
+            
+        Returns:
+            按日期分组的笔记列表
+            
+        Example:
+            >>> notes = await client.get_notes_list()
+            >>> for day_note in notes:
+            ...     print(f"日期: {day_note['date']}")
+            ...     print(f"笔记数: {len(day_note['notes'])}")
+        """
+        self._current_method = "get_notes_list"  # Set method for auto-routing
+        if template is None:
+            template = self._get_default_template()
+        
+        data = {
+            "noteId": 0,
+            "lastSyncTime": last_sync_time,
+            "template": template
+        }
+        
+        result = await self._request("POST", "/openapi/v5/notes", data=data)
+        days = result.get('data', [])
+        if self.config.index_notes:
+            await self._index_days(days)
+        return days
+    
+    async def get_note_by_id(self, note_id: str) -> Dict[str, Any]:
+        """
+        根据 ID 查询笔记
+        
+        Args:
+            note_id: 笔记 ID
+            
+        Returns:
+            笔记详情
+            
+        Example:
+            >>> note = await client.get_note_by_id("0199eb0d-fccc-7dc8-82da-7d32be3e668b")
+            >>> print(note['title'])
+        """
+        # Single-flight: concurrent lookups of the same note share one request
+        flight = self._note_flights.get(note_id)
+        if flight is None:
+            flight = asyncio.ensure_future(self._fetch_note(note_id))
+            self._note_flights[note_id] = flight
+            flight.add_done_callback(lambda f: self._finish_note_flight(note_id, f))
+        return await asyncio.shield(flight)
+    
+    async def _fetch_note(self, note_id: str) -> Dict[str, Any]:
+        return await self._cached_get("get_note_by_id", f"/api/openapi/note/{note_id}", ("note", note_id))
+    
+    async def _cached_get(self, method_name: str, endpoint: str, cache_key: tuple) -> Dict[str, Any]:
+        """
+        可缓存的 GET 读请求：config.response_cache 中有未过期的结果时不访问网络，
+        否则发送请求（启用 conditional_cache 时为条件请求）并写回磁盘缓存
+        """
+        disk_cache = self.config.response_cache
+        if disk_cache is None:
+            self._current_method = method_name  # Set method for auto-routing
+            return await self._request("GET", endpoint, cache_key=cache_key)
+        loop = asyncio.get_running_loop()
+        key = self._response_cache_key(cache_key)
+        cached = await loop.run_in_executor(None, disk_cache.get, key)
+        if cached is not None:
+            return cached
+        self._current_method = method_name  # Set method for auto-routing
+        result = await self._request("GET", endpoint, cache_key=cache_key)
+        await loop.run_in_executor(None, disk_cache.put, key, result)
+        return result
+    
+    def _response_cache_key(self, cache_key: tuple) -> str:
+        """磁盘缓存键：按 API Token 的摘要隔离不同账号"""
+        if self._token_scope is None:
+            self._token_scope = hashlib.sha256(self.config.api_token.encode("utf-8")).hexdigest()[:32]
+        return ":".join((self._token_scope,) + tuple(str(part) for part in cache_key))
+    
+    def _finish_note_flight(self, note_id: str, flight: asyncio.Future):
+        self._note_flights.pop(note_id, None)
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not flight.cancelled():
+            flight.exception()
+    
+    async def get_notes_by_ids(self, note_ids: Iterable[str], concurrency: int = 8) -> List[Optional[Dict[str, Any]]]:
+        """
+        批量查询笔记（滑动窗口并发）
+        
+        最多 concurrency 个请求同时进行，一个完成立即补上下一个；结果与输入顺序一致，
+        不存在的笔记（404）为 None。重复 ID 只请求一次。
+        
+        Args:
+            note_ids: 笔记 ID 列表
+            concurrency: 最大并发请求数
+            
+        Returns:
+            与 note_ids 一一对应的笔记详情列表
+            
+        Example:
+            >>> notes = await client.get_notes_by_ids(ids, concurrency=16)
+        """
+        note_ids = list(note_ids)
+        found = {}
+        async for note_id, note in self.iter_notes_by_ids(note_ids, concurrency=concurrency):
+            found[note_id] = note
+        return [found[note_id] for note_id in note_ids]
+    
+    async def iter_notes_by_ids(
+        self,
+        note_ids: Iterable[str],
+        concurrency: int = 8
+    ) -> AsyncIterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        批量查询笔记，按完成顺序产出 (note_id, 笔记详情或 None)
+        
+        Example:
+            >>> async for note_id, note in client.iter_notes_by_ids(ids):
+            ...     render(note_id, note)
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        
+        async def lookup(note_id: str):
+            try:
+                return note_id, await self.get_note_by_id(note_id)
+            except DinoxAPIError as e:
+                if e.status_code == 404:
+                    return note_id, None
+                raise
+        
+        pending_ids = iter(dict.fromkeys(note_ids))
+        in_flight = set()
+        try:
+            while True:
+                for note_id in pending_ids:
+                    in_flight.add(asyncio.ensure_future(lookup(note_id)))
+                    if len(in_flight) >= concurrency:
+                        break
+                if not in_flight:
+                    return
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in in_flight:
+                task.cancel()
+    
+    async def search_notes(self, keywords: List[str]) -> Dict[str, Any]:
+        """
+        根据关键词查询笔记
+        
+        Args:
+            keywords: 关键词列表
+            
+        Returns:
+            包含搜索结果的字典，包含 'content' 字段
+            
+        Example:
+            >>> result = await client.search_notes(["Python", "异步"])
+            >>> print(result['content'])
+        
+        Note:
+            配置 search_cache_ttl 后结果按规范化的关键词集合缓存，返回的字典与缓存共享，请勿修改。
+        """
+        cache = self._search_cache
+        if cache is None:
+            return await self._search(keywords)
+        
+        key = normalize_keywords(keywords)
+        lookup = cache.get(key)
+        if lookup.hit:
+            if lookup.stale and key not in self._search_refreshes:
+                self._search_refreshes[key] = asyncio.ensure_future(self._refresh_search(key, keywords))
+            return lookup.value
+        
+        generation = cache.generation
+        result = await self._search(keywords)
+        cache.put(key, result, generation)
+        return result
+    
+    async def _search(self, keywords: List[str]) -> Dict[str, Any]:
+        """直接请求搜索接口（不经过缓存）"""
+        self._current_method = "search_notes"  # Set method for auto-routing
+        data = {"keywords": keywords}
+        result = await self._request("POST", "/api/openapi/searchNotes", data=data)
+        return result.get('data', {})
+    
+    async def _refresh_search(self, key: tuple, keywords: List[str]):
+        """后台刷新过期的搜索结果；失败时保留旧结果直到宽限期结束"""
+        cache = self._search_cache
+        try:
+            generation = cache.generation
+            cache.put(key, await self._search(keywords), generation)
+        except DinoxAPIError:
+            pass
+        finally:
+            self._search_refreshes.pop(key, None)
+    
+    def invalidate_search_cache(self):
+        """清空搜索缓存（其它客户端或进程修改笔记后可手动调用）"""
+        if self._search_cache is not None:
+            self._search_cache.clear()
+    
+    # ==================== 笔记创建/更新接口 ====================
+    
+    async def create_text_note(self, content: str) -> Dict[str, Any]:
+        """
+        创建文字笔记
+        
+        ⚠️ 注意：此接口当前有功能限制，可能返回"转写失败"错误
+        
+        Args:
+            content: 笔记内容
+            
+        Returns:
+            创建结果
+            
+        Raises:
+            DinoxAPIError: 可能返回错误码 0000029 "转写失败"
+            
+        Example:
+            >>> result = await client.create_text_note("这是一条测试笔记")
+            >>> print(result)
+        """
+        self._current_method = "create_text_note"  # Set method for auto-routing
+        data = {"content": content}
+        try:
+            result = await self._request("POST", "/openapi/text/input", data=data)
+        finally:
+            # The write may have landed even if the response was lost
+            self.invalidate_search_cache()
+        return result
+    
+    async def create_note(
+        self,
+        content: str,
+        note_type: str = "note",
+        zettelbox_ids: List[str] = None,
+        title: str = None,
+        tags: List[str] = None
+    ) -> Dict[str, Any]:
+        """
+        创建笔记（支持卡片盒）
+        
+        Args:
+            content: 笔记内容（Markdown 格式）
+            note_type: 笔记类型 ("note" 或 "crawl")
+            zettelbox_ids: 卡片盒 ID 列表
+            title: 标题
+            tags: 标签列表
+            
+        Returns:
+            创建结果
+            
+        Example:
+            >>> result = await client.create_note(
+            ...     content="# 测试笔记\\n\\n这是内容",
+            ...     zettelbox_ids=["box-id-1"],
+            ...     title="测试笔记",
+            ...     tags=["python"]
+            ... )
+        """
+        self._current_method = "create_note"  # Set method for auto-routing
+        data = {
+            "type": note_type,
+            "content": content,
+            "zettelboxIds": zettelbox_ids or [],
+            "tags": tags or [],
+            "title": title or ""
+        }
+        try:
+            result = await self._request("POST", "/api/openapi/createNote", data=data)
+        finally:
+            # The write may have landed even if the response was lost
+            self.invalidate_search_cache()
+        return result
+    
+    async def create_notes(
+        self,
+        notes: Iterable[Dict[str, Any]],
+        concurrency: int = 1,
+        update: bool = False,
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        批量创建带标题/标签的笔记
+        
+        标题和标签随 create_note 一起发送，每条笔记只需一次请求。update=True 是为忽略
+        创建请求中标题/标签的服务器保留的回退：创建后再用 update_note 写入（content 作为 contentMd
+        重新发送），第 N 条的更新与第 N+1 条的创建并行。
+        
+        Args:
+            notes: 笔记字典，键为 content 以及可选的 title、tags、zettelbox_ids、note_type
+            concurrency: 同时进行的创建请求数（以及更新请求数）；为 1 时按输入顺序创建
+            update: 是否在创建后再用 update_note 写入标题和标签（仅对提供了 title/tags 的笔记，默认关闭）
+            return_exceptions: 为 True 时失败的笔记以异常对象出现在结果中，否则遇到第一个错误即取消其余请求并抛出
+            
+        Returns:
+            与输入顺序一致的创建结果列表
+            
+        Example:
+            >>> results = await client.create_notes([
+            ...     {"content": "# A", "title": "A", "tags": ["import"]},
+            ...     {"content": "# B", "title": "B", "tags": ["import"]},
+            ... ])
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        create_slots = asyncio.Semaphore(concurrency)
+        update_slots = asyncio.Semaphore(concurrency)
+        
+        async def process(note: Dict[str, Any]) -> Dict[str, Any]:
+            title, tags = note.get("title"), note.get("tags")
+            async with create_slots:
+                result = await self.create_note(
+                    content=note["content"],
+                    note_type=note.get("note_type", "note"),
+                    zettelbox_ids=note.get("zettelbox_ids"),
+                    title=title,
+                    tags=tags
+                )
+            if update and (title is not None or tags is not None):
+                async with update_slots:
+                    await self.update_note(self._created_note_id(result), note["content"], tags=tags, title=title)
+            return result
+        
+        # Tasks acquire the create semaphore in submission order, so creates stay ordered
+        with self._default_priority(BULK):
+            tasks = [asyncio.ensure_future(process(note)) for note in notes]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @staticmethod
+    def _created_note_id(result: Dict[str, Any]) -> str:
+        """从创建结果中取出新笔记 ID"""
+        data = result.get("data") if isinstance(result, dict) else None
+        if isinstance(data, dict):
+            note_id = data.get("noteId") or data.get("id")
+        else:
+            note_id = data
+        if not note_id or not isinstance(note_id, str):
+            raise DinoxAPIError("NO_NOTE_ID", "Create response did not include a note ID")
+        return note_id
+    
+    async def update_note(
+        self,
+        note_id: str,
+        content_md: str,
+        tags: List[str] = None,
+        title: str = None
+    ) -> Dict[str, Any]:
+        """
+        更新笔记
+        
+        Args:
+            note_id: 笔记 ID
+            content_md: 笔记内容（Markdown 格式）
+            tags: 标签列表
+            title: 标题
+            
+        Returns:
+            更新结果
+            
+        Example:
+            >>> result = await client.update_note(
+            ...     note_id="0199eb0d-fccc-7dc8-82da-7d32be3e668b",
+            ...     content_md="更新后的内容",
+            ...     tags=["test"],
+            ...     title="New Title"
+            ... )
+        """
+        self._current_method = "update_note"  # Set method for auto-routing
+        data = {
+            "noteId": note_id,
+            "contentMd": content_md
+        }
+        if tags is not None:
+            data["tags"] = tags
+        if title is not None:
+            data["title"] = title
+            
+        try:
+            result = await self._request("POST", "/api/openapi/updateNote", data=data)
+        finally:
+            # The write may have landed even if the response was lost
+            self.invalidate_search_cache()
+            if self.config.response_cache is not None:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.config.response_cache.delete, self._response_cache_key(("note", note_id))
+                )
+        return result
+    
+    # ==================== 卡片盒接口 ====================
+    
+    async def get_zettelboxes(self) -> List[Dict[str, Any]]:
+        """
+        获取卡片盒列表
+        
+        Returns:
+            卡片盒列表
+            
+        Example:
+            >>> boxes = await client.get_zettelboxes()
+            >>> for box in boxes:
+            ...     print(box['name'])
+        """
+        result = await self._cached_get("get_zettelboxes", "/api/openapi/zettelboxes", ("zettelboxes",))
+        return result.get('data', [])
+    
+    # ==================== 增量同步 ====================
+    
+    async def sync_notes(
+        self,
+        checkpoint: "CheckpointStore",
+        on_notes: Callable[[List[Dict[str, Any]]], Any] = None,
+        account: str = None,
+        template: str = None,
+        skip_unchanged: bool = False
+    ) -> "SyncResult":
+        """
+        基于检查点的增量同步
+        
+        从检查点（首次为 1900-01-01 00:00:00）拉取笔记，交给 on_notes 持久化，
+        持久化成功后才把本批笔记中最大的服务器 updateTime 提交为新检查点。
+        on_notes 抛出异常或进程中断时检查点不变，下次同步从同一位置继续。
+        未提供 on_notes 时不提交检查点：新检查点保存在 SyncResult.pending 中，
+        调用方持久化 result.days 后调用 commit_sync() 提交。
+        
+        每条笔记的内容摘要与检查点一起保存：只有 updateTime 变化、内容与元数据未变的笔记
+        在 SyncResult.changes 中标记为 unchanged，skip_unchanged=True 时不再交给 on_notes。
+        
+        Args:
+            checkpoint: 检查点存储（FileCheckpointStore / SQLiteCheckpointStore）
+            on_notes: 持久化回调，参数为按日期分组的笔记列表，可以是同步函数或协程函数；
+                为 None 时不提交检查点
+            account: 账号标识，默认由 API Token 派生
+            template: Mustache 模板字符串
+            skip_unchanged: 是否从交给 on_notes 的笔记中剔除内容未变的笔记
+            
+        Returns:
+            SyncResult，包含本次起点、新检查点（或待提交的 pending）、笔记和变更事件
+            
+        Example:
+            >>> store = FileCheckpointStore("dinox_checkpoint.json")
+            >>> result = await client.sync_notes(store, on_notes=save_to_db, skip_unchanged=True)
+            >>> print(len(result.changed), len(result.unchanged_ids), result.checkpoint)
+        """
+        from .changes import UNCHANGED, ChangeTracker
+        from .checkpoint import SyncResult, account_key, max_update_time
+        
+        account = account or account_key(self.config.api_token)
+        since, digests = await self._load_checkpoint(checkpoint, account)
+        days = await self.get_notes_list(last_sync_time=since, template=template)
+        
+        tracker = ChangeTracker(digests)
+        changes = tracker.apply(days, include_unchanged=True, digest=await self._digest_function(days))
+        
+        if on_notes is not None:
+            batch = days
+            if skip_unchanged:
+                unchanged = {change.note_id for change in changes if change.kind == UNCHANGED}
+                batch = []
+                for day in days:
+                    notes = [note for note in day.get("notes") or [] if note.get("noteId") not in unchanged]
+                    if notes:
+                        batch.append(dict(day, notes=notes))
+            await self._invoke(on_notes, batch)
+        
+        digests = {
+            change.note_id: tracker.digests[change.note_id]
+            for change in changes if change.kind != UNCHANGED
+        }
+        latest = max_update_time(days)
+        committed = latest if latest is not None and latest > since else since
+        result = SyncResult(account=account, since=since, checkpoint=since, days=days, changes=changes)
+        if committed != since or digests:
+            result.pending, result.digests = committed, digests
+            if on_notes is not None:
+                await self.commit_sync(checkpoint, result)
+        return result
+    
+    @staticmethod
+    async def _load_checkpoint(checkpoint: "CheckpointStore", account: str) -> Tuple[str, Dict[str, str]]:
+        """读取账号的检查点（默认 DEFAULT_SYNC_TIME）与内容摘要"""
+        def load():
+            return checkpoint.load(account) or DEFAULT_SYNC_TIME, checkpoint.load_digests(account)
+        
+        # Reads parse the digest file or wait on the store lock behind another commit's fsync
+        return await asyncio.get_running_loop().run_in_executor(None, load)
+    
+    async def commit_sync(self, checkpoint: "CheckpointStore", result: "SyncResult"):
+        """
+        提交 sync_notes() 未提交的检查点与内容摘要（result.pending），在调用方持久化 result.days 之后调用
+        
+        Example:
+            >>> result = await client.sync_notes(store)
+            >>> save_to_db(result.days)
+            >>> await client.commit_sync(store, result)
+        """
+        if result.pending is None:
+            return
+        # fsync may take a while; keep it off the event loop
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, checkpoint.commit, result.account, result.pending, result.digests)
+        result.checkpoint = max(result.checkpoint, result.pending)
+        result.pending = None
+    
+    async def sync_notes_windowed(
+        self,
+        checkpoint: "CheckpointStore",
+        on_window: Callable[["SyncWindow"], Any],
+        window: timedelta = timedelta(days=30),
+        concurrency: int = 4,
+        account: str = None,
+        template: str = None
+    ) -> "SyncResult":
+        """
+        按时间窗口分区的增量同步，适合大账号的首次全量同步
+        
+        笔记按 updateTime 划分到长度为 window 的时间窗口，最多 concurrency 个窗口并发交给
+        on_window 持久化。检查点与窗口内笔记的内容摘要只推进到连续完成的窗口末尾：某个窗口
+        失败时，之前的窗口仍然生效，下次同步从第一个未完成的窗口开始请求。
+        
+        注意：笔记列表接口只支持下界 lastSyncTime，窗口划分在客户端完成，服务端仍是一次请求；
+        大账号请同时通过 method_timeouts 放宽 get_notes_list 的超时。
+        
+        Args:
+            checkpoint: 检查点存储
+            on_window: 持久化回调，参数为 SyncWindow，可以是同步函数或协程函数
+            window: 窗口长度
+            concurrency: 最多并发处理的窗口数
+            account: 账号标识，默认由 API Token 派生
+            template: Mustache 模板字符串
+            
+        Returns:
+            SyncResult，checkpoint 为已连续完成窗口中最大的 updateTime
+            
+        Raises:
+            第一个失败窗口的异常（已完成的前缀窗口检查点已提交）
+        """
+        from .changes import ChangeTracker
+        from .checkpoint import SyncResult, account_key
+        from .partition import partition_days
+        
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        account = account or account_key(self.config.api_token)
+        since, digests = await self._load_checkpoint(checkpoint, account)
+        days = await self.get_notes_list(last_sync_time=since, template=template)
+        windows = partition_days(days, window)
+        
+        # Digests of the notes that changed in each window, committed with that window
+        tracker = ChangeTracker(digests)
+        digest = await self._digest_function(days)
+        window_digests = []
+        for sync_window in windows:
+            changes = tracker.apply(sync_window.days, digest=digest)
+            window_digests.append({change.note_id: tracker.digests[change.note_id] for change in changes})
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        commit_lock = asyncio.Lock()
+        finished = [False] * len(windows)
+        state = {"next": 0, "committed": since}
+        loop = asyncio.get_event_loop()
+        
+        async def process(index: int, sync_window: "SyncWindow"):
+            async with semaphore:
+                await self._invoke(on_window, sync_window)
+            async with commit_lock:
+                finished[index] = True
+                latest = None
+                digests = {}
+                while state["next"] < len(windows) and finished[state["next"]]:
+                    latest = windows[state["next"]].latest or latest
+                    digests.update(window_digests[state["next"]])
+                    state["next"] += 1
+                committed = latest if latest is not None and latest > state["committed"] else state["committed"]
+                if committed != state["committed"] or digests:
+                    await loop.run_in_executor(None, checkpoint.commit, account, committed, digests)
+                    state["committed"] = committed
+        
+        results = await asyncio.gather(
+            *(process(index, sync_window) for index, sync_window in enumerate(windows)),
+            return_exceptions=True
+        )
+        for outcome in results:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        
+        return SyncResult(account=account, since=since, checkpoint=state["committed"], days=days)
+    
+    async def watch_changes(
+        self,
+        since: str = None,
+        min_interval: float = 5.0,
+        max_interval: float = 300.0,
+        backoff: float = 2.0,
+        template: str = None,
+        include_unchanged: bool = False,
+        checkpoint: "CheckpointStore" = None,
+        account: str = None
+    ) -> AsyncIterator["NoteChange"]:
+        """
+        监听笔记变更的异步生成器
+        
+        以 lastSyncTime 增量轮询笔记列表：有变更时保持 min_interval，空闲时按 backoff 倍数
+        逐步放慢到 max_interval。每条笔记按 noteId 与内容摘要去重，只在内容或元数据变化时产生
+        created / updated / deleted 事件；createTime 早于 since 的笔记首次出现时产出 updated。
+        可重试的错误（网络、超时、429/5xx）会退避后继续轮询。
+        
+        指定 checkpoint 时从其中的检查点与内容摘要继续，重启后不会把已见过的笔记再次作为
+        created 产出；一轮轮询的事件全部被消费（生成器被再次迭代）后才提交检查点与摘要。
+        
+        Args:
+            since: 起始同步时间，默认为 checkpoint 中的检查点或从头开始
+                （从头开始时首次轮询会把所有已有笔记作为 created 事件产出）
+            min_interval: 最短轮询间隔（秒）
+            max_interval: 最长轮询间隔（秒）
+            backoff: 空闲时的间隔增长倍数
+            template: Mustache 模板字符串
+            include_unchanged: 是否为只有 updateTime 变化的笔记产出 unchanged 事件
+            checkpoint: 检查点存储，用于跨进程重启恢复
+            account: 检查点中的账号标识，默认由 API Token 派生
+            
+        Yields:
+            NoteChange 事件
+            
+        Example:
+            >>> async for change in client.watch_changes(since="2025-10-01 00:00:00"):
+            ...     print(change.kind, change.note_id)
+        """
+        from .changes import UNCHANGED, ChangeTracker
+        from .checkpoint import account_key, max_update_time
+        
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Require 0 < min_interval <= max_interval")
+        digests: Dict[str, str] = {}
+        if checkpoint is not None:
+            account = account or account_key(self.config.api_token)
+            stored, digests = await self._load_checkpoint(checkpoint, account)
+            since = since or stored
+        cursor = since or DEFAULT_SYNC_TIME
+        tracker = ChangeTracker(digests, since=cursor)
+        committed = cursor
+        loop = asyncio.get_running_loop()
+        interval = min_interval
+        while True:
+            try:
+                days = await self.get_notes_list(last_sync_time=cursor, template=template)
+            except DinoxAPIError as e:
+                if not self._is_retryable(e):
+                    raise
+                interval = min(max_interval, interval * backoff)
+                await asyncio.sleep(interval)
+                continue
+            
+            changes = tracker.apply(days, include_unchanged=include_unchanged, digest=await self._digest_function(days))
+            latest = max_update_time(days)
+            if latest is not None and latest > cursor:
+                cursor = latest
+            for change in changes:
+                yield change
+            if checkpoint is not None:
+                changed = {c.note_id: tracker.digests[c.note_id] for c in changes if c.kind != UNCHANGED}
+                if changed or cursor != committed:
+                    # Every event of this poll has been consumed
+                    await loop.run_in_executor(None, checkpoint.commit, account, cursor, changed)
+                    committed = cursor
+            
+            active = any(change.kind != "unchanged" for change in changes)
+            interval = min_interval if active else min(max_interval, interval * backoff)
+            await asyncio.sleep(interval)
+    
+    # ==================== 附件下载 ====================
+    
+    async def download_audio(
+        self,
+        days: List[Dict[str, Any]],
+        dest_dir: str,
+        concurrency: int = 4,
+        include_deleted: bool = False
+    ) -> List["DownloadResult"]:
+        """
+        下载笔记中的录音附件（audioUrl / audioDetail.remote）
+        
+        有界并发、HTTP Range 续传、流式写盘；本地文件与服务器大小和 ETag 一致时跳过。
+        单个文件失败不会中断其它下载，结果中 status 为 "failed"，再次调用时从断点续传。
+        
+        Args:
+            days: get_notes_list / sync_notes 返回的按日期分组的笔记
+            dest_dir: 下载目录
+            concurrency: 最大并发下载数
+            include_deleted: 是否包含已删除笔记的录音
+            
+        Returns:
+            DownloadResult 列表（status: downloaded / resumed / skipped / failed）
+            
+        Example:
+            >>> notes = await client.get_notes_list()
+            >>> results = await client.download_audio(notes, "backup/audio", concurrency=8)
+            >>> print(sum(r.status == "failed" for r in results), "个失败")
+        """
+        from .attachments import AudioDownloader, iter_audio_urls
+        
+        urls = [url for _, url in iter_audio_urls(days, include_deleted=include_deleted)]
+        async with AudioDownloader(dest_dir, concurrency=concurrency) as downloader:
+            return await downloader.download_all(urls)
+    
+    async def sync_accounts(
+        self,
+        accounts: Iterable["SyncAccount"],
+        concurrency: int = 16,
+        skip_unchanged: bool = False
+    ) -> List["AccountSyncReport"]:
+        """
+        并发增量同步多个账号
+        
+        每个账号使用 for_account() 派生的客户端（共享连接池与 server_concurrency 限制），
+        最多 concurrency 个账号同时同步，检查点最旧（或从未同步）的账号优先。
+        单个账号失败不影响其它账号。
+        
+        Args:
+            accounts: SyncAccount 列表（API Token + 检查点存储 + 持久化回调）
+            concurrency: 同时同步的最大账号数
+            skip_unchanged: 参见 sync_notes()
+            
+        Returns:
+            AccountSyncReport 列表（按开始同步的顺序），包含结果或异常、耗时、请求数与字节数
+            
+        Example:
+            >>> def saver(token):
+            ...     return lambda days: db.save_notes(token, days)
+            >>> checkpoint = SQLiteCheckpointStore("sync.db")
+            >>> config = DinoxConfig(api_token=service_token, server_concurrency={NOTE_SERVER_URL: 8})
+            >>> async with DinoxClient(config=config) as client:
+            ...     reports = await client.sync_accounts([
+            ...         SyncAccount(token, checkpoint, on_notes=saver(token)) for token in tokens
+            ...     ], concurrency=32)
+        """
+        from .accounts import sync_accounts
+        
+        with self._default_priority(BULK):
+            return await sync_accounts(self, accounts, concurrency=concurrency, skip_unchanged=skip_unchanged)
+    
+    # ==================== 事件循环监视 ====================
+    
+    async def start_loop_monitor(
+        self,
+        interval: float = 0.05,
+        threshold: float = 0.1,
+        slow_callbacks: bool = False
+    ) -> "LoopMonitor":
+        """
+        启动事件循环监视器，client.close() 时停止
+        
+        监视器运行期间，每个请求的 RequestMetrics.loop_lag 记录请求期间观测到的事件循环阻塞，
+        可与 network_time、client_time 对照判断慢请求来自网络还是事件循环。
+        
+        Args:
+            interval: 探测间隔（秒）
+            threshold: 延迟或回调耗时超过该值（秒）时记为一次阻塞
+            slow_callbacks: 是否开启 asyncio 调试模式以捕获慢回调（有额外开销）
+            
+        Returns:
+            LoopMonitor 实例（也可通过 client.loop_monitor 访问）
+            
+        Example:
+            >>> monitor = await client.start_loop_monitor(threshold=0.05)
+            >>> await client.sync_notes(checkpoint, on_notes=save)
+            >>> print(monitor.snapshot(), client.metrics.last.loop_lag)
+        """
+        from .monitor import LoopMonitor
+        
+        if self.loop_monitor is not None:
+            await self.loop_monitor.stop()
+        self.loop_monitor = LoopMonitor(interval=interval, threshold=threshold, slow_callbacks=slow_callbacks)
+        self.loop_monitor.start()
+        return self.loop_monitor
+    
+    # ==================== 写入队列 ====================
+    
+    async def drain_outbox(
+        self,
+        outbox: "SQLiteOutbox",
+        concurrency: int = 4,
+        batch_size: int = 100,
+        max_backoff: float = 300.0,
+        lease: float = 300.0
+    ) -> Dict[str, int]:
+        """
+        发送 outbox 中已到期的写入（一轮）
+        
+        本轮的写入先通过 outbox.due() 认领，并发的 drain_outbox（同一进程或共享同一数据库
+        文件的其它进程）不会重复发送。成功的写入移出队列；网络错误、超时、429/5xx 按
+        retry_backoff 指数退避（最长 max_backoff 秒）后重试；其它错误标记为失败，
+        可通过 outbox.failed() 查看。
+        
+        Args:
+            outbox: SQLiteOutbox 写入队列
+            concurrency: 最大并发写入数
+            batch_size: 本轮最多发送的写入数
+            max_backoff: 重试间隔上限（秒）
+            lease: 认领租约（秒），超过后未完成的写入可被其它发送方重新认领
+            
+        Returns:
+            {"sent": 成功数, "retrying": 待重试数, "failed": 失败数}
+            
+        Example:
+            >>> outbox = SQLiteOutbox("outbox.db")
+            >>> outbox.enqueue("create_note", content="# 离线记录")
+            >>> await client.drain_outbox(outbox)
+        """
+        loop = asyncio.get_running_loop()
+        items = await loop.run_in_executor(None, outbox.due, batch_size, lease)
+        counts = {"sent": 0, "retrying": 0, "failed": 0}
+        slots = asyncio.Semaphore(concurrency)
+        
+        async def deliver(item: "OutboxItem"):
+            async with slots:
+                _extra_headers_var.set({"Idempotency-Key": item.key})
+                try:
+                    await getattr(self, item.method)(**item.kwargs)
+                except Exception as e:
+                    if isinstance(e, DinoxAPIError) and self._is_retryable(e):
+                        delay = min(self.config.retry_backoff * (2 ** item.attempts), max_backoff)
+                        await loop.run_in_executor(None, outbox.retry, item.key, str(e), delay, item.claim)
+                        counts["retrying"] += 1
+                    else:
+                        await loop.run_in_executor(None, outbox.fail, item.key, str(e), item.claim)
+                        counts["failed"] += 1
+                else:
+                    await loop.run_in_executor(None, outbox.complete, item.key, item.claim)
+                    counts["sent"] += 1
+        
+        # Each delivery runs in its own task so the header ContextVar stays per-item
+        with self._default_priority(BULK):
+            await asyncio.gather(*(asyncio.ensure_future(deliver(item)) for item in items))
+        return counts
+    
+    async def start_outbox(
+        self,
+        outbox: "SQLiteOutbox",
+        concurrency: int = 4,
+        interval: float = 5.0,
+        batch_size: int = 100
+    ) -> asyncio.Task:
+        """
+        启动后台任务持续发送 outbox，client.close() 时停止
+        
+        Args:
+            outbox: SQLiteOutbox 写入队列
+            concurrency: 最大并发写入数
+            interval: 队列为空或只剩待重试写入时的轮询间隔（秒）
+            batch_size: 每轮最多发送的写入数
+            
+        Returns:
+            后台 asyncio.Task
+        """
+        async def run():
+            while True:
+                counts = await self.drain_outbox(outbox, concurrency=concurrency, batch_size=batch_size)
+                # Keep draining immediately while full batches are being delivered
+                if sum(counts.values()) < batch_size:
+                    await asyncio.sleep(interval)
+        
+        task = asyncio.ensure_future(run())
+        self._outbox_tasks.append(task)
+        return task
+    
+    async def _digest_function(self, days: List[Dict[str, Any]]) -> Callable[[Dict[str, Any]], str]:
+        """
+        返回笔记状态摘要函数
+        
+        启用 offload_threshold 时，按 offload_chunk_size 条分块在 offload_executor 中预先计算摘要
+        （正文规范化与 front matter 处理是同步中最耗 CPU 的部分），事件循环只做查表。
+        """
+        from .changes import state_digest, state_digests
+        
+        notes = [note for day in days for note in day.get("notes") or []]
+        if self.config.offload_threshold is None or not notes:
+            return state_digest
+        size = self.config.offload_chunk_size
+        chunks = [notes[i:i + size] for i in range(0, len(notes), size)]
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self.config.offload_executor, state_digests, chunk) for chunk in chunks
+        ))
+        # Keyed by object identity: the same noteId may appear more than once in a batch
+        computed = {id(note): digest for chunk, digests in zip(chunks, results) for note, digest in zip(chunk, digests)}
+        return lambda note: computed.get(id(note)) or state_digest(note)
+    
+    async def _index_days(self, days: List[Dict[str, Any]]):
+        """
+        用同步结果更新 client.store
+        
+        启用 offload_threshold 时，合并去重（按 updateTime 排序）与字段规范化在 offload_executor 中执行，
+        事件循环只按 offload_chunk_size 条分块写入索引，块之间让出事件循环。
+        """
+        from .store import index_entries
+        
+        store = self.store
+        if self.config.offload_threshold is None:
+            store.apply(days)
+            return
+        loop = asyncio.get_running_loop()
+        entries = await loop.run_in_executor(self.config.offload_executor, index_entries, days)
+        size = self.config.offload_chunk_size
+        for start in range(0, len(entries), size):
+            if start:
+                await asyncio.sleep(0)
+            store.apply_entries(entries[start:start + size])
+    
+    @staticmethod
+    async def _invoke(callback: Callable[..., Any], *args) -> Any:
+        """调用同步函数或协程函数回调"""
+        outcome = callback(*args)
+        if inspect.isawaitable(outcome):
+            outcome = await outcome
+        return outcome
+    
+    # ==================== 辅助方法 ====================
+    
+    @staticmethod
+    def _get_default_template() -> str:
+        """获取默认的笔记模板"""
+        return """---
+title: {{title}}
+noteId: {{noteId}}
+type: {{type}}
+tags:
+{{#tags}}
+    - {{.}}
+{{/tags}}
+zettelBoxes:
+{{#zettelBoxes}}
+    - {{.}}
+{{/zettelBoxes}}
+audioUrl: {{audioUrl}}
+createTime: {{createTime}}
+updateTime: {{updateTime}}
+---
+{{#audioUrl}}
+![录音]({{audioUrl}})
+{{/audioUrl}}
+
+{{content}}
+"""
+    
+    @staticmethod
+    def format_sync_time(dt: datetime = None) -> str:
+        """
+        格式化同步时间
+        
+        Args:
+            dt: datetime 对象，如果为 None 则使用当前时间
+            
+        Returns:
+            格式化的时间字符串 "YYYY-MM-DD HH:mm:ss"
+        """
+        if dt is None:
+            dt = datetime.now()
+        return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# ==================== 便捷函数 ====================
+
+async def create_client(api_token: str, **kwargs) -> DinoxClient:
+    """
+    创建并连接 Dinox 客户端
+    
+    Args:
+        api_token: API Token
+        **kwargs: 其他配置参数
+        
+    Returns:
+        已连接的 DinoxClient 实例
+    """
+    config = DinoxConfig(api_token=api_token, **kwargs)
+    client = DinoxClient(config=config)
+    await client.connect()
+    return client
+
+
+# ==================== 示例代码 ====================
+
+async def example_usage():
+    """示例代码"""
+    # 方式 1: 使用上下文管理器（推荐）
+    async with DinoxClient(api_token="YOUR_TOKEN_HERE") as client:
+        # 获取笔记列表
+        notes = await client.get_notes_list()
+        print(f"获取到 {len(notes)} 天的笔记")
+        
+        # 创建文字笔记
+        result = await client.create_text_note("测试笔记内容")
+        print(f"创建结果: {result}")
+    
+    # 方式 2: 手动管理连接
+    client = DinoxClient(api_token="YOUR_TOKEN_HERE")
+    try:
+        await client.connect()
+        boxes = await client.get_zettelboxes()
+        print(f"卡片盒数量: {len(boxes)}")
+    finally:
+        await client.close()
+
+
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Dinox 客户端配置与服务器路由常量
+
+本模块不依赖 aiohttp，导入开销很小。
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+# Server URLs
+NOTE_SERVER_URL = "https://dinoai.chatgo.pro"
+AI_SERVER_URL = "https://aisdk.chatgo.pro"
+
+# lastSyncTime used for a full sync
+DEFAULT_SYNC_TIME = "1900-01-01 00:00:00"
+
+# Request priority classes, highest first
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, NORMAL, BULK)
+
+# Default priority for user-facing lookups; other methods default to NORMAL
+METHOD_PRIORITIES = {
+    "get_note_by_id": INTERACTIVE,
+    "search_notes": INTERACTIVE,
+    "get_zettelboxes": INTERACTIVE,
+}
+
+# Method-to-server mapping for automatic routing
+METHOD_SERVER_MAP = {
+    # Note Server methods
+    "get_notes_list": NOTE_SERVER_URL,
+    "get_note_by_id": NOTE_SERVER_URL,
+    "update_note": AI_SERVER_URL,
+    
+    # AI Server methods
+    "search_notes": AI_SERVER_URL,
+    "create_note": AI_SERVER_URL,
+    "create_text_note": AI_SERVER_URL,
+    "get_zettelboxes": AI_SERVER_URL,
+}
+
+# Methods that are safe to send more than once (retries)
+IDEMPOTENT_METHODS = frozenset({
+    "get_notes_list",
+    "get_note_by_id",
+    "search_notes",
+    "get_zettelboxes",
+    "update_note",
+})
+
+# Read-only methods that may be hedged; a late duplicate of a write could overwrite a newer write
+HEDGEABLE_METHODS = frozenset({
+    "get_notes_list",
+    "get_note_by_id",
+    "search_notes",
+    "get_zettelboxes",
+})
+
+# HTTP status codes worth retrying for idempotent methods
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class DinoxTimeout:
+    """
+    细粒度超时设置（秒），未设置的字段回退到上一级配置
+
+    Attributes:
+        total: 单次请求总超时
+        connect: 建立连接超时（含等待连接池）
+        sock_read: 两次读取数据之间的超时
+    """
+    total: Optional[float] = None
+    connect: Optional[float] = None
+    sock_read: Optional[float] = None
+
+
+@dataclass
+class DinoxConfig:
+    """
+    Dinox 客户端配置
+    
+    v0.2.0+ 自动服务器路由：
+    - 笔记服务器 (https://dinoai.chatgo.pro): get_notes_list, get_note_by_id, update_note
+    - AI服务器 (https://aisdk.chatgo.pro): search_notes, create_note, get_zettelboxes
+    
+    客户端会自动选择正确的服务器，无需手动配置
+    
+    超时优先级（高到低）：client.call_timeout() > method_timeouts > timeout/connect_timeout/read_timeout
+    
+    对冲请求（hedging）：hedge_methods 中的方法若在该方法历史延迟的 hedge_percentile 分位
+    （样本不足时使用 hedge_delay）内未返回，则发送一份重复请求并采用先返回的结果。
+    hedge_budget 为对冲请求占普通请求的最大比例。只允许 HEDGEABLE_METHODS 中的只读方法：
+    写入（即使幂等）的迟到副本可能覆盖之后的写入。
+    
+    index_notes 为 True 时，get_notes_list 的结果会增量更新 client.store 中的卡片盒/标签索引（默认关闭，
+    不使用 client.store 的调用方无需承担索引开销）。
+    
+    search_cache_ttl > 0 时缓存 search_notes 结果（按规范化后的关键词集合，最多 search_cache_size 条），
+    通过同一客户端创建/更新笔记时失效；过期后 search_cache_stale_ttl 秒内先返回旧结果并在后台刷新。
+    
+    CPU 卸载：设置 offload_threshold 后，传输体积不小于该字节数的成功响应在 offload_executor
+    （线程池或进程池）中解压和解析 JSON；同步时的笔记摘要计算按 offload_chunk_size 条分块卸载，
+    避免大批量同步阻塞事件循环。
+    
+    server_concurrency 按服务器地址限制同时进行的请求数，例如 {NOTE_SERVER_URL: 8}；
+    通过 client.for_account() 派生的客户端共享同一组限制。
+    
+    adaptive_concurrency 为 True 时每个服务器的并发上限按 AIMD 自动调整：从 adaptive_initial_concurrency 开始，
+    延迟稳定时加性增加，429/5xx、超时、网络错误或延迟超过基线 adaptive_latency_tolerance 倍时减半；
+    上限不超过 server_concurrency 中该服务器的值（未设置时为 adaptive_max_concurrency）。
+    
+    请求按优先级（interactive > normal > bulk）排队；reserved_interactive 为每个服务器保留给
+    interactive 请求的名额。未设置并发上限的服务器以连接池大小（100）为上限。
+    
+    预热：connect(warmup=True) 在返回前并行解析 DNS 并向每个服务器建立 warmup_connections 个
+    keep-alive 连接；dns_cache_ttl 为 DNS 解析结果的缓存时间（秒，None 表示不过期）。
+    
+    conditional_cache_size > 0 时，get_note_by_id 和 get_zettelboxes 的结果连同 ETag / Last-Modified
+    一起缓存（最多 conditional_cache_size 条），再次请求时发送条件请求，304 时直接返回缓存结果。
+    
+    response_cache（如 SQLiteResponseCache）为多进程共享的磁盘缓存：get_note_by_id 和 get_zettelboxes
+    命中未过期的条目时不访问网络；缓存键按 API Token 隔离，通过同一客户端 update_note 时删除对应笔记。
+    """
+    api_token: str
+    timeout: int = 30
+    connect_timeout: Optional[float] = None
+    read_timeout: Optional[float] = None
+    method_timeouts: Dict[str, Union[float, DinoxTimeout]] = field(default_factory=dict)
+    max_retries: int = 0
+    retry_backoff: float = 0.5
+    hedge_methods: Tuple[str, ...] = ()
+    hedge_percentile: float = 0.95
+    hedge_delay: float = 0.1
+    hedge_budget: float = 0.1
+    index_notes: bool = False
+    search_cache_ttl: float = 0.0
+    search_cache_size: int = 256
+    search_cache_stale_ttl: float = 0.0
+    offload_threshold: Optional[int] = None
+    offload_executor: Any = None  # concurrent.futures.Executor; None uses the loop's default thread pool
+    offload_chunk_size: int = 500
+    server_concurrency: Dict[str, int] = field(default_factory=dict)
+    adaptive_concurrency: bool = False
+    adaptive_initial_concurrency: int = 4
+    adaptive_max_concurrency: int = 64
+    adaptive_latency_tolerance: float = 2.0
+    reserved_interactive: int = 0
+    warmup_connections: int = 2
+    dns_cache_ttl: Optional[int] = 300
+    conditional_cache_size: int = 0
+    response_cache: Any = None  # SQLiteResponseCache or any object with get/put/delete
+    
+    def __post_init__(self):
+        """验证配置"""
+        if not self.api_token:
+            raise ValueError("API token is required")
+        if self.max_retries < 0:
+            raise ValueError("max_retries must be >= 0")
+        unsafe = set(self.hedge_methods) - HEDGEABLE_METHODS
+        if unsafe:
+            raise ValueError(f"Hedging is only allowed for read-only methods: {sorted(unsafe)}")
+        if not 0 < self.hedge_percentile < 1:
+            raise ValueError("hedge_percentile must be between 0 and 1")
+        if self.search_cache_ttl < 0 or self.search_cache_stale_ttl < 0:
+            raise ValueError("search cache TTLs must be >= 0")
+        if self.search_cache_size < 1:
+            raise ValueError("search_cache_size must be >= 1")
+        if self.offload_threshold is not None and self.offload_threshold < 0:
+            raise ValueError("offload_threshold must be >= 0")
+        if self.offload_chunk_size < 1:
+            raise ValueError("offload_chunk_size must be >= 1")
+        if any(limit < 1 for limit in self.server_concurrency.values()):
+            raise ValueError("server_concurrency limits must be >= 1")
+        if not 1 <= self.adaptive_initial_concurrency <= self.adaptive_max_concurrency:
+            raise ValueError("expected 1 <= adaptive_initial_concurrency <= adaptive_max_concurrency")
+        if self.adaptive_latency_tolerance <= 1:
+            raise ValueError("adaptive_latency_tolerance must be > 1")
+        if self.reserved_interactive < 0:
+            raise ValueError("reserved_interactive must be >= 0")
+        if self.warmup_connections < 0:
+            raise ValueError("warmup_connections must be >= 0")
+        if self.conditional_cache_size < 0:
+            raise ValueError("conditional_cache_size must be >= 0")
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""Dinox 客户端异常"""
+
+
+class DinoxAPIError(Exception):
+    """Dinox API 错误基类"""
+    def __init__(self, code: str, message: str, status_code: int = None):
+        self.code = code
+        self.message = message
+        self.status_code = status_code
+        super().__init__(f"[{code}] {message}")
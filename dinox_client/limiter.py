@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+并发限制器
+
+ConcurrencyLimiter 是固定上限、按优先级排队的限制器，可为 interactive 请求保留名额；AdaptiveLimiter 按 AIMD 调整上限：
+延迟稳定且上限被用满时加性增加，遇到 429/5xx、超时、网络错误或延迟突增（相对同一方法的延迟基线）时乘性减少。
+"""
+
+import asyncio
+import collections
+import time
+from typing import Any, Deque, Dict, Optional
+
+from .config import INTERACTIVE, NORMAL, PRIORITIES
+
+
+class ConcurrencyLimiter:
+    """
+    固定上限的并发限制器，按优先级排队（interactive > normal > bulk，同级先到先得）
+
+    Args:
+        limit: 最大并发数
+        reserved: 只供 interactive 请求使用的名额数
+    """
+
+    def __init__(self, limit: int, reserved: int = 0):
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        self.limit: float = limit
+        self.reserved = reserved
+        self.in_flight = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {priority: collections.deque() for priority in PRIORITIES}
+        self.max_queued: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+
+    @property
+    def waiting(self) -> int:
+        return sum(self.queued().values())
+
+    def queued(self) -> Dict[str, int]:
+        """各优先级当前排队的请求数"""
+        return {
+            priority: sum(1 for waiter in waiters if not waiter.done())
+            for priority, waiters in self._waiters.items()
+        }
+
+    def _capacity(self) -> int:
+        return max(1, int(self.limit))
+
+    def _capacity_for(self, priority: str) -> int:
+        capacity = self._capacity()
+        if priority == INTERACTIVE:
+            return capacity
+        return max(1, capacity - self.reserved)
+
+    def _queue_ahead(self, priority: str) -> bool:
+        """同级或更高优先级是否有请求在排队"""
+        for level in PRIORITIES:
+            waiters = self._waiters[level]
+            while waiters and waiters[0].done():
+                waiters.popleft()
+            if waiters:
+                return True
+            if level == priority:
+                return False
+        return False
+
+    async def acquire(self, priority: str = NORMAL):
+        """获取一个并发名额，名额不足时按优先级排队等待"""
+        if priority not in self._waiters:
+            raise ValueError(f"Unknown priority: {priority}")
+        if self.in_flight < self._capacity_for(priority) and not self._queue_ahead(priority):
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        waiters = self._waiters[priority]
+        waiters.append(waiter)
+        self.max_queued[priority] = max(self.max_queued[priority], len(waiters))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just before cancellation; hand it on
+                self.in_flight -= 1
+                self._wake()
+            raise
+
+    def release(self, latency: Optional[float] = None, overloaded: bool = False, method: str = None):
+        """
+        归还名额
+
+        Args:
+            latency: 请求耗时
+            overloaded: 请求是否因上游过载失败（429/5xx、超时、网络错误）
+            method: API 方法名，延迟按方法分别比较
+        """
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        for priority in PRIORITIES:
+            waiters = self._waiters[priority]
+            while waiters and self.in_flight < self._capacity_for(priority):
+                waiter = waiters.popleft()
+                if waiter.done():
+                    continue
+                self.in_flight += 1
+                waiter.set_result(None)
+            while waiters and waiters[0].done():
+                waiters.popleft()
+            if waiters:
+                # Lower classes never have more capacity than this one
+                return
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回可序列化的限制器状态"""
+        queued = self.queued()
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": sum(queued.values()),
+            "queued": queued,
+            "max_queued": dict(self.max_queued),
+        }
+
+
+class AdaptiveLimiter(ConcurrencyLimiter):
+    """
+    AIMD 自适应并发限制器
+
+    Args:
+        initial: 初始上限
+        min_limit: 上限下界
+        max_limit: 上限上界
+        increase: 每轮（约 limit 个成功请求）增加的名额
+        decrease: 过载时上限乘以该系数
+        latency_tolerance: 延迟超过同一方法基线的该倍数视为延迟突增
+        reserved: 只供 interactive 请求使用的名额数
+
+    同一服务器上各方法的正常延迟可能相差几个数量级（如全量 get_notes_list 与 get_note_by_id），
+    因此延迟基线按 release() 传入的 method 分别维护。
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+        reserved: int = 0,
+    ):
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("expected 1 <= min_limit <= initial <= max_limit")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        super().__init__(initial, reserved=reserved)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.baselines: Dict[Optional[str], float] = {}
+        self.decreases = 0
+        self._last_decrease = float("-inf")
+
+    def release(self, latency: Optional[float] = None, overloaded: bool = False, method: str = None):
+        saturated = self.in_flight >= self._capacity()
+        self.in_flight -= 1
+        if overloaded:
+            self._back_off(latency if latency is not None else self.baselines.get(method, 0.0))
+        elif latency is not None:
+            baseline = self.baselines.setdefault(method, latency)
+            if latency > baseline * self.latency_tolerance:
+                self._back_off(latency)
+            else:
+                # Slow EWMA so the baseline tracks drift but not individual spikes
+                self.baselines[method] = baseline + 0.1 * (latency - baseline)
+                # Only grow when the current limit is actually the bottleneck
+                if saturated:
+                    self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+        self._wake()
+
+    def _back_off(self, latency: float):
+        now = time.monotonic()
+        # Requests that started before the last decrease report the same congestion event
+        started = now - latency
+        if started < self._last_decrease:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self.decreases += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = super().snapshot()
+        state.update({
+            "limit": round(self.limit, 2),
+            "baseline_latency": {method: round(baseline, 4) for method, baseline in self.baselines.items()},
+            "decreases": self.decreases,
+        })
+        return state
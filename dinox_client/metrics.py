@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""请求度量、延迟统计与对冲预算"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+class LatencyTracker:
+    """
+    按方法记录最近的请求延迟，用于计算分位数
+
+    Args:
+        window: 每个方法保留的最近样本数
+        min_samples: 计算分位数所需的最少样本数
+    """
+
+    def __init__(self, window: int = 256, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, deque] = {}
+
+    def record(self, method_name: str, seconds: float):
+        """记录一次成功请求的耗时"""
+        samples = self._samples.get(method_name)
+        if samples is None:
+            samples = self._samples[method_name] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, method_name: str, p: float) -> Optional[float]:
+        """返回方法延迟的 p 分位（0 < p < 1），样本不足时返回 None"""
+        samples = self._samples.get(method_name)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+@dataclass
+class RequestMetrics:
+    """
+    单次请求的度量数据
+
+    elapsed 为网络时间与解析时间之和；client_time 为客户端自身耗时（路由与请求头构造 +
+    解压与 JSON 解析）；loop_lag 为请求期间 LoopMonitor 观测到的事件循环阻塞（近似值，
+    仅在监视器运行时记录），较大时说明 network_time 中有一部分其实是在等待事件循环。
+    """
+    method: Optional[str]
+    status: int
+    elapsed: float
+    wire_bytes: int
+    decoded_bytes: int
+    content_encoding: str = ""
+    prepare_time: float = 0.0
+    network_time: float = 0.0
+    parse_time: float = 0.0
+    loop_lag: float = 0.0
+
+    @property
+    def client_time(self) -> float:
+        """客户端自身耗时：准备请求 + 解压与解析"""
+        return self.prepare_time + self.parse_time
+
+
+class ClientMetrics:
+    """
+    客户端累计度量：请求数、传输字节数、解压后字节数、304 响应数，以及网络时间与客户端时间
+
+    Args:
+        history: 保留最近多少条 RequestMetrics
+    """
+
+    def __init__(self, history: int = 100):
+        self.requests = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self.not_modified = 0
+        self.network_time = 0.0
+        self.client_time = 0.0
+        self.loop_lag = 0.0
+        self.recent: deque = deque(maxlen=history)
+        # Per-server concurrency limiters (server URL -> limiter), attached by the client
+        self.limiters: Dict[str, Any] = {}
+
+    def record(self, metrics: RequestMetrics):
+        """记录一次请求"""
+        self.requests += 1
+        self.wire_bytes += metrics.wire_bytes
+        self.decoded_bytes += metrics.decoded_bytes
+        if metrics.status == 304:
+            self.not_modified += 1
+        self.network_time += metrics.network_time
+        self.client_time += metrics.client_time
+        self.loop_lag += metrics.loop_lag
+        self.recent.append(metrics)
+
+    @property
+    def last(self) -> Optional[RequestMetrics]:
+        """最近一次请求的度量"""
+        return self.recent[-1] if self.recent else None
+
+    @property
+    def compression_ratio(self) -> float:
+        """解压后字节数 / 传输字节数，未压缩时为 1.0"""
+        if not self.wire_bytes:
+            return 1.0
+        return self.decoded_bytes / self.wire_bytes
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回可序列化的度量快照"""
+        return {
+            "requests": self.requests,
+            "wire_bytes": self.wire_bytes,
+            "decoded_bytes": self.decoded_bytes,
+            "compression_ratio": round(self.compression_ratio, 3),
+            "not_modified": self.not_modified,
+            "network_time": round(self.network_time, 4),
+            "client_time": round(self.client_time, 4),
+            "loop_lag": round(self.loop_lag, 4),
+            "concurrency": {server_url: limiter.snapshot() for server_url, limiter in self.limiters.items()},
+        }
+
+
+class HedgeBudget:
+    """
+    对冲请求令牌桶：每个普通请求存入 ratio 个令牌，每个对冲请求消耗 1 个令牌
+
+    保证对冲请求数量不超过普通请求的 ratio 倍，避免在服务端变慢时放大负载。
+    """
+
+    def __init__(self, ratio: float, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = 0.0
+
+    def deposit(self):
+        """普通请求发出时调用"""
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """尝试为一个对冲请求扣除令牌"""
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
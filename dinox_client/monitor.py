@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+事件循环监视器
+
+定期探测事件循环延迟（计划唤醒时间与实际唤醒时间之差），记录超过阈值的阻塞；
+可选开启 asyncio 调试模式，捕获执行时间超过阈值的回调。
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """收集 asyncio 调试模式输出的 "Executing <Handle> took N seconds" 日志"""
+
+    def __init__(self, sink: deque):
+        super().__init__(logging.WARNING)
+        self.sink = sink
+
+    def emit(self, record: logging.LogRecord):
+        if isinstance(record.msg, str) and record.msg.startswith("Executing"):
+            self.sink.append((time.time(), record.getMessage()))
+
+
+class LoopMonitor:
+    """
+    事件循环延迟与慢回调监视器
+
+    Args:
+        interval: 探测间隔（秒）
+        threshold: 延迟或回调耗时超过该值（秒）时记为一次阻塞
+        history: 保留的最近样本、阻塞与慢回调条数
+        slow_callbacks: 是否开启 asyncio 调试模式以捕获慢回调（有额外开销，建议仅在排查时开启）
+
+    示例用法:
+        monitor = await client.start_loop_monitor(threshold=0.05)
+        ...
+        print(monitor.snapshot())
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        threshold: float = 0.1,
+        history: int = 256,
+        slow_callbacks: bool = False,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.slow_callbacks_enabled = slow_callbacks
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.samples: deque = deque(maxlen=history)
+        self.stalls: deque = deque(maxlen=history)
+        self.slow_callbacks: deque = deque(maxlen=history)
+        self._task: Optional[asyncio.Task] = None
+        self._handler: Optional[_SlowCallbackHandler] = None
+        self._saved_debug = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """在当前事件循环中启动探测（需在事件循环内调用）"""
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        if self.slow_callbacks_enabled:
+            self._saved_debug = (loop.get_debug(), loop.slow_callback_duration)
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.threshold
+            self._handler = _SlowCallbackHandler(self.slow_callbacks)
+            logging.getLogger("asyncio").addHandler(self._handler)
+        self._task = asyncio.ensure_future(self._probe())
+
+    async def stop(self):
+        """停止探测并恢复事件循环的调试设置"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._handler is not None:
+            logging.getLogger("asyncio").removeHandler(self._handler)
+            self._handler = None
+            loop = asyncio.get_running_loop()
+            loop.set_debug(self._saved_debug[0])
+            loop.slow_callback_duration = self._saved_debug[1]
+
+    async def _probe(self):
+        while True:
+            scheduled = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, time.monotonic() - scheduled))
+
+    def record(self, lag: float):
+        """记录一次延迟样本"""
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        self.samples.append(lag)
+        if lag >= self.threshold:
+            self.stalls.append((time.time(), lag))
+
+    def percentile(self, p: float) -> float:
+        """最近样本中延迟的 p 分位（0 < p < 1）"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回可序列化的监视快照"""
+        return {
+            "total_lag": round(self.total_lag, 4),
+            "max_lag": round(self.max_lag, 4),
+            "p99_lag": round(self.percentile(0.99), 4),
+            "stalls": len(self.stalls),
+            "slow_callbacks": [message for _, message in self.slow_callbacks],
+        }
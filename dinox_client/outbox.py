@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+持久化写入队列（outbox）
+
+create_note / create_text_note / update_note 的写入意图先落盘到 SQLite（WAL），
+由 DinoxClient.drain_outbox() / start_outbox() 在后台按有界并发发送。
+调用方的写入延迟只是一次本地提交，上游不可用时内容也不会丢失。
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+PENDING = "pending"
+SENDING = "sending"
+FAILED = "failed"
+
+# Write methods that may be queued
+OUTBOX_METHODS = frozenset({"create_note", "create_text_note", "update_note"})
+
+
+@dataclass
+class OutboxItem:
+    """一条待发送的写入"""
+    key: str
+    method: str
+    kwargs: Dict[str, Any]
+    attempts: int = 0
+    last_error: Optional[str] = None
+    claim: Optional[str] = None
+
+
+class SQLiteOutbox:
+    """
+    基于 SQLite（WAL + synchronous=FULL）的写入队列
+
+    每条写入有一个幂等键：重复 enqueue 同一个键只保存一次，发送时作为
+    Idempotency-Key 请求头附带。due() 在写事务中认领返回的写入（租约 lease 秒），
+    同一进程或多个进程中并发的发送方不会拿到同一条写入；complete/retry/fail 只作用于
+    仍由该认领持有的写入，租约过期的写入重新回到队列。投递语义为至少一次——响应丢失
+    或租约过期后的重试可能在上游产生重复笔记。
+
+    Args:
+        path: 数据库文件路径
+        table: 队列表名
+    """
+
+    def __init__(self, path: str, table: str = "dinox_outbox"):
+        import sqlite3
+
+        self.path = os.fspath(path)
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " key TEXT NOT NULL UNIQUE,"
+            " method TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " state TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt REAL NOT NULL,"
+            " last_error TEXT,"
+            " created_at REAL NOT NULL,"
+            " claim TEXT,"
+            " lease_until REAL)"
+        )
+        columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({self.table})")}
+        # Queues created before claims were added
+        for column, kind in (("claim", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE {self.table} ADD COLUMN {column} {kind}")
+
+    def __len__(self) -> int:
+        """待发送与发送中（不含失败）的写入数"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT COUNT(*) FROM {self.table} WHERE state != ?", (FAILED,)
+            ).fetchone()
+        return row[0]
+
+    def enqueue(self, method: str, key: str = None, **kwargs) -> str:
+        """
+        持久化一条写入意图，返回幂等键
+
+        Example:
+            >>> key = outbox.enqueue("create_note", content="# 标题", tags=["inbox"])
+        """
+        if method not in OUTBOX_METHODS:
+            raise ValueError(f"Unsupported outbox method: {method}")
+        key = key or str(uuid.uuid4())
+        payload = json.dumps(kwargs, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR IGNORE INTO {self.table} (key, method, payload, state, next_attempt, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, method, payload, PENDING, now, now),
+            )
+        return key
+
+    def due(self, limit: int = 100, lease: float = 300.0) -> List[OutboxItem]:
+        """
+        按入队顺序认领并返回已到重试时间的待发送写入
+
+        Args:
+            limit: 最多认领的写入数
+            lease: 租约时长（秒），应大于单次发送（含重试）的最长耗时；
+                过期后写入重新回到队列，可被其它发送方认领
+        """
+        claim = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    f"UPDATE {self.table} SET state = ?, claim = NULL, lease_until = NULL "
+                    "WHERE state = ? AND lease_until <= ?",
+                    (PENDING, SENDING, now),
+                )
+                rows = self._conn.execute(
+                    f"SELECT key, method, payload, attempts, last_error FROM {self.table} "
+                    "WHERE state = ? AND next_attempt <= ? ORDER BY seq LIMIT ?",
+                    (PENDING, now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    f"UPDATE {self.table} SET state = ?, claim = ?, lease_until = ? WHERE key = ?",
+                    [(SENDING, claim, now + lease, row[0]) for row in rows],
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return [OutboxItem(key, method, json.loads(payload), attempts, error, claim)
+                for key, method, payload, attempts, error in rows]
+
+    def failed(self) -> List[OutboxItem]:
+        """返回因不可重试错误而放弃的写入"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, method, payload, attempts, last_error FROM {self.table} "
+                "WHERE state = ? ORDER BY seq",
+                (FAILED,),
+            ).fetchall()
+        return [OutboxItem(key, method, json.loads(payload), attempts, error)
+                for key, method, payload, attempts, error in rows]
+
+    def _release(self, sql: str, params: tuple, key: str, claim: Optional[str]) -> bool:
+        """执行 complete/retry/fail 的语句；指定 claim 时只作用于仍由该认领持有的写入"""
+        sql += " WHERE key = ?"
+        params += (key,)
+        if claim is not None:
+            sql += " AND state = ? AND claim = ?"
+            params += (SENDING, claim)
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+        return cursor.rowcount > 0
+
+    def complete(self, key: str, claim: str = None) -> bool:
+        """发送成功，移出队列；认领已失效时返回 False"""
+        return self._release(f"DELETE FROM {self.table}", (), key, claim)
+
+    def retry(self, key: str, error: str, delay: float, claim: str = None) -> bool:
+        """记录一次可重试的失败，delay 秒后再次发送；认领已失效时返回 False"""
+        return self._release(
+            f"UPDATE {self.table} SET attempts = attempts + 1, state = ?, claim = NULL, lease_until = NULL, "
+            "next_attempt = ?, last_error = ?",
+            (PENDING, time.time() + delay, error), key, claim,
+        )
+
+    def fail(self, key: str, error: str, claim: str = None) -> bool:
+        """标记为失败，不再自动发送；认领已失效时返回 False"""
+        return self._release(
+            f"UPDATE {self.table} SET attempts = attempts + 1, state = ?, claim = NULL, lease_until = NULL, "
+            "last_error = ?",
+            (FAILED, error), key, claim,
+        )
+
+    def requeue_failed(self) -> int:
+        """将失败的写入重新放回队列，返回数量"""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE {self.table} SET state = ?, next_attempt = ? WHERE state = ?",
+                (PENDING, time.time(), FAILED),
+            )
+        return cursor.rowcount
+
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
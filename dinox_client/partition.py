@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+按时间窗口划分同步结果
+
+笔记列表接口只接受下界 lastSyncTime，没有上界或分页参数，无法把一次全量同步拆成
+互不重叠的服务端请求。因此窗口划分发生在客户端：按 updateTime 将笔记分到时间窗口，
+各窗口可并发持久化，检查点只推进到连续完成的窗口末尾；中断后再次同步时，服务端请求
+从第一个未完成窗口开始，需要重新传输的数据随已完成窗口数减少。
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .checkpoint import normalize_sync_time
+
+SYNC_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+@dataclass
+class SyncWindow:
+    """
+    一个同步时间窗口 [start, end)
+
+    Attributes:
+        start: 窗口起点（含）
+        end: 窗口终点（不含）
+        days: 窗口内的笔记，按日期分组（与 get_notes_list 返回格式一致）
+        latest: 窗口内最大的 updateTime
+    """
+    start: str
+    end: str
+    days: List[Dict[str, Any]] = field(default_factory=list)
+    latest: Optional[str] = None
+
+    @property
+    def note_count(self) -> int:
+        """窗口内的笔记数"""
+        return sum(len(day["notes"]) for day in self.days)
+
+
+def _note_time(note: Dict[str, Any]) -> Optional[str]:
+    value = note.get("updateTime") or note.get("createTime")
+    return normalize_sync_time(value) if value else None
+
+
+def merge_days(*batches: Iterable[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    合并多批按日期分组的笔记，同一 noteId 只保留 updateTime 最新的一条
+
+    Returns:
+        [(date, note), ...]，按 updateTime 升序
+    """
+    latest: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    for days in batches:
+        for day in days:
+            for note in day.get("notes") or []:
+                note_id = note.get("noteId")
+                current = latest.get(note_id)
+                if current is None or (_note_time(note) or "") >= (_note_time(current[1]) or ""):
+                    latest[note_id] = (day.get("date"), note)
+    return sorted(latest.values(), key=lambda item: _note_time(item[1]) or "")
+
+
+def _group_by_date(items: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for date, note in items:
+        groups.setdefault(date, []).append(note)
+    # Newest date first, matching the server's ordering
+    return [{"date": date, "notes": notes} for date, notes in sorted(groups.items(), reverse=True)]
+
+
+def partition_days(days: Iterable[Dict[str, Any]], window: timedelta) -> List[SyncWindow]:
+    """
+    按 updateTime 把笔记划分到连续的时间窗口，只返回非空窗口（按时间升序）
+
+    窗口从最早一条笔记所在时刻起对齐，避免从 1900 年开始产生大量空窗口。
+
+    Args:
+        days: get_notes_list 返回的按日期分组的笔记
+        window: 窗口长度
+    """
+    if window <= timedelta(0):
+        raise ValueError("window must be positive")
+    items = [item for item in merge_days(days) if _note_time(item[1])]
+    if not items:
+        return []
+
+    origin = datetime.strptime(_note_time(items[0][1]), SYNC_TIME_FORMAT)
+    buckets: Dict[int, List[Tuple[str, Dict[str, Any]]]] = {}
+    for item in items:
+        offset = datetime.strptime(_note_time(item[1]), SYNC_TIME_FORMAT) - origin
+        buckets.setdefault(offset // window, []).append(item)
+
+    windows = []
+    for index in sorted(buckets):
+        start = origin + window * index
+        bucket = buckets[index]
+        windows.append(SyncWindow(
+            start=start.strftime(SYNC_TIME_FORMAT),
+            end=(start + window).strftime(SYNC_TIME_FORMAT),
+            days=_group_by_date(bucket),
+            latest=_note_time(bucket[-1][1]),
+        ))
+    return windows
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+磁盘响应缓存
+
+将 get_note_by_id / get_zettelboxes 等读请求的结果保存到 SQLite（WAL），
+同一台机器上的多个进程共享，短生命周期的 worker 启动后可直接命中缓存而不访问网络。
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Optional
+
+
+class SQLiteResponseCache:
+    """
+    基于 SQLite（WAL）的响应缓存，带 TTL 与容量上限（LRU 淘汰）
+
+    多个进程可同时打开同一个文件：写入在 BEGIN IMMEDIATE 事务中完成，锁冲突时最多等待
+    busy_timeout 秒。缓存键由客户端按 API Token 隔离，数据库中不保存 Token 本身。
+
+    Args:
+        path: 数据库文件路径
+        ttl: 条目有效期（秒）
+        max_entries: 最大条目数
+        max_bytes: 缓存值总字节数上限，None 表示不限
+        table: 缓存表名
+        busy_timeout: 等待其它进程释放写锁的时间（秒）
+    """
+
+    # Skip the LRU write on reads if the entry was touched this recently
+    _TOUCH_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 300.0,
+        max_entries: int = 10000,
+        max_bytes: Optional[int] = None,
+        table: str = "dinox_responses",
+        busy_timeout: float = 5.0
+    ):
+        import sqlite3
+
+        if ttl <= 0:
+            raise ValueError("ttl must be > 0")
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+        self.path = os.fspath(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=busy_timeout, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)"
+        )
+
+    def __len__(self) -> int:
+        """条目数（含尚未清理的过期条目）"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        return row[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        """返回未过期的缓存值，未命中或已过期时返回 None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at, accessed_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            if now - row[2] >= self._TOUCH_INTERVAL:
+                self._conn.execute(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any, ttl: float = None):
+        """写入缓存值（必须可 JSON 序列化），并按容量上限淘汰最久未使用的条目"""
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, size, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, size, expires_at, now),
+                )
+                self._evict(now)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _evict(self, now: float):
+        """删除过期条目，再按 accessed_at 从旧到新淘汰超出容量的条目（调用方持有写事务）"""
+        self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+        count, total = self._conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+        ).fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+            total = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if self.max_bytes is None or total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in self._conn.execute(
+            f"SELECT key, size FROM {self.table} ORDER BY accessed_at"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
+
+    def delete(self, key: str):
+        """删除一个条目"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        """清空缓存（影响共享同一文件的所有进程）"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+本地笔记索引
+
+维护 卡片盒 -> 笔记 ID、标签 -> 笔记 ID 的倒排索引，由同步结果增量更新，
+"卡片盒 X 中的所有笔记" 这类查询只与结果大小相关，无需扫描全部笔记。
+"""
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .partition import merge_days
+
+
+def _names(values: Any) -> FrozenSet[str]:
+    """规范化 zettelBoxes / tags 字段（字符串或含 name 的对象）"""
+    names = set()
+    for value in values or []:
+        if isinstance(value, dict):
+            value = value.get("name")
+        if value:
+            names.add(str(value))
+    return frozenset(names)
+
+
+IndexEntry = Tuple[str, Optional[FrozenSet[str]], FrozenSet[str]]
+
+
+def index_entries(days: Iterable[Dict[str, Any]]) -> List[IndexEntry]:
+    """
+    把按日期分组的同步结果整理为索引条目 (noteId, 卡片盒, 标签)，已删除的笔记卡片盒为 None
+
+    纯函数，同步大批量笔记时可在线程池或进程池中执行。
+    """
+    entries = []
+    for _, note in merge_days(days):
+        note_id = note.get("noteId")
+        if not note_id:
+            continue
+        if note.get("isDel"):
+            entries.append((note_id, None, frozenset()))
+        else:
+            entries.append((note_id, _names(note.get("zettelBoxes")), _names(note.get("tags"))))
+    return entries
+
+
+class NoteStore:
+    """
+    卡片盒与标签的本地倒排索引（仅在内存中，不持久化）
+
+    示例用法:
+        config = DinoxConfig(api_token="your_token", index_notes=True)
+        async with DinoxClient(config=config) as client:
+            await client.get_notes_list()  # 从头拉取，索引覆盖全部笔记
+            note_ids = client.store.notes_in_box("读书笔记")
+    """
+
+    def __init__(self):
+        self._boxes: Dict[str, Set[str]] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._memberships: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._memberships)
+
+    def __contains__(self, note_id: str) -> bool:
+        return note_id in self._memberships
+
+    def apply(self, days: Iterable[Dict[str, Any]]):
+        """应用一批按日期分组的同步结果（已删除的笔记从索引中移除）"""
+        self.apply_entries(index_entries(days))
+
+    def apply_entries(self, entries: Iterable[IndexEntry]):
+        """应用 index_entries() 生成的索引条目"""
+        for note_id, boxes, tags in entries:
+            if boxes is None:
+                self.remove(note_id)
+            else:
+                self._index(note_id, boxes, tags)
+
+    def remove(self, note_id: str):
+        """从索引中移除一条笔记"""
+        boxes, tags = self._memberships.pop(note_id, (frozenset(), frozenset()))
+        self._unlink(self._boxes, boxes, note_id)
+        self._unlink(self._tags, tags, note_id)
+
+    def _index(self, note_id: str, boxes: FrozenSet[str], tags: FrozenSet[str]):
+        old_boxes, old_tags = self._memberships.get(note_id, (frozenset(), frozenset()))
+        self._unlink(self._boxes, old_boxes - boxes, note_id)
+        self._unlink(self._tags, old_tags - tags, note_id)
+        for box in boxes - old_boxes:
+            self._boxes.setdefault(box, set()).add(note_id)
+        for tag in tags - old_tags:
+            self._tags.setdefault(tag, set()).add(note_id)
+        self._memberships[note_id] = (boxes, tags)
+
+    @staticmethod
+    def _unlink(index: Dict[str, Set[str]], keys: Iterable[str], note_id: str):
+        for key in keys:
+            members = index.get(key)
+            if members is not None:
+                members.discard(note_id)
+                if not members:
+                    del index[key]
+
+    def notes_in_box(self, box: str) -> List[str]:
+        """返回卡片盒（按名称）中的笔记 ID"""
+        return list(self._boxes.get(box, ()))
+
+    def notes_with_tag(self, tag: str) -> List[str]:
+        """返回带有指定标签的笔记 ID"""
+        return list(self._tags.get(tag, ()))
+
+    def boxes(self) -> List[str]:
+        """所有出现过笔记的卡片盒名称"""
+        return list(self._boxes)
+
+    def tags(self) -> List[str]:
+        """所有出现过笔记的标签"""
+        return list(self._tags)
+
+    def memberships(self, note_id: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """返回笔记所属的 (卡片盒, 标签)"""
+        return self._memberships.get(note_id, (frozenset(), frozenset()))
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Dinox API 同步客户端
+
+在后台事件循环线程中运行 DinoxClient，为同步代码提供阻塞接口。
+"""
+
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Optional
+
+from .client import DinoxClient
+from .config import DinoxConfig
+
+
+class DinoxSyncClient:
+    """
+    Dinox API 同步客户端
+
+    在一个后台事件循环线程中运行 DinoxClient，所有异步方法都提供同名的阻塞版本。
+    会话在多次调用之间保持，可复用 keep-alive 连接，且可被多个线程并发调用。
+
+    示例用法:
+        with DinoxSyncClient(api_token="your_token") as client:
+            notes = client.get_notes_list()
+            print(f"获取到 {len(notes)} 天的笔记")
+    """
+
+    def __init__(self, api_token: str = None, config: DinoxConfig = None):
+        """
+        初始化同步客户端
+
+        Args:
+            api_token: API Token (JWT格式)
+            config: DinoxConfig 配置对象，如果提供则忽略 api_token
+        """
+        self._client = DinoxClient(api_token=api_token, config=config)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> DinoxClient:
+        """底层的异步客户端"""
+        return self._client
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出"""
+        self.close()
+
+    def __getattr__(self, name: str):
+        """
+        将异步客户端的协程方法包装为阻塞方法，异步生成器包装为普通迭代器，
+        其它属性直接透传
+        """
+        if name.startswith("__") or "_client" not in self.__dict__:
+            raise AttributeError(name)
+        attr = getattr(self._client, name)
+        if inspect.isasyncgenfunction(attr):
+            @functools.wraps(attr)
+            def iterate(*args, **kwargs):
+                return self._iterate(attr(*args, **kwargs))
+            return iterate
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def blocking(*args, **kwargs):
+            return self._run(attr(*args, **kwargs))
+        return blocking
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """按需启动后台事件循环线程"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=self._run_loop,
+                    args=(loop,),
+                    name="dinox-client-loop",
+                    daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def _run(self, coro):
+        """
+        在后台事件循环中执行协程并阻塞等待结果
+
+        调用线程的 contextvars（如 deadline()、call_timeout()）会随任务一起传递。
+        """
+        if self._thread is not None and threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("DinoxSyncClient methods cannot be called from its own event loop thread")
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        return future.result()
+
+    def _iterate(self, agen):
+        """逐项在后台事件循环中驱动异步生成器；迭代提前结束时关闭生成器"""
+        try:
+            while True:
+                try:
+                    yield self._run(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            if self._loop is not None:
+                self._run(agen.aclose())
+
+    def connect(self, warmup: bool = False):
+        """创建 HTTP 会话；warmup 为 True 时预先建立连接（见 DinoxClient.warmup）"""
+        self._run(self._client.connect(warmup=warmup))
+
+    def close(self):
+        """关闭 HTTP 会话并停止后台事件循环线程"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._client.close(), loop).result()
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
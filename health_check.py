@@ -11,8 +11,17 @@ from datetime import datetime
 from dinox_client import DinoxClient, DinoxAPIError, __version__
 import json
 import sys
+import io
 import os
 
+# 修复 Windows 编码问题
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+        sys.stderr.reconfigure(encoding='utf-8')
+    except (AttributeError, io.UnsupportedOperation):
+        pass
+
 # 从环境变量获取 Token
 API_TOKEN = os.environ.get("DINOX_API_TOKEN", "test_token_placeholder")
 TIMEOUT = 10  # 健康检查超时时间（秒）
@@ -13,7 +13,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/JimEverest/DinoSync",
-    py_modules=["dinox_client"],
+    packages=find_packages(include=["dinox_client", "dinox_client.*"]),
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
@@ -33,7 +33,15 @@ setup(
         "aiohttp>=3.8.0",
         "python-dotenv>=0.19.0",
     ],
+    entry_points={
+        "console_scripts": [
+            "dinox=dinox_client.cli:main",
+        ],
+    },
     extras_require={
+        "brotli": [
+            "Brotli>=1.0.9",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
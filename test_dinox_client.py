@@ -11,13 +11,21 @@ import asyncio
 import os
 import sys
 import io
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
+from aiohttp import web
+import dinox_client
 from dinox_client import (
     DinoxClient,
     DinoxConfig,
     DinoxAPIError,
+    DinoxTimeout,
+    DinoxSyncClient,
+    FileCheckpointStore,
+    SQLiteCheckpointStore,
     create_client
 )
 
@@ -37,26 +45,61 @@ if env_path.exists():
     load_dotenv(env_path)
 
 # 从环境变量获取 Token（安全最佳实践）
+# 只有访问真实服务器的测试需要 Token；使用本地模拟服务器的测试始终运行
 TEST_TOKEN = os.environ.get("DINOX_API_TOKEN")
-if not TEST_TOKEN:
-    print("警告: 未找到 DINOX_API_TOKEN 环境变量")
-    print("请创建 .env 文件并设置 DINOX_API_TOKEN")
-    pytest.skip("DINOX_API_TOKEN not set", allow_module_level=True)
+requires_token = pytest.mark.skipif(
+    not TEST_TOKEN,
+    reason="DINOX_API_TOKEN not set (create a .env file with DINOX_API_TOKEN)"
+)
 
 
 @pytest_asyncio.fixture
 async def client():
-    """测试客户端 fixture"""
+    """测试客户端 fixture（需要真实 Token）"""
+    if not TEST_TOKEN:
+        pytest.skip("DINOX_API_TOKEN not set")
     async with DinoxClient(api_token=TEST_TOKEN) as c:
         yield c
 
 
 @pytest.fixture
 def config():
-    """配置 fixture"""
+    """配置 fixture（需要真实 Token）"""
+    if not TEST_TOKEN:
+        pytest.skip("DINOX_API_TOKEN not set")
     return DinoxConfig(api_token=TEST_TOKEN)
 
 
+@pytest_asyncio.fixture
+async def mock_server(monkeypatch):
+    """
+    本地模拟服务器 fixture
+
+    用法: base_url = await mock_server(("GET", "/path", handler), ...)
+    启动后所有方法都会被路由到本地服务器
+    """
+    runners = []
+
+    async def start(*routes):
+        app = web.Application()
+        for method, path, handler in routes:
+            app.router.add_route(method, path, handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        base_url = f"http://127.0.0.1:{port}"
+        for name in list(dinox_client.METHOD_SERVER_MAP):
+            monkeypatch.setitem(dinox_client.METHOD_SERVER_MAP, name, base_url)
+        runners.append(runner)
+        return base_url
+
+    yield start
+    for runner in runners:
+        await runner.cleanup()
+
+
 # ==================== 配置测试 ====================
 
 def test_config_creation():
@@ -83,12 +126,14 @@ def test_config_requires_token():
 
 # ==================== 客户端初始化测试 ====================
 
+@requires_token
 def test_client_creation_with_token():
     """测试使用 token 创建客户端"""
     client = DinoxClient(api_token=TEST_TOKEN)
     assert client.config.api_token == TEST_TOKEN
 
 
+@requires_token
 def test_client_creation_with_config():
     """测试使用配置对象创建客户端"""
     config = DinoxConfig(api_token=TEST_TOKEN)
@@ -102,6 +147,7 @@ def test_client_requires_token_or_config():
         DinoxClient()
 
 
+@requires_token
 @pytest.mark.asyncio
 async def test_client_context_manager():
     """测试上下文管理器"""
@@ -283,6 +329,7 @@ def test_default_template():
 
 # ==================== 错误处理测试 ====================
 
+@requires_token
 @pytest.mark.asyncio
 async def test_invalid_token():
     """测试无效 token"""
@@ -295,6 +342,7 @@ async def test_invalid_token():
         print(f"\n✓ 正确捕获无效 token 错误: {error.message}")
 
 
+@requires_token
 @pytest.mark.asyncio
 async def test_network_error_handling():
     """测试网络错误处理"""
@@ -363,6 +411,7 @@ async def test_full_workflow(client):
 
 # ==================== 便捷函数测试 ====================
 
+@requires_token
 @pytest.mark.asyncio
 async def test_create_client_helper():
     """测试便捷创建函数"""
@@ -401,6 +450,1456 @@ async def test_concurrent_requests(client):
     print(f"  - 平均耗时: {(end_time - start_time) / 5:.2f} 秒/请求")
 
 
+# ==================== 超时与截止时间测试 ====================
+
+def test_method_timeout_resolution():
+    """测试超时优先级：调用级 > 方法级 > 全局"""
+    config = DinoxConfig(
+        api_token="test_token",
+        connect_timeout=5,
+        method_timeouts={
+            "get_notes_list": 300,
+            "get_note_by_id": DinoxTimeout(total=0.8, connect=0.2),
+        }
+    )
+    client = DinoxClient(config=config)
+
+    assert client._resolve_timeout("get_notes_list", None).total == 300
+    assert client._resolve_timeout("get_notes_list", None).connect == 5
+    assert client._resolve_timeout("get_note_by_id", None).connect == 0.2
+    assert client._resolve_timeout("search_notes", None).total == 30
+
+    with client.call_timeout(total=0.1):
+        timeout = client._resolve_timeout("get_note_by_id", None)
+        assert timeout.total == 0.1
+        assert timeout.connect == 0.2
+    assert client._resolve_timeout("get_note_by_id", None).total == 0.8
+
+
+def test_deadline_caps_timeout():
+    """测试 deadline 截断单次请求超时，嵌套时取更早者"""
+    client = DinoxClient(api_token="test_token")
+    with client.deadline(5):
+        with client.deadline(60):
+            from dinox_client.client import _deadline_var
+            timeout = client._resolve_timeout("get_notes_list", _deadline_var.get())
+            assert timeout.total <= 5
+
+
+@pytest.mark.asyncio
+async def test_retry_idempotent_method(mock_server):
+    """测试幂等方法在 5xx 后重试成功"""
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        if len(calls) < 3:
+            return web.json_response({"code": "500", "msg": "busy"}, status=503)
+        return web.json_response({"code": "000000", "data": [{"id": "box"}]})
+
+    await mock_server(("GET", "/api/openapi/zettelboxes", handler))
+    config = DinoxConfig(api_token="test_token", max_retries=2, retry_backoff=0.01)
+    async with DinoxClient(config=config) as client:
+        boxes = await client.get_zettelboxes()
+    assert boxes == [{"id": "box"}]
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_no_retry_for_non_idempotent_method(mock_server):
+    """测试创建笔记不会被重试"""
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        return web.json_response({"code": "500", "msg": "busy"}, status=503)
+
+    await mock_server(("POST", "/api/openapi/createNote", handler))
+    config = DinoxConfig(api_token="test_token", max_retries=3, retry_backoff=0.01)
+    async with DinoxClient(config=config) as client:
+        with pytest.raises(DinoxAPIError) as exc_info:
+            await client.create_note(content="x")
+    assert exc_info.value.status_code == 503
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_retries(mock_server):
+    """测试 deadline 约束请求与重试的总耗时"""
+    async def slow_handler(request):
+        await asyncio.sleep(1)
+        return web.json_response({"code": "000000", "data": []})
+
+    await mock_server(("GET", "/api/openapi/zettelboxes", slow_handler))
+    config = DinoxConfig(api_token="test_token", max_retries=5, retry_backoff=0.01)
+    async with DinoxClient(config=config) as client:
+        start = asyncio.get_event_loop().time()
+        with client.deadline(0.3):
+            with pytest.raises(DinoxAPIError) as exc_info:
+                await client.get_zettelboxes()
+        elapsed = asyncio.get_event_loop().time() - start
+    assert exc_info.value.code == "DEADLINE_EXCEEDED"
+    assert elapsed < 0.8
+
+
+# ==================== 对冲请求测试 ====================
+
+def test_hedge_config_requires_read_only_methods():
+    """测试对冲请求只允许只读方法（幂等的 update_note 也不允许）"""
+    for method in ("create_note", "update_note"):
+        with pytest.raises(ValueError, match="read-only"):
+            DinoxConfig(api_token="test_token", hedge_methods=(method,))
+
+
+def test_hedge_budget_limits_extra_requests():
+    """测试对冲预算：10% 比例下每 10 个请求才允许 1 个对冲"""
+    from dinox_client import HedgeBudget
+    budget = HedgeBudget(0.1)
+    allowed = 0
+    for _ in range(100):
+        budget.deposit()
+        if budget.withdraw():
+            allowed += 1
+    assert 9 <= allowed <= 10
+
+
+def test_latency_tracker_percentile():
+    """测试延迟分位数计算"""
+    from dinox_client import LatencyTracker
+    tracker = LatencyTracker(min_samples=10)
+    assert tracker.percentile("get_note_by_id", 0.95) is None
+    for i in range(100):
+        tracker.record("get_note_by_id", i / 100)
+    assert tracker.percentile("get_note_by_id", 0.95) == pytest.approx(0.95)
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_cuts_tail_latency(mock_server):
+    """测试慢请求触发对冲，并采用先返回的结果"""
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return web.json_response({"code": "000000", "noteId": request.match_info["note_id"]})
+
+    await mock_server(("GET", "/api/openapi/note/{note_id}", handler))
+    config = DinoxConfig(
+        api_token="test_token",
+        hedge_methods=("get_note_by_id",),
+        hedge_delay=0.05,
+        hedge_budget=1.0
+    )
+    async with DinoxClient(config=config) as client:
+        start = asyncio.get_event_loop().time()
+        note = await client.get_note_by_id("abc")
+        elapsed = asyncio.get_event_loop().time() - start
+        assert note["noteId"] == "abc"
+        assert elapsed < 0.5
+        assert client.hedge_stats == {"hedged": 1, "hedge_wins": 1}
+
+
+# ==================== 压缩与字节统计测试 ====================
+
+def test_decode_body_encodings():
+    """测试 gzip/deflate/identity 解压"""
+    import gzip
+    import zlib
+    from dinox_client.client import _decode_body
+    payload = b'{"code": "000000"}' * 10
+    assert _decode_body(gzip.compress(payload), "gzip") == payload
+    assert _decode_body(zlib.compress(payload), "deflate") == payload
+    assert _decode_body(payload, "") == payload
+    with pytest.raises(ValueError):
+        _decode_body(payload, "compress")
+
+
+@pytest.mark.asyncio
+async def test_compressed_response_accounting(mock_server):
+    """测试协商压缩并统计传输字节与解压后字节"""
+    import gzip
+    import json
+    seen_headers = {}
+    notes = [{"date": "2025-10-18", "notes": [{"noteId": str(i), "content": "重复内容" * 200} for i in range(20)]}]
+    body = json.dumps({"code": "000000", "data": notes}).encode("utf-8")
+
+    async def handler(request):
+        seen_headers.update(request.headers)
+        return web.Response(
+            body=gzip.compress(body),
+            headers={"Content-Encoding": "gzip"},
+            content_type="application/json"
+        )
+
+    await mock_server(("POST", "/openapi/v5/notes", handler))
+    async with DinoxClient(api_token="test_token") as client:
+        result = await client.get_notes_list()
+        assert result == notes
+        assert "gzip" in seen_headers["Accept-Encoding"]
+        last = client.metrics.last
+        assert last.method == "get_notes_list"
+        assert last.content_encoding == "gzip"
+        assert last.decoded_bytes == len(body)
+        assert last.wire_bytes < last.decoded_bytes
+        assert client.metrics.compression_ratio > 5
+
+
+# ==================== 同步客户端测试 ====================
+
+@pytest.mark.asyncio
+async def test_sync_client_reuses_sessions_across_threads(mock_server):
+    """测试同步客户端在多线程并发调用时复用同一会话"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    async def handler(request):
+        return web.json_response({"code": "000000", "data": [{"id": "box"}]})
+
+    await mock_server(("GET", "/api/openapi/zettelboxes", handler))
+
+    def run_sync():
+        with DinoxSyncClient(api_token="test_token") as client:
+            session = client.client.ai_session
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(lambda _: client.get_zettelboxes(), range(8)))
+            assert client.client.ai_session is session
+            return results, client.metrics.requests
+
+    results, requests = await asyncio.get_event_loop().run_in_executor(None, run_sync)
+    assert results == [[{"id": "box"}]] * 8
+    assert requests == 8
+
+
+@pytest.mark.asyncio
+async def test_sync_client_propagates_deadline(mock_server):
+    """测试调用线程中的 deadline 会传递到后台事件循环"""
+    async def slow_handler(request):
+        await asyncio.sleep(1)
+        return web.json_response({"code": "000000", "data": []})
+
+    await mock_server(("GET", "/api/openapi/zettelboxes", slow_handler))
+
+    def run_sync():
+        with DinoxSyncClient(api_token="test_token") as client:
+            with client.deadline(0.2):
+                with pytest.raises(DinoxAPIError) as exc_info:
+                    client.get_zettelboxes()
+            return exc_info.value.code
+
+    assert await asyncio.get_event_loop().run_in_executor(None, run_sync) == "DEADLINE_EXCEEDED"
+
+
+# ==================== 同步检查点测试 ====================
+
+def make_day(date, *notes):
+    """构造 get_notes_list 返回的单日分组"""
+    return {"date": date, "notes": list(notes)}
+
+
+def make_note(note_id, update_time, **fields):
+    """构造笔记字典"""
+    note = {
+        "noteId": note_id,
+        "title": f"title-{note_id}",
+        "content": f"content-{note_id}",
+        "contentMd": f"content-{note_id}",
+        "tags": [],
+        "zettelBoxes": [],
+        "type": "note",
+        "isDel": False,
+        "createTime": update_time,
+        "updateTime": update_time,
+    }
+    note.update(fields)
+    return note
+
+
+@pytest.mark.parametrize("store_cls", [FileCheckpointStore, SQLiteCheckpointStore])
+def test_checkpoint_store_only_moves_forward(tmp_path, store_cls):
+    """测试检查点存储持久化且不会后退"""
+    path = tmp_path / "checkpoint.db"
+    store = store_cls(str(path))
+    assert store.load("acct") is None
+    store.commit("acct", "2025-10-18 17:09:25")
+    store.commit("acct", "2025-10-01 00:00:00")
+    assert store_cls(str(path)).load("acct") == "2025-10-18 17:09:25"
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".checkpoint-")] == []
+
+
+def test_max_update_time_normalizes_formats():
+    """测试 updateTime 规范化与最大值"""
+    from dinox_client import max_update_time
+    days = [
+        make_day("2025-10-18", make_note("a", "2025-10-18 17:09:25")),
+        make_day("2025-10-17", make_note("b", "2025-10-18T18:00:01.123")),
+    ]
+    assert max_update_time(days) == "2025-10-18 18:00:01"
+    assert max_update_time([]) is None
+
+
+@pytest.mark.asyncio
+async def test_sync_notes_commits_after_persist(mock_server, tmp_path):
+    """测试持久化成功后才提交检查点，失败时下次从原位置继续"""
+    requested = []
+    days = [make_day("2025-10-18", make_note("a", "2025-10-18 17:09:25"), make_note("b", "2025-10-18 09:00:00"))]
+
+    async def handler(request):
+        body = await request.json()
+        requested.append(body["lastSyncTime"])
+        return web.json_response({"code": "000000", "data": days})
+
+    await mock_server(("POST", "/openapi/v5/notes", handler))
+    store = FileCheckpointStore(str(tmp_path / "checkpoint.json"))
+
+    def failing_persist(batch):
+        raise IOError("disk full")
+
+    async with DinoxClient(api_token="test_token") as client:
+        with pytest.raises(IOError):
+            await client.sync_notes(store, on_notes=failing_persist, account="acct")
+        assert store.load("acct") is None
+
+        persisted = []
+
+        async def persist(batch):
+            persisted.extend(batch)
+
+        result = await client.sync_notes(store, on_notes=persist, account="acct")
+        assert result.note_count == 2
+        assert result.checkpoint == "2025-10-18 17:09:25"
+        assert persisted == days
+
+        await client.sync_notes(store, account="acct")
+
+    assert requested == ["1900-01-01 00:00:00", "1900-01-01 00:00:00", "2025-10-18 17:09:25"]
+    assert store.load("acct") == "2025-10-18 17:09:25"
+
+
+@pytest.mark.asyncio
+async def test_sync_notes_without_callback_defers_commit(mock_server, tmp_path):
+    """测试未提供 on_notes 时不提交检查点，调用方持久化后通过 commit_sync() 提交"""
+    days = [make_day("2025-10-18", make_note("a", "2025-10-18 17:09:25"))]
+
+    async def handler(request):
+        return web.json_response({"code": "000000", "data": days})
+
+    await mock_server(("POST", "/openapi/v5/notes", handler))
+    store = FileCheckpointStore(str(tmp_path / "checkpoint.json"))
+    async with DinoxClient(api_token="test_token") as client:
+        result = await client.sync_notes(store, account="acct")
+        assert store.load("acct") is None and store.load_digests("acct") == {}
+        assert result.checkpoint == "1900-01-01 00:00:00" and result.pending == "2025-10-18 17:09:25"
+
+        await client.commit_sync(store, result)
+        assert result.checkpoint == "2025-10-18 17:09:25" and result.pending is None
+        assert store.load("acct") == "2025-10-18 17:09:25" and set(store.load_digests("acct")) == {"a"}
+        await client.commit_sync(store, result)  # nothing pending
+
+
+# ==================== 分区同步测试 ====================
+
+def test_partition_days_by_update_time():
+    """测试按 updateTime 划分窗口并按 noteId 去重"""
+    from datetime import timedelta
+    from dinox_client import partition_days
+    days = [
+        make_day("2025-10-18", make_note("a", "2025-10-18 10:00:00"), make_note("c", "2025-03-02 00:00:00")),
+        make_day("2025-01-01", make_note("b", "2025-01-01 08:00:00"), make_note("a", "2025-01-01 09:00:00")),
+    ]
+    windows = partition_days(days, timedelta(days=30))
+    assert [w.start for w in windows] == ["2025-01-01 08:00:00", "2025-01-31 08:00:00", "2025-09-28 08:00:00"]
+    assert [w.note_count for w in windows] == [1, 1, 1]
+    assert windows[-1].days == [{"date": "2025-10-18", "notes": [days[0]["notes"][0]]}]
+    assert windows[-1].latest == "2025-10-18 10:00:00"
+
+
+@pytest.mark.asyncio
+async def test_windowed_sync_resumes_from_first_unfinished_window(mock_server, tmp_path):
+    """测试窗口失败时检查点与内容摘要停在连续完成的前缀，重试只请求剩余部分"""
+    from datetime import timedelta
+    all_notes = [make_note(str(i), f"2025-0{i}-01 00:00:00") for i in range(1, 7)]
+    requested = []
+
+    async def handler(request):
+        since = (await request.json())["lastSyncTime"]
+        requested.append(since)
+        notes = [n for n in all_notes if n["updateTime"] >= since]
+        return web.json_response({"code": "000000", "data": [make_day("2025-06-01", *notes)]})
+
+    await mock_server(("POST", "/openapi/v5/notes", handler))
+    store = FileCheckpointStore(str(tmp_path / "checkpoint.json"))
+    persisted = []
+
+    async def flaky_persist(window):
+        if window.latest == "2025-04-01 00:00:00":
+            raise IOError("write failed")
+        await asyncio.sleep(0)
+        persisted.extend(n["noteId"] for day in window.days for n in day["notes"])
+
+    async with DinoxClient(api_token="test_token") as client:
+        with pytest.raises(IOError):
+            await client.sync_notes_windowed(
+                store, flaky_persist, window=timedelta(days=20), concurrency=3, account="acct"
+            )
+        assert store.load("acct") == "2025-03-01 00:00:00"
+        assert sorted(store.load_digests("acct")) == ["1", "2", "3"]
+
+        async def persist(window):
+            persisted.extend(n["noteId"] for day in window.days for n in day["notes"])
+
+        result = await client.sync_notes_windowed(store, persist, window=timedelta(days=20), account="acct")
+        assert sorted(store.load_digests("acct")) == ["1", "2", "3", "4", "5", "6"]
+
+        # The last note comes back at the checkpoint; its committed digest marks it unchanged
+        batches = []
+        followup = await client.sync_notes(store, on_notes=batches.append, account="acct", skip_unchanged=True)
+
+    assert requested == ["1900-01-01 00:00:00", "2025-03-01 00:00:00", "2025-06-01 00:00:00"]
+    assert result.checkpoint == "2025-06-01 00:00:00"
+    assert {"4", "5", "6"} <= set(persisted)
+    assert followup.unchanged_ids == ["6"] and batches == [[]]
+
+
+# ==================== 变更监听测试 ====================
+
+@pytest.mark.asyncio
+async def test_watch_changes_emits_deduplicated_events(mock_server):
+    """测试 watch_changes 产生去重的 created/updated/deleted 事件"""
+    server_notes = {
+        "a": make_note("a", "2025-10-18 10:00:00"),
+        "b": make_note("b", "2025-10-18 11:00:00"),
+    }
+    requested = []
+
+    async def handler(request):
+        since = (await request.json())["lastSyncTime"]
+        requested.append(since)
+        # Inclusive lower bound: the newest note is returned again on the next poll
+        notes = [n for n in server_notes.values() if n["updateTime"] >= since]
+        return web.json_response({"code": "000000", "data": [make_day("2025-10-18", *notes)]})
+
+    await mock_server(("POST", "/openapi/v5/notes", handler))
+    events = []
+    async with DinoxClient(api_token="test_token") as client:
+        changes = client.watch_changes(min_interval=0.01, max_interval=0.02)
+        async for change in changes:
+            events.append((change.kind, change.note_id))
+            if len(events) == 2:
+                server_notes["a"] = make_note("a", "2025-10-18 12:00:00", title="edited")
+                server_notes["b"] = make_note("b", "2025-10-18 12:30:00", isDel=True)
+                server_notes["c"] = make_note("c", "2025-10-18 13:00:00")
+            if len(events) == 5:
+                break
+        await changes.aclose()
+
+    assert events == [
+        ("created", "a"), ("created", "b"),
+        ("updated", "a"), ("deleted", "b"), ("created", "c"),
+    ]
+    assert requested[:2] == ["1900-01-01 00:00:00", "2025-10-18 11:00:00"]
+
+
+@pytest.mark.asyncio
+async def test_watch_changes_since_and_checkpoint_resume(mock_server, tmp_path):
+    """测试 since 之前创建的笔记产出 updated，指定 checkpoint 时重启后不重复产出 created"""
+    old = make_note("old", "2025-10-18 10:00:00", createTime="2025-09-01 00:00:00")
+    server_notes = {"old": old, "new": make_note("new", "2025-10-18 11:00:00")}
+
+    async def handler(request):
+        since = (await request.json())["lastSyncTime"]
+        notes = [n for n in server_notes.values() if n["updateTime"] >= since]
+        return web.json_response({"code": "000000", "data": [make_day("2025-10-18", *notes)]})
+
+    async def collect(client, count, **kwargs):
+        events = []
+        changes = client.watch_changes(min_interval=0.01, max_interval=0.02, **kwargs)
+        async for change in changes:
+            events.append((change.kind, change.note_id))
+            if len(events) == count:
+                break
+        await changes.aclose()
+        return events
+
+    await mock_server(("POST", "/openapi/v5/notes", handler))
+    store = FileCheckpointStore(str(tmp_path / "watch.json"))
+    async with DinoxClient(api_token="test_token") as client:
+        assert await collect(client, 2, since="2025-10-01 00:00:00") == [("updated", "old"), ("created", "new")]
+
+        # The first poll commits once both its events are consumed; the second poll's event stays uncommitted
+        events = []
+        changes = client.watch_changes(since="2025-10-01 00:00:00", min_interval=0.01, max_interval=0.02,
+                                       checkpoint=store, account="acct")
+        async for change in changes:
+            events.append(change.note_id)
+            if len(events) == 2:
+                server_notes["new"] = make_note("new", "2025-10-18 12:00:00", title="edited")
+            if len(events) == 3:
+                break
+        await changes.aclose()
+        assert store.load("acct") == "2025-10-18 11:00:00"
+        assert sorted(store.load_digests("acct")) == ["new", "old"]
+
+        # Restart: the edited note is an update, and nothing already seen is re-emitted as created
+        assert await collect(client, 1, checkpoint=store, account="acct") == [("updated", "new")]
+
+
+def test_change_tracker_ignores_unchanged_state():
+    """测试相同状态摘要不重复产生事件"""
+    from dinox_client import ChangeTracker
+    tracker = ChangeTracker()
+    day = make_day("2025-10-18", make_note("a", "2025-10-18 10:00:00"))
+    assert [c.kind for c in tracker.apply([day])] == ["created"]
+    assert tracker.apply([day]) == []
+
+
+# ==================== 内容摘要测试 ====================
+
+def test_note_digest_ignores_timestamps_and_front_matter():
+    """测试内容摘要忽略时间戳与模板 front matter，但覆盖正文和元数据"""
+    from dinox_client import note_digest
+    note = make_note("a", "2025-10-18 10:00:00", tags=["x", "y"])
+    touched = make_note("a", "2025-10-19 08:00:00", tags=["y", "x"], content="---\nupdateTime: later\n---\nbody")
+    assert note_digest(note) == note_digest(touched)
+    assert note_digest(note) != note_digest(make_note("a", "2025-10-18 10:00:00", contentMd="edited"))
+    assert note_digest(note) != note_digest(make_note("a", "2025-10-18 10:00:00", zettelBoxes=["box"]))
+
+    without_md = {k: v for k, v in touched.items() if k != "contentMd"}
+    assert note_digest(without_md) == note_digest(dict(without_md, content="---\nupdateTime: x\n---\nbody"))
+
+
+@pytest.mark.parametrize("store_cls", [FileCheckpointStore, SQLiteCheckpointStore])
+@pytest.mark.asyncio
+async def test_sync_notes_skips_unchanged_notes(mock_server, tmp_path, store_cls):
+    """测试只有 updateTime 变化的笔记被标记为 unchanged 并可跳过"""
+    server_notes = [make_note("a", "2025-10-18 10:00:00"), make_note("b", "2025-10-18 11:00:00")]
+
+    async def handler(request):
+        return web.json_response({"code": "000000", "data": [make_day("2025-10-18", *server_notes)]})
+
+    await mock_server(("POST", "/openapi/v5/notes", handler))
+    store = store_cls(str(tmp_path / "checkpoint.db"))
+    received = []
+
+    async with DinoxClient(api_token="test_token") as client:
+        first = await client.sync_notes(store, on_notes=received.append, account="acct", skip_unchanged=True)
+        assert [c.kind for c in first.changes] == ["created", "created"]
+
+        server_notes[0] = make_note("a", "2025-10-19 10:00:00")
+        server_notes[1] = make_note("b", "2025-10-19 11:00:00", contentMd="edited")
+        second = await client.sync_notes(store, on_notes=received.append, account="acct", skip_unchanged=True)
+
+    assert second.unchanged_ids == ["a"]
+    assert [(c.kind, c.note_id) for c in second.changed] == [("updated", "b")]
+    assert [n["noteId"] for day in received[1] for n in day["notes"]] == ["b"]
+    assert second.checkpoint == "2025-10-19 11:00:00"
+    assert set(store.load_digests("acct")) == {"a", "b"}
+
+
+@pytest.mark.asyncio
+async def test_sync_reads_checkpoint_off_the_event_loop(mock_server, tmp_path):
+    """测试 sync_notes / sync_notes_windowed 在线程池中读取检查点与内容摘要"""
+    import threading
+    reads = []
+
+    class RecordingStore(FileCheckpointStore):
+        def load(self, account):
+            reads.append(threading.get_ident())
+            return super().load(account)
+
+        def load_digests(self, account):
+            reads.append(threading.get_ident())
+            return super().load_digests(account)
+
+    async def handler(request):
+        return web.json_response({"code": "000000", "data": [make_day("2025-10-18", make_note("a", "2025-10-18 10:00:00"))]})
+
+    await mock_server(("POST", "/openapi/v5/notes", handler))
+    store = RecordingStore(str(tmp_path / "checkpoint.json"))
+    async with DinoxClient(api_token="test_token") as client:
+        await client.sync_notes(store, on_notes=lambda batch: None, account="acct")
+        await client.sync_notes_windowed(store, lambda window: None, account="other")
+    assert len(reads) == 4 and threading.get_ident() not in reads
+
+
+# ==================== 附件下载测试 ====================
+
+def test_iter_audio_urls():
+    """测试从笔记中提取音频地址"""
+    from dinox_client import iter_audio_urls
+    days = [make_day(
+        "2025-10-18",
+        make_note("a", "2025-10-18 10:00:00", audioUrl="https://oss/a.m4a"),
+        make_note("b", "2025-10-18 10:00:00", audioDetail={"remote": "https://oss/b.m4a"}),
+        make_note("c", "2025-10-18 10:00:00", audioUrl="https://oss/c.m4a", isDel=True),
+        make_note("d", "2025-10-18 10:00:00"),
+    )]
+    assert list(iter_audio_urls(days)) == [("a", "https://oss/a.m4a"), ("b", "https://oss/b.m4a")]
+
+
+@pytest.mark.asyncio
+async def test_audio_download_resume_and_skip(mock_server, tmp_path):
+    """测试音频下载：Range 续传、流式写盘、已存在时跳过"""
+    from dinox_client import AudioDownloader
+    payload = os.urandom(200 * 1024)
+    source = tmp_path / "source.m4a"
+    source.write_bytes(payload)
+    ranges = []
+
+    async def handler(request):
+        ranges.append(request.headers.get("Range"))
+        return web.FileResponse(source)
+
+    base_url = await mock_server(("GET", "/audios/{name}", handler), ("HEAD", "/audios/{name}", handler))
+    dest = tmp_path / "audio"
+    dest.mkdir()
+    (dest / "one.m4a.part").write_bytes(payload[:50 * 1024])
+
+    urls = [f"{base_url}/audios/one.m4a", f"{base_url}/audios/two.m4a"]
+    async with AudioDownloader(str(dest), concurrency=2, chunk_size=8192) as downloader:
+        first = await downloader.download_all(urls)
+        second = await downloader.download_all(urls)
+
+    assert [r.status for r in first] == ["resumed", "downloaded"]
+    assert first[0].bytes == 150 * 1024
+    assert "bytes=51200-" in ranges
+    assert (dest / "one.m4a").read_bytes() == payload
+    assert (dest / "two.m4a").read_bytes() == payload
+    assert not (dest / "one.m4a.part").exists()
+    assert [r.status for r in second] == ["skipped", "skipped"]
+
+
+# ==================== 本地索引测试 ====================
+
+def test_note_store_tracks_membership_changes():
+    """测试卡片盒/标签索引随增量更新移动和删除"""
+    from dinox_client import NoteStore
+    store = NoteStore()
+    store.apply([make_day(
+        "2025-10-18",
+        make_note("a", "2025-10-18 10:00:00", zettelBoxes=["读书"], tags=["python"]),
+        make_note("b", "2025-10-18 11:00:00", zettelBoxes=[{"id": "z1", "name": "读书"}], tags=[]),
+    )])
+    assert sorted(store.notes_in_box("读书")) == ["a", "b"]
+    assert store.notes_with_tag("python") == ["a"]
+
+    store.apply([make_day(
+        "2025-10-19",
+        make_note("a", "2025-10-19 10:00:00", zettelBoxes=["工作"], tags=["python"]),
+        make_note("b", "2025-10-19 11:00:00", isDel=True),
+    )])
+    assert store.notes_in_box("读书") == []
+    assert store.notes_in_box("工作") == ["a"]
+    assert "b" not in store and len(store) == 1
+    assert sorted(store.boxes()) == ["工作"]
+
+
+@pytest.mark.asyncio
+async def test_get_notes_list_feeds_store(mock_server):
+    """测试启用 index_notes 时 get_notes_list 的结果自动更新 client.store"""
+    days = [make_day("2025-10-18", make_note("a", "2025-10-18 10:00:00", zettelBoxes=["读书"], tags=["ai"]))]
+
+    async def handler(request):
+        return web.json_response({"code": "000000", "data": days})
+
+    await mock_server(("POST", "/openapi/v5/notes", handler))
+    config = DinoxConfig(api_token="test_token", index_notes=True)
+    async with DinoxClient(config=config) as client:
+        await client.get_notes_list()
+        assert client.store.notes_in_box("读书") == ["a"]
+        assert client.store.notes_with_tag("ai") == ["a"]
+
+    # Off by default
+    async with DinoxClient(api_token="test_token") as client:
+        await client.get_notes_list()
+        assert client._store is None
+
+
+# ==================== 搜索缓存测试 ====================
+
+def test_ttl_cache_expiry_lru_and_generation():
+    """测试 TTL 过期、宽限期、LRU 淘汰与失效后的写入丢弃"""
+    from dinox_client.cache import TTLCache, normalize_keywords
+    now = [0.0]
+    cache = TTLCache(10, maxsize=2, stale_ttl=5, clock=lambda: now[0])
+    assert normalize_keywords([" Python", "异步", "python", ""]) == ("python", "异步")
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a").hit
+    cache.put("c", 3)
+    assert not cache.get("b").hit and cache.get("a").value == 1
+
+    now[0] = 12
+    assert cache.get("a") == (True, 1, True)
+    now[0] = 16
+    assert not cache.get("a").hit
+
+    generation = cache.generation
+    cache.clear()
+    cache.put("d", 4, generation)
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_search_cache_normalization_and_invalidation(mock_server):
+    """测试搜索缓存：关键词顺序/大小写无关，写操作后失效，过期后后台刷新"""
+    calls = []
+
+    async def search(request):
+        calls.append((await request.json())["keywords"])
+        return web.json_response({"code": "000000", "data": {"content": f"v{len(calls)}"}})
+
+    async def create(request):
+        return web.json_response({"code": "000000", "data": {}})
+
+    await mock_server(("POST", "/api/openapi/searchNotes", search), ("POST", "/api/openapi/createNote", create))
+    config = DinoxConfig(api_token="test_token", search_cache_ttl=0.2, search_cache_stale_ttl=5)
+    async with DinoxClient(config=config) as client:
+        assert (await client.search_notes(["Python", "异步"]))["content"] == "v1"
+        assert (await client.search_notes(["异步", " python "]))["content"] == "v1"
+        assert len(calls) == 1
+
+        await client.create_note("# 新笔记")
+        assert (await client.search_notes(["python", "异步"]))["content"] == "v2"
+
+        await asyncio.sleep(0.25)
+        assert (await client.search_notes(["python", "异步"]))["content"] == "v2"
+        await asyncio.gather(*client._search_refreshes.values())
+        assert (await client.search_notes(["python", "异步"]))["content"] == "v3"
+    assert len(calls) == 3
+
+
+# ==================== 批量创建测试 ====================
+
+@pytest.mark.asyncio
+async def test_create_notes_pipelines_create_and_update(mock_server):
+    """测试批量创建：标题/标签写入创建请求，每条一次请求；update=True 时第 N 条更新与第 N+1 条创建重叠"""
+    events = []
+
+    async def create(request):
+        body = await request.json()
+        events.append(("create", body["title"]))
+        await asyncio.sleep(0.05)
+        if body["title"] == "bad":
+            return web.json_response({"code": "0000001", "msg": "invalid"})
+        return web.json_response({"code": "000000", "data": {"noteId": "id-" + body["title"]}})
+
+    async def update(request):
+        body = await request.json()
+        events.append(("update-start", body["noteId"]))
+        await asyncio.sleep(0.05)
+        events.append(("update-end", body["noteId"], body["title"], tuple(body["tags"])))
+        return web.json_response({"code": "000000", "data": {}})
+
+    await mock_server(("POST", "/api/openapi/createNote", create), ("POST", "/api/openapi/updateNote", update))
+    notes = [{"content": f"# {t}", "title": t, "tags": ["import"]} for t in ("a", "b", "c")]
+    async with DinoxClient(api_token="test_token") as client:
+        titled = await client.create_notes([{"content": "# t", "title": "t", "tags": ["import"]}])
+        assert titled[0]["data"]["noteId"] == "id-t"
+        assert client.metrics.requests == 1 and events == [("create", "t")]
+        events.clear()
+
+        results = await client.create_notes(notes, update=True)
+        assert [r["data"]["noteId"] for r in results] == ["id-a", "id-b", "id-c"]
+        assert [e[1] for e in events if e[0] == "create"] == ["a", "b", "c"]
+        assert events.index(("create", "b")) < events.index(("update-end", "id-a", "a", ("import",)))
+
+        mixed = await client.create_notes([{"content": "x", "title": "bad"}, notes[0]], return_exceptions=True)
+        assert isinstance(mixed[0], DinoxAPIError)
+        assert mixed[1]["data"]["noteId"] == "id-a"
+
+
+# ==================== 写入队列测试 ====================
+
+def test_outbox_persists_and_dedupes(tmp_path):
+    """测试写入意图落盘、幂等键去重、重启后仍在队列中"""
+    from dinox_client import SQLiteOutbox
+    path = str(tmp_path / "outbox.db")
+    outbox = SQLiteOutbox(path)
+    key = outbox.enqueue("create_note", content="# A", tags=["inbox"])
+    assert outbox.enqueue("create_note", key=key, content="# A") == key
+    with pytest.raises(ValueError):
+        outbox.enqueue("get_notes_list")
+    outbox.close()
+
+    reopened = SQLiteOutbox(path)
+    [item] = reopened.due()
+    assert (item.key, item.method, item.kwargs) == (key, "create_note", {"content": "# A", "tags": ["inbox"]})
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_drain_outbox_retries_and_sends_idempotency_key(mock_server, tmp_path):
+    """测试 outbox 发送：5xx 退避后重试，成功后出队，业务错误进入失败列表"""
+    from dinox_client import SQLiteOutbox
+    status = [503]
+    received = []
+
+    async def create(request):
+        body = await request.json()
+        if body["content"] == "bad":
+            return web.json_response({"code": "0000001", "msg": "invalid"})
+        if status:
+            return web.json_response({"code": "000000"}, status=status.pop())
+        received.append((request.headers.get("Idempotency-Key"), body["content"]))
+        return web.json_response({"code": "000000", "data": {"noteId": "n1"}})
+
+    await mock_server(("POST", "/api/openapi/createNote", create))
+    outbox = SQLiteOutbox(str(tmp_path / "outbox.db"))
+    key = outbox.enqueue("create_note", content="# 离线记录")
+    outbox.enqueue("create_note", content="bad")
+
+    config = DinoxConfig(api_token="test_token", retry_backoff=0)
+    async with DinoxClient(config=config) as client:
+        assert await client.drain_outbox(outbox, concurrency=1) == {"sent": 0, "retrying": 1, "failed": 1}
+        assert await client.drain_outbox(outbox) == {"sent": 1, "retrying": 0, "failed": 0}
+
+    assert received == [(key, "# 离线记录")]
+    assert len(outbox) == 0
+    [failed] = outbox.failed()
+    assert failed.kwargs == {"content": "bad"} and "invalid" in failed.last_error
+    outbox.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_drains_send_each_item_once(mock_server, tmp_path):
+    """测试并发的 drain_outbox（同一连接或共享数据库文件）只发送一次，过期租约重新入队"""
+    from dinox_client import SQLiteOutbox
+    received = []
+
+    async def create(request):
+        received.append((await request.json())["content"])
+        await asyncio.sleep(0.05)
+        return web.json_response({"code": "000000", "data": {"noteId": "n1"}})
+
+    await mock_server(("POST", "/api/openapi/createNote", create))
+    path = str(tmp_path / "outbox.db")
+    outbox, other_process = SQLiteOutbox(path), SQLiteOutbox(path)
+    outbox.enqueue("create_note", content="# A")
+    outbox.enqueue("create_note", content="# B")
+
+    async with DinoxClient(api_token="test_token") as client:
+        counts = await asyncio.gather(
+            client.drain_outbox(outbox), client.drain_outbox(outbox), client.drain_outbox(other_process)
+        )
+    assert sorted(received) == ["# A", "# B"]
+    assert sum(c["sent"] for c in counts) == 2
+    assert len(outbox) == 0
+
+    # An expired lease goes back to the queue; the stale claim can no longer settle the item
+    key = outbox.enqueue("create_note", content="# C")
+    [stale] = outbox.due(lease=0)
+    [item] = other_process.due()
+    assert item.key == key and item.claim != stale.claim
+    assert not outbox.complete(key, stale.claim)
+    assert other_process.complete(key, item.claim) and len(outbox) == 0
+    outbox.close()
+    other_process.close()
+
+
+# ==================== 批量查询测试 ====================
+
+@pytest.mark.asyncio
+async def test_get_notes_by_ids_window_order_and_404(mock_server):
+    """测试批量查询：并发不超过窗口、结果按输入顺序、404 映射为 None、重复请求合并"""
+    requested = []
+    active = [0, 0]
+
+    async def handler(request):
+        note_id = request.match_info["note_id"]
+        requested.append(note_id)
+        active[0] += 1
+        active[1] = max(active[1], active[0])
+        await asyncio.sleep(0.02 if note_id != "n0" else 0.08)
+        active[0] -= 1
+        if note_id == "missing":
+            return web.json_response({"code": "404", "msg": "not found"}, status=404)
+        return web.json_response({"code": "000000", "data": {"noteId": note_id}})
+
+    await mock_server(("GET", "/api/openapi/note/{note_id}", handler))
+    ids = [f"n{i}" for i in range(10)] + ["missing", "n3"]
+    async with DinoxClient(api_token="test_token") as client:
+        notes = await client.get_notes_by_ids(ids, concurrency=3)
+        assert [n and n["data"]["noteId"] for n in notes] == ids[:10] + [None, "n3"]
+        assert active[1] == 3
+        assert len(requested) == 11
+
+        streamed = [note_id async for note_id, _ in client.iter_notes_by_ids(["n0", "n1"], concurrency=2)]
+        assert streamed == ["n1", "n0"]
+
+        requested.clear()
+        first, second = await asyncio.gather(client.get_note_by_id("n5"), client.get_note_by_id("n5"))
+        assert first == second and requested == ["n5"]
+
+
+# ==================== CPU 卸载测试 ====================
+
+@pytest.mark.asyncio
+async def test_offload_parsing_and_digests_match_inline(mock_server, tmp_path):
+    """测试卸载到线程池时响应解析、变更摘要与本地索引结果与事件循环内一致"""
+    from concurrent.futures import ThreadPoolExecutor
+    days = [make_day(
+        "2025-10-18",
+        make_note("a", "2025-10-18 10:00:00", content="---\nupdateTime: x\n---\n正文 a", zettelBoxes=["读书"]),
+        make_note("b", "2025-10-18 11:00:00", content="正文 b", isDel=True),
+        make_note("c", "2025-10-18 12:00:00", content="正文 c", zettelBoxes=["读书"], tags=["ai"]),
+    )]
+
+    async def handler(request):
+        return web.json_response({"code": "000000", "data": days})
+
+    await mock_server(("POST", "/openapi/v5/notes", handler))
+    results = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for name, kwargs in (("inline", {}), ("offload", {"offload_threshold": 0, "offload_executor": executor, "offload_chunk_size": 1})):
+            store = FileCheckpointStore(str(tmp_path / f"{name}.json"))
+            async with DinoxClient(config=DinoxConfig(api_token="test_token", index_notes=True, **kwargs)) as client:
+                results.append(await client.sync_notes(store, on_notes=lambda batch: None, account="acct"))
+                assert client.metrics.requests == 1 and client.metrics.last.decoded_bytes > 0
+                assert sorted(client.store.notes_in_box("读书")) == ["a", "c"]
+                assert client.store.notes_with_tag("ai") == ["c"]
+            results.append(store.load_digests("acct"))
+
+    inline, inline_digests, offloaded, offloaded_digests = results
+    assert offloaded.days == inline.days == days
+    assert [(c.kind, c.note_id) for c in offloaded.changes] == [(c.kind, c.note_id) for c in inline.changes]
+    assert offloaded_digests == inline_digests
+
+
+# ==================== 事件循环监视测试 ====================
+
+@pytest.mark.asyncio
+async def test_loop_monitor_attributes_blocking_to_loop_lag(mock_server):
+    """测试监视器记录事件循环阻塞、慢回调，并把阻塞计入请求的 loop_lag"""
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        return web.json_response({"code": "000000", "data": []})
+
+    async def block():
+        await asyncio.sleep(0.02)
+        time.sleep(0.15)
+
+    await mock_server(("POST", "/openapi/v5/notes", handler))
+    loop = asyncio.get_running_loop()
+    debug = loop.get_debug()
+    async with DinoxClient(api_token="test_token") as client:
+        monitor = await client.start_loop_monitor(interval=0.01, threshold=0.05, slow_callbacks=True)
+        await asyncio.gather(client.get_notes_list(), block())
+        await asyncio.sleep(0.03)
+
+        last = client.metrics.last
+        assert monitor.max_lag >= 0.1 and len(monitor.stalls) >= 1
+        assert any("block" in message for message in monitor.snapshot()["slow_callbacks"])
+        assert last.loop_lag >= 0.1
+        assert last.network_time > 0 and last.client_time == last.prepare_time + last.parse_time
+        assert client.metrics.snapshot()["loop_lag"] >= 0.1
+    assert loop.get_debug() == debug and not monitor.running
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_on_derived_client_keeps_shared_sessions(mock_server):
+    """测试 for_account() 派生的客户端可以启动监视器，且不会丢失共享会话"""
+    async def handler(request):
+        return web.json_response({"code": "000000", "data": []})
+
+    await mock_server(("POST", "/openapi/v5/notes", handler))
+    async with DinoxClient(api_token="test_token") as client:
+        child = client.for_account("other_token")
+        await child.connect()
+        monitor = await child.start_loop_monitor(interval=0.01)
+        assert monitor is not None and monitor.running and child.loop_monitor is monitor
+        assert child.note_session is client.note_session and child.ai_session is client.ai_session
+        assert await child.get_notes_list() == []
+        await child.close()
+        assert not monitor.running and not client.note_session.closed
+
+
+# ==================== 本地归档测试 ====================
+
+def test_note_archive_append_lookup_and_reader_refresh(tmp_path):
+    """测试归档：只追加写入、mmap 查询、更新与删除、其它实例刷新后可见"""
+    from dinox_client import NoteArchive
+    path = str(tmp_path / "notes.dnx")
+    writer = NoteArchive(path)
+    reader = NoteArchive(path, refresh_interval=0)
+    assert reader.get("a") is None and len(reader) == 0
+
+    writer.apply([make_day(
+        "2025-10-18",
+        make_note("a", "2025-10-18 10:00:00", content="旧内容"),
+        make_note("b", "2025-10-18 11:00:00", content="内容 b"),
+    )])
+    assert reader.get("a")["content"] == "旧内容"
+    assert bytes(reader.get_raw("b")) == (tmp_path / "notes.dnx").read_bytes().splitlines()[1]
+
+    writer.apply([make_day(
+        "2025-10-19",
+        make_note("a", "2025-10-19 10:00:00", content="新内容"),
+        make_note("b", "2025-10-19 11:00:00", isDel=True),
+        make_note("c-longer-note-id", "2025-10-19 12:00:00"),
+    )])
+    assert reader.get("a")["content"] == "新内容"
+    assert "b" not in reader and reader.get("missing") is None
+    assert list(reader.note_ids()) == ["a", "c-longer-note-id"]
+    assert len((tmp_path / "notes.dnx").read_bytes().splitlines()) == 4
+
+    writer.close()
+    assert NoteArchive(path).get("c-longer-note-id")["noteId"] == "c-longer-note-id"
+
+
+# ==================== 多账号同步测试 ====================
+
+@pytest.mark.asyncio
+async def test_sync_accounts_priority_caps_and_reports(mock_server, tmp_path):
+    """测试多账号同步：最久未同步优先、服务器并发上限、单账号失败隔离、逐账号报告"""
+    from dinox_client import SQLiteCheckpointStore, SyncAccount
+    seen = []
+    active = [0, 0]
+
+    async def handler(request):
+        token = request.headers["Authorization"]
+        seen.append(token)
+        active[0] += 1
+        active[1] = max(active[1], active[0])
+        await asyncio.sleep(0.03)
+        active[0] -= 1
+        if token == "t-bad":
+            return web.json_response({"code": "401", "msg": "invalid token"}, status=401)
+        days = [make_day("2025-10-18", make_note(f"{token}-note", "2025-10-18 10:00:00"))]
+        return web.json_response({"code": "000000", "data": days})
+
+    base_url = await mock_server(("POST", "/openapi/v5/notes", handler))
+    store = SQLiteCheckpointStore(str(tmp_path / "sync.db"))
+    store.commit("fresh", "2025-10-01 00:00:00")
+    store.commit("old", "2024-01-01 00:00:00")
+    persisted = []
+    accounts = [
+        SyncAccount("t-fresh", store, account="fresh", on_notes=persisted.append),
+        SyncAccount("t-old", store, account="old", on_notes=persisted.append),
+        SyncAccount("t-new", store, account="new", on_notes=persisted.append),
+        SyncAccount("t-bad", store, account="bad", on_notes=persisted.append),
+    ]
+    with pytest.raises(ValueError):
+        SyncAccount("t-none", store)
+
+    config = DinoxConfig(api_token="service", server_concurrency={base_url: 2})
+    async with DinoxClient(config=config) as client:
+        reports = await client.sync_accounts(accounts, concurrency=1)
+        assert seen == ["t-new", "t-bad", "t-old", "t-fresh"]
+        assert [r.account for r in reports] == ["new", "bad", "old", "fresh"]
+        assert not reports[1].ok and reports[1].error.status_code == 401
+        assert all(r.ok for r in reports if r.account != "bad")
+        assert reports[0].requests == 1 and reports[0].wire_bytes > 0 and reports[0].duration > 0
+        assert store.load("new") == "2025-10-18 10:00:00"
+
+        await client.sync_accounts(accounts, concurrency=4)
+        assert active[1] == 2
+        assert not client.note_session.closed
+    store.close()
+
+
+# ==================== 自适应并发测试 ====================
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_aimd():
+    """测试 AIMD：用满上限且延迟稳定时加性增加，过载或延迟突增时乘性减少"""
+    from dinox_client import AdaptiveLimiter
+    limiter = AdaptiveLimiter(initial=2, max_limit=4)
+    for _ in range(8):
+        await limiter.acquire()
+        await limiter.acquire()
+        limiter.release(0.01)
+        limiter.release(0.01)
+    assert 3 <= limiter.limit <= 4
+
+    before = limiter.limit
+    await limiter.acquire()
+    await limiter.acquire()
+    limiter.release(0.05, overloaded=True)
+    limiter.release(0.05, overloaded=True)  # started before the decrease: same congestion event
+    assert limiter.limit == before / 2 and limiter.decreases == 1
+
+    await asyncio.sleep(0.06)
+    halved = limiter.limit
+    await limiter.acquire()
+    limiter.release(0.05)  # started after the decrease, latency over 2x the baseline
+    assert limiter.limit == max(1, halved / 2) and limiter.decreases == 2
+
+    # Latency spikes are judged against the same method's baseline only
+    mixed = AdaptiveLimiter(initial=8, max_limit=8)
+    for _ in range(5):
+        await mixed.acquire()
+        mixed.release(0.05, method="get_note_by_id")
+    await mixed.acquire()
+    mixed.release(5.0, method="get_notes_list")
+    await mixed.acquire()
+    mixed.release(5.5, method="get_notes_list")
+    assert mixed.limit == 8 and mixed.decreases == 0
+    await mixed.acquire()
+    mixed.release(0.5, method="get_note_by_id")
+    assert mixed.limit == 4 and mixed.decreases == 1
+    assert set(mixed.snapshot()["baseline_latency"]) == {"get_note_by_id", "get_notes_list"}
+
+    # Waiters are served in order once a slot frees up
+    fixed = AdaptiveLimiter(initial=1, max_limit=1)
+    await fixed.acquire()
+    order = []
+
+    async def wait(name):
+        await fixed.acquire()
+        order.append(name)
+        fixed.release(0.01)
+
+    tasks = [asyncio.ensure_future(wait(name)) for name in "abc"]
+    await asyncio.sleep(0)
+    tasks[1].cancel()
+    fixed.release(0.01)
+    await asyncio.gather(tasks[0], tasks[2])
+    assert order == ["a", "c"] and fixed.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_client_adaptive_concurrency_backs_off(mock_server):
+    """测试客户端在 503 时降低服务器并发上限，并在度量中暴露当前上限"""
+    statuses = [503] * 4
+
+    async def handler(request):
+        await asyncio.sleep(0.01)
+        if statuses:
+            return web.json_response({"code": "503"}, status=statuses.pop())
+        return web.json_response({"code": "000000", "data": []})
+
+    base_url = await mock_server(("POST", "/openapi/v5/notes", handler))
+    config = DinoxConfig(api_token="test_token", adaptive_concurrency=True, adaptive_initial_concurrency=8)
+    async with DinoxClient(config=config) as client:
+        results = await asyncio.gather(*(client.get_notes_list() for _ in range(8)), return_exceptions=True)
+        assert sum(isinstance(r, DinoxAPIError) for r in results) == 4
+        state = client.metrics.snapshot()["concurrency"][base_url]
+        assert state["limit"] < 5 and state["decreases"] == 1 and state["in_flight"] == 0
+
+
+# ==================== 优先级调度测试 ====================
+
+@pytest.mark.asyncio
+async def test_limiter_priority_order_and_reserved_capacity():
+    """测试限制器按优先级唤醒，且保留名额只供 interactive 使用"""
+    from dinox_client import ConcurrencyLimiter
+    limiter = ConcurrencyLimiter(2, reserved=1)
+    await limiter.acquire("bulk")
+    order = []
+
+    async def request(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+
+    bulk = asyncio.ensure_future(request("bulk-2", "bulk"))
+    await asyncio.sleep(0)
+    assert order == [] and limiter.queued()["bulk"] == 1  # the last slot is reserved
+
+    await request("interactive-1", "interactive")  # uses the reserved slot immediately
+    normal = asyncio.ensure_future(request("normal-1", "normal"))
+    interactive = asyncio.ensure_future(request("interactive-2", "interactive"))
+    await asyncio.sleep(0)
+    assert limiter.snapshot()["queued"] == {"interactive": 1, "normal": 1, "bulk": 1}
+
+    for _ in range(4):
+        limiter.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(bulk, normal, interactive)
+    assert order == ["interactive-1", "interactive-2", "normal-1", "bulk-2"]
+    assert limiter.max_queued == {"interactive": 1, "normal": 1, "bulk": 1}
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_bypass_bulk_backlog(mock_server):
+    """测试批量 update_note 排队时，get_note_by_id 使用保留名额不被阻塞"""
+    async def update(request):
+        await asyncio.sleep(0.1)
+        return web.json_response({"code": "000000"})
+
+    async def get_note(request):
+        return web.json_response({"code": "000000", "data": {"noteId": request.match_info["note_id"]}})
+
+    base_url = await mock_server(
+        ("POST", "/api/openapi/updateNote", update),
+        ("GET", "/api/openapi/note/{note_id}", get_note),
+    )
+    config = DinoxConfig(api_token="test_token", server_concurrency={base_url: 3}, reserved_interactive=1)
+    async with DinoxClient(config=config) as client:
+        with client.priority("bulk"):
+            backlog = [asyncio.ensure_future(client.update_note(f"n{i}", "x")) for i in range(10)]
+        await asyncio.sleep(0.02)
+        started = time.monotonic()
+        await client.get_note_by_id("hot")
+        assert time.monotonic() - started < 0.08
+        state = client.metrics.snapshot()["concurrency"][base_url]
+        assert state["queued"]["bulk"] == 8
+        await asyncio.gather(*backlog)
+
+    with pytest.raises(ValueError):
+        with client.priority("urgent"):
+            pass
+
+
+# ==================== 连接预热测试 ====================
+
+@pytest.mark.asyncio
+async def test_connect_warmup_opens_reusable_connections(mock_server):
+    """测试 connect(warmup=True) 并行建立多个 keep-alive 连接，后续请求复用这些连接"""
+    warm_ports, request_ports = set(), []
+
+    async def head(request):
+        warm_ports.add(request.transport.get_extra_info("peername")[1])
+        return web.Response(status=404, text="not found")
+
+    async def zettelboxes(request):
+        request_ports.append(request.transport.get_extra_info("peername")[1])
+        return web.json_response({"code": "000000", "data": []})
+
+    base_url = await mock_server(
+        ("HEAD", "/", head),
+        ("GET", "/api/openapi/zettelboxes", zettelboxes),
+    )
+    client = DinoxClient(config=DinoxConfig(api_token="test_token", warmup_connections=3))
+    try:
+        await client.connect(warmup=True)
+        assert len(warm_ports) == 3
+        await client.get_zettelboxes()
+        assert request_ports[0] in warm_ports
+        assert await client.warmup(connections=0) == {base_url: 0}
+    finally:
+        await client.close()
+
+
+# ==================== 条件请求测试 ====================
+
+@pytest.mark.asyncio
+async def test_conditional_requests_serve_304_from_cache(mock_server):
+    """测试 get_note_by_id / get_zettelboxes 发送条件请求，304 时返回缓存结果"""
+    seen = []
+    version = {"etag": '"v1"'}
+
+    async def get_note(request):
+        seen.append(("note", request.headers.get("If-None-Match")))
+        if request.headers.get("If-None-Match") == version["etag"]:
+            return web.Response(status=304)
+        body = {"code": "000000", "data": {"noteId": "n1", "etag": version["etag"]}}
+        return web.json_response(body, headers={"ETag": version["etag"]})
+
+    async def zettelboxes(request):
+        seen.append(("boxes", request.headers.get("If-Modified-Since")))
+        if request.headers.get("If-Modified-Since"):
+            return web.Response(status=304)
+        return web.json_response(
+            {"code": "000000", "data": [{"name": "box"}]},
+            headers={"Last-Modified": "Mon, 19 Oct 2026 08:00:00 GMT"}
+        )
+
+    await mock_server(
+        ("GET", "/api/openapi/note/{note_id}", get_note),
+        ("GET", "/api/openapi/zettelboxes", zettelboxes),
+    )
+    config = DinoxConfig(api_token="test_token", conditional_cache_size=8)
+    async with DinoxClient(config=config) as client:
+        first = await client.get_note_by_id("n1")
+        assert await client.get_note_by_id("n1") == first
+        version["etag"] = '"v2"'
+        assert (await client.get_note_by_id("n1"))["data"]["etag"] == '"v2"'
+
+        assert await client.get_zettelboxes() == [{"name": "box"}]
+        assert await client.get_zettelboxes() == [{"name": "box"}]
+
+        assert client.conditional_cache.hits == 2
+        assert client.conditional_cache.misses == 3
+        assert [m.status for m in client.metrics.recent] == [200, 304, 200, 200, 304]
+        assert client.metrics.snapshot()["not_modified"] == 2
+
+    assert seen == [
+        ("note", None), ("note", '"v1"'), ("note", '"v1"'),
+        ("boxes", None), ("boxes", "Mon, 19 Oct 2026 08:00:00 GMT"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_conditional_requests_without_validators(mock_server):
+    """测试服务器不返回 ETag/Last-Modified 时不发送条件请求"""
+    conditional = []
+
+    async def zettelboxes(request):
+        conditional.append("If-None-Match" in request.headers or "If-Modified-Since" in request.headers)
+        return web.json_response({"code": "000000", "data": []})
+
+    await mock_server(("GET", "/api/openapi/zettelboxes", zettelboxes))
+    config = DinoxConfig(api_token="test_token", conditional_cache_size=8)
+    async with DinoxClient(config=config) as client:
+        await client.get_zettelboxes()
+        await client.get_zettelboxes()
+        assert len(client.conditional_cache) == 0
+    assert conditional == [False, False]
+
+
+# ==================== 磁盘响应缓存测试 ====================
+
+def test_response_cache_ttl_lru_and_shared_file(tmp_path):
+    """测试磁盘缓存的 TTL、LRU 淘汰与多个连接并发写入同一文件"""
+    from dinox_client import SQLiteResponseCache
+    path = tmp_path / "responses.db"
+    cache = SQLiteResponseCache(path, ttl=60, max_entries=3)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    cache.put("expired", {"v": 0}, ttl=-1)
+    assert cache.get("expired") is None
+    cache._conn.execute("UPDATE dinox_responses SET accessed_at = accessed_at - 10")
+    assert cache.get("a") == {"v": 1}  # touches "a", so "b" is now least recently used
+    cache.put("c", {"v": 3})
+    cache.put("d", {"v": 4})
+    assert cache.get("b") is None
+    assert [cache.get(k) for k in "acd"] == [{"v": 1}, {"v": 3}, {"v": 4}]
+
+    sized = SQLiteResponseCache(tmp_path / "sized.db", max_bytes=30)
+    sized.put("x", "x" * 20)
+    sized.put("y", "y" * 20)
+    assert sized.get("x") is None and len(sized) == 1
+    sized.close()
+
+    # Separate connections behave like separate processes sharing the file
+    other = SQLiteResponseCache(path, ttl=60, max_entries=1000)
+    cache.max_entries = 1000
+
+    def write(target, prefix):
+        for i in range(100):
+            target.put(f"{prefix}{i}", i)
+
+    threads = [threading.Thread(target=write, args=(c, p)) for c, p in ((cache, "p"), (other, "q"))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.get("q99") == 99 and other.get("p99") == 99
+    cache.close()
+    other.close()
+
+
+@pytest.mark.asyncio
+async def test_response_cache_skips_network_per_token(mock_server, tmp_path):
+    """测试另一个客户端（worker 进程）命中磁盘缓存，不同 Token 互不共享，update_note 删除笔记条目"""
+    from dinox_client import SQLiteResponseCache
+    calls = []
+
+    async def zettelboxes(request):
+        calls.append("boxes")
+        return web.json_response({"code": "000000", "data": [{"name": request.headers["Authorization"]}]})
+
+    async def get_note(request):
+        calls.append("note")
+        return web.json_response({"code": "000000", "data": {"noteId": request.match_info["note_id"]}})
+
+    async def update(request):
+        return web.json_response({"code": "000000"})
+
+    await mock_server(
+        ("GET", "/api/openapi/zettelboxes", zettelboxes),
+        ("GET", "/api/openapi/note/{note_id}", get_note),
+        ("POST", "/api/openapi/updateNote", update),
+    )
+    path = tmp_path / "responses.db"
+
+    def config(token):
+        return DinoxConfig(api_token=token, response_cache=SQLiteResponseCache(path, ttl=60))
+
+    async with DinoxClient(config=config("token-a")) as client:
+        assert await client.get_zettelboxes() == [{"name": "token-a"}]
+        await client.get_note_by_id("n1")
+    assert calls == ["boxes", "note"]
+
+    async with DinoxClient(config=config("token-a")) as worker:
+        assert await worker.get_zettelboxes() == [{"name": "token-a"}]
+        await worker.get_note_by_id("n1")
+        assert calls == ["boxes", "note"]
+        await worker.update_note("n1", "changed")
+        await worker.get_note_by_id("n1")
+        assert calls == ["boxes", "note", "note"]
+
+    async with DinoxClient(config=config("token-b")) as other:
+        assert await other.get_zettelboxes() == [{"name": "token-b"}]
+    assert calls[-1] == "boxes"
+    keys = [row[0] for row in other.config.response_cache._conn.execute("SELECT key FROM dinox_responses")]
+    assert len(keys) == 3 and not any("token" in key for key in keys)
+
+
+# ==================== 命令行工具测试 ====================
+
+@pytest.mark.asyncio
+async def test_cli_sync_get_and_export_stream_ndjson(mock_server, tmp_path, capsys, monkeypatch):
+    """测试 dinox sync / get / export 逐行输出 NDJSON"""
+    import json
+    from dinox_client.cli import main
+
+    async def notes_list(request):
+        payload = await request.json()
+        assert payload["lastSyncTime"] == "2025-10-01 00:00:00"
+        return web.json_response({"code": "000000", "data": [
+            make_day("2025-10-02", make_note("n2", "2025-10-02 09:00:00", isDel=True)),
+            make_day("2025-10-01", make_note("n1", "2025-10-01 09:00:00")),
+        ]})
+
+    async def get_note(request):
+        note_id = request.match_info["note_id"]
+        if note_id == "missing":
+            return web.json_response({"code": "404", "msg": "not found"}, status=404)
+        return web.json_response({"code": "000000", "data": {"noteId": note_id}})
+
+    await mock_server(
+        ("POST", "/openapi/v5/notes", notes_list),
+        ("GET", "/api/openapi/note/{note_id}", get_note),
+    )
+    monkeypatch.setenv("DINOX_API_TOKEN", "test_token")
+
+    def run(*argv):
+        code = main(list(argv))
+        return code, [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    code, lines = await asyncio.get_event_loop().run_in_executor(None, run, "sync", "--since", "2025-10-01 00:00:00")
+    assert code == 0
+    assert [(line["noteId"], line["date"]) for line in lines] == [("n2", "2025-10-02"), ("n1", "2025-10-01")]
+
+    # One line per input line, whether or not duplicates share a stdin chunk
+    for chunk_size in (1000, 1):
+        monkeypatch.setattr("dinox_client.cli._GET_CHUNK_SIZE", chunk_size)
+        monkeypatch.setattr("sys.stdin", io.StringIO("n1\nmissing\n\nn1\n"))
+        code, lines = await asyncio.get_event_loop().run_in_executor(None, run, "get", "--concurrency", "2")
+        assert code == 1
+        assert sorted((line["noteId"], line["found"]) for line in lines) == [
+            ("missing", False), ("n1", True), ("n1", True)
+        ]
+
+    export_dir = tmp_path / "vault"
+    export_dir.mkdir()
+    (export_dir / "n2.md").write_text("old", encoding="utf-8")
+    code, lines = await asyncio.get_event_loop().run_in_executor(None, run, "export", str(export_dir), "--since", "2025-10-01 00:00:00")
+    assert code == 0
+    assert [(line["noteId"], line["action"]) for line in lines] == [("n2", "deleted"), ("n1", "written")]
+    assert sorted(p.name for p in export_dir.iterdir()) == ["n1.md"]
+    assert (export_dir / "n1.md").read_text(encoding="utf-8") == "content-n1"
+
+
+def test_cli_requires_token_and_valid_concurrency(monkeypatch, capsys):
+    """测试缺少 Token 或并发数非法时以参数错误退出"""
+    from dinox_client.cli import main
+    monkeypatch.delenv("DINOX_API_TOKEN", raising=False)
+    monkeypatch.setattr("dinox_client.cli.load_dotenv", lambda: None)
+    with pytest.raises(SystemExit) as exc_info:
+        main(["health"])
+    assert exc_info.value.code == 2
+    with pytest.raises(SystemExit):
+        main(["--token", "t", "get", "--concurrency", "0", "n1"])
+    assert "must be >= 1" in capsys.readouterr().err
+    # --concurrency only applies to windowed (--checkpoint) sync/export
+    with pytest.raises(SystemExit) as exc_info:
+        main(["--token", "t", "sync", "--concurrency", "8"])
+    assert exc_info.value.code == 2 and "--checkpoint" in capsys.readouterr().err
+
+
 # ==================== 主测试套件 ====================
 
 def run_tests():
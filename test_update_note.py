@@ -1,8 +1,18 @@
 import asyncio
+import io
 import os
+import sys
 from dotenv import load_dotenv
 from dinox_client import DinoxClient
 
+# Fix console encoding on Windows
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+        sys.stderr.reconfigure(encoding='utf-8')
+    except (AttributeError, io.UnsupportedOperation):
+        pass
+
 # Load environment variables
 load_dotenv()
 